@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: detección de casi-duplicados con MinHash + LSH sobre un corpus sintético
+
+Genera N ofertas (por defecto 100k), un 10% de ellas reposts con una palabra
+cambiada, y compara el coste del índice LSH con la comparación por pares
+(extrapolada desde una muestra).
+
+Uso: python benchmarks/bench_near_dedupe.py [ofertas]
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from bot.utils.text import offer_search_text
+from filters.near_dedupe import MinHasher, NearDuplicateDetector
+
+WORDS = (
+    "se busca solicita empresa desarrollador diseñador redactor contenido marketing "
+    "ventas python java web móvil gráfico experiencia años salario cup usd mlc "
+    "tiempo completo parcial remoto presencial habana santiago camagüey holguín "
+    "inglés equipo proyecto cliente buena presencia disponibilidad inmediata "
+    "community manager redes sociales fotografía video edición atención clientes"
+).split()
+
+
+def make_corpus(count: int, repost_ratio: float = 0.1, seed: int = 7):
+    rng = random.Random(seed)
+    offers, reposts = [], set()
+
+    for i in range(count):
+        if offers and rng.random() < repost_ratio:
+            original = rng.choice(offers)
+            words = original['description'].split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            offer = dict(original, description=' '.join(words), link=f"https://www.revolico.com/item/{i}")
+            reposts.add(offer['link'])
+        else:
+            offer = {
+                'title': ' '.join(rng.choices(WORDS, k=6)),
+                'description': ' '.join(rng.choices(WORDS, k=30)),
+                'company': '',
+                'link': f"https://www.revolico.com/item/{i}",
+                'source': 'Revolico',
+            }
+        offers.append(offer)
+
+    # Como en BaseScraper._create_offer: el texto normalizado se calcula al crear la oferta
+    for offer in offers:
+        offer['search_text'] = offer_search_text(offer)
+
+    return offers, reposts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    offers, reposts = make_corpus(count)
+
+    detector = NearDuplicateDetector(window_hours=24 * 365)
+    start = time.perf_counter()
+    kept = detector.filter(offers, now=time.time())
+    lsh_time = time.perf_counter() - start
+
+    dropped = {offer['link'] for offer in offers} - {offer['link'] for offer in kept}
+    recall = len(dropped & reposts) / len(reposts) if reposts else 1.0
+    precision = len(dropped & reposts) / len(dropped) if dropped else 1.0
+
+    # Pares: firmas de una muestra comparadas todas contra todas, extrapolado a N
+    sample = [detector.index.signatures[key] for key in list(detector.index.signatures)[:1000]]
+    start = time.perf_counter()
+    for i, first in enumerate(sample):
+        for second in sample[:i]:
+            MinHasher.similarity(first, second)
+    pair_time = (time.perf_counter() - start) / (len(sample) * (len(sample) - 1) / 2)
+    pairwise_estimate = pair_time * count * (count - 1) / 2
+
+    print(f"Ofertas: {count} ({len(reposts)} reposts)")
+    print(f"MinHash + LSH:  {lsh_time:.1f}s  ({lsh_time / count * 1e6:.0f} µs/oferta)")
+    print(f"Pares (estim.): {pairwise_estimate / 3600:.1f}h")
+    print(f"Descartadas: {len(dropped)}  precisión: {precision:.1%}  recall: {recall:.1%}")
+
+
+if __name__ == "__main__":
+    main()
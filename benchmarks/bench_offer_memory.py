@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memoria de 100k ofertas como dict vs Offer (__slots__)
+
+Uso: python benchmarks/bench_offer_memory.py [ofertas]
+"""
+
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bot.utils.text import normalize_text
+from scrapers.offer import Offer
+
+SOURCES = ['CuCoders', 'Cubisima', 'Revolico']
+
+
+def make_rows(count: int):
+    """Campos de texto ya descargados; se comparten entre ambas variantes"""
+    rng = random.Random(7)
+    rows = []
+    for i in range(count):
+        rows.append((
+            f"Desarrollador Python {i}",
+            f"Empresa {i % 500}",
+            f"Oferta número {i}: proyecto remoto con Django, salario {rng.randint(100, 900)} USD",
+            f"https://www.revolico.com/item/{i}",
+            SOURCES[i % len(SOURCES)]
+        ))
+    return rows
+
+
+def as_dict(title, company, description, link, source):
+    """Lo que devolvía _create_offer antes de Offer"""
+    return {
+        'title': title,
+        'company': company,
+        'description': description,
+        'link': link,
+        'source': source,
+        'search_text': normalize_text(f"{title} {description} {company}"),
+    }
+
+
+def measure(build):
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, objects
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = make_rows(count)
+
+    dict_bytes, _ = measure(lambda: [as_dict(*row) for row in rows])
+    offer_bytes, offers = measure(lambda: [Offer(*row) for row in rows])
+
+    tracemalloc.start()
+    for offer in offers:
+        offer.search_text
+    text_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Ofertas: {count}")
+    print(f"dict:                  {dict_bytes / 1e6:7.1f} MB  ({dict_bytes / count:.0f} B/oferta)")
+    print(f"Offer:                 {offer_bytes / 1e6:7.1f} MB  ({offer_bytes / count:.0f} B/oferta)")
+    print(f"Offer + search_text:   {(offer_bytes + text_bytes) / 1e6:7.1f} MB  "
+          f"({(offer_bytes + text_bytes) / count:.0f} B/oferta)")
+    print(f"Ahorro por {count} ofertas: {(dict_bytes - offer_bytes - text_bytes) / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parseo en un solo proceso vs ParsePool sobre los HTML guardados
+
+Uso: python benchmarks/bench_parse_pool.py [páginas] [workers]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from scrapers.parse_pool import ParsePool, parse_html
+from scrapers.cucoders_scraper import CucodersScraper
+from scrapers.revolico_scraper import RevolicoScraper
+
+FIXTURES = [
+    (CucodersScraper, 'CuCoders', 'cucoders_content.html'),
+    (CucodersScraper, 'CuCoders', 'cucoders_current.html'),
+    (RevolicoScraper, 'Revolico', 'test_output.html'),
+]
+
+
+def load_pages(count: int):
+    fixtures = [(cls, source, (ROOT / name).read_bytes()) for cls, source, name in FIXTURES]
+    return [fixtures[i % len(fixtures)] for i in range(count)]
+
+
+def run_threaded(pages, parse, threads: int):
+    """Simula a los scrapers: varios hilos parseando a la vez"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        rows = sum(len(r[0]) for r in executor.map(lambda page: parse(*page), pages))
+    return time.perf_counter() - start, rows
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    pages = load_pages(count)
+    size_mb = sum(len(content) for _, _, content in pages) / 1e6
+
+    # Calentar: la primera llamada crea las instancias de los scrapers
+    for page in pages[:len(FIXTURES)]:
+        parse_html(*page)
+
+    single_time, single_rows = run_threaded(pages, parse_html, threads=workers)
+
+    pool = ParsePool(workers)
+    for page in pages[:workers]:
+        pool.parse(*page)
+    pool_time, pool_rows = run_threaded(pages, pool.parse, threads=workers)
+    pool.shutdown()
+
+    print(f"Páginas: {count} ({size_mb:.1f} MB), workers: {workers}")
+    print(f"Un proceso (hilos): {single_time:.2f}s  {count / single_time:6.1f} pág/s  {single_rows} ofertas")
+    print(f"ParsePool:          {pool_time:.2f}s  {count / pool_time:6.1f} pág/s  {pool_rows} ofertas")
+    print(f"Speedup:            {single_time / pool_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import List
+from typing import List, Dict
 
 load_dotenv()
 
@@ -8,16 +8,69 @@ load_dotenv()
 class Config:
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
     
+    # "polling" o "webhook" (servidor aiohttp propio; WEBHOOK_URL es la URL pública base)
+    BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+    
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
     REQUEST_DELAY = int(os.getenv("REQUEST_DELAY", "2"))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
     USE_SELENIUM = os.getenv("USE_SELENIUM", "false").lower() == "true"
     
+    # Páginas de listado por URL y conexiones simultáneas por host
+    MAX_PAGES = int(os.getenv("MAX_PAGES", "3"))
+    MAX_CONNECTIONS_PER_HOST = int(os.getenv("MAX_CONNECTIONS_PER_HOST", "2"))
+    
+    # Enlaces ya vistos seguidos tras los que se deja de parsear una página (0 = desactivado)
+    INCREMENTAL_STOP_RUN = int(os.getenv("INCREMENTAL_STOP_RUN", "3"))
+    # Ofertas relevantes que se conservan entre ciclos de scraping
+    MAX_KEPT_OFFERS = int(os.getenv("MAX_KEPT_OFFERS", "300"))
+    
+    # Filtro de Bloom de enlaces vistos: enlaces por capa y tasa de falsos positivos
+    SEEN_FILTER_CAPACITY = int(os.getenv("SEEN_FILTER_CAPACITY", "100000"))
+    SEEN_FILTER_ERROR_RATE = float(os.getenv("SEEN_FILTER_ERROR_RATE", "0.001"))
+    
+    # Casi-duplicados: similitud mínima (Jaccard estimado) y ventana de ofertas recientes
+    NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.7"))
+    NEAR_DUP_WINDOW_HOURS = float(os.getenv("NEAR_DUP_WINDOW_HOURS", "72"))
+    
+    # Scraping en segundo plano y avisos a suscriptores (0 = sin ciclo automático)
+    SCRAPE_INTERVAL_MINUTES = float(os.getenv("SCRAPE_INTERVAL_MINUTES", "30"))
+    NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "5"))
+    NOTIFY_MAX_OFFERS = int(os.getenv("NOTIFY_MAX_OFFERS", "10"))
+    # Límites de Telegram: ~30 mensajes/s en total y ~1 mensaje/s por chat
+    SEND_GLOBAL_RATE = float(os.getenv("SEND_GLOBAL_RATE", "25"))
+    SEND_CHAT_INTERVAL = float(os.getenv("SEND_CHAT_INTERVAL", "1.0"))
+    SEND_WORKERS = int(os.getenv("SEND_WORKERS", "4"))
+    # Resumen diario (/resumen): hora local de envío (-1 = desactivado), minutos para
+    # repartir los envíos y ofertas por resumen
+    DIGEST_HOUR = int(os.getenv("DIGEST_HOUR", "8"))
+    DIGEST_WINDOW_MINUTES = float(os.getenv("DIGEST_WINDOW_MINUTES", "30"))
+    DIGEST_MAX_OFFERS = int(os.getenv("DIGEST_MAX_OFFERS", "10"))
+    
+    # Updates atendidos a la vez (los comandos baratos pasan antes que los "Ofertas")
+    # y máximo de updates esperando turno antes de frenar la lectura de la cola
+    MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "8"))
+    MAX_QUEUED_UPDATES = int(os.getenv("MAX_QUEUED_UPDATES", "256"))
+    # "Ofertas" en curso a la vez (los scrapes van de uno en uno): siempre por debajo
+    # de MAX_CONCURRENT_UPDATES para que quede hueco para los comandos baratos
+    MAX_HEAVY_UPDATES = int(os.getenv("MAX_HEAVY_UPDATES", "1"))
+    
+    # Procesos para parsear HTML fuera del GIL (0 = parsear en el hilo del scraper)
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+    
     HTTP_PROXY = os.getenv("HTTP_PROXY")
     HTTPS_PROXY = os.getenv("HTTPS_PROXY")
     
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     
+    # Directorio para datos persistentes (memoria de selectores, etc.)
+    DATA_DIR = os.getenv("DATA_DIR", "data")
+    
     REVOLICO_URL = os.getenv(
         "REVOLICO_URL",
         "https://www.revolico.com/empleos"
@@ -44,11 +97,40 @@ class Config:
         keywords_str = os.getenv(
             "FILTER_KEYWORDS",
             "inteligencia artificial,ia,ai,machine learning,ml,deep learning,"
-            "diseño,design,designer,redacción,redactor,writer,content,contenido,"
+            "diseño,diseñador*,design,designer,redacción,redactor*,writer,content,contenido,"
             "automatización,automation,rpa,bot"
         )
         return [kw.strip().lower() for kw in keywords_str.split(",")]
     
+    # Ranking: ofertas navegables en la respuesta y vida media de la frescura
+    TOP_OFFERS = int(os.getenv("TOP_OFFERS", "30"))
+    # Paginación con botones: ofertas por página y snapshots de respuestas en memoria
+    OFFERS_PER_PAGE = int(os.getenv("OFFERS_PER_PAGE", "5"))
+    MAX_SNAPSHOTS = int(os.getenv("MAX_SNAPSHOTS", "200"))
+    # Memoria máxima (MB) para páginas HTML ya renderizadas (LRU)
+    RENDER_CACHE_MB = float(os.getenv("RENDER_CACHE_MB", "8"))
+    # "Ofertas" responde solo con lo nuevo desde la última consulta del chat (botón "Ver todas")
+    DELTA_REPLIES = os.getenv("DELTA_REPLIES", "true").lower() == "true"
+    # Modo inline (@bot texto): resultados por consulta y segundos que Telegram los cachea
+    INLINE_MAX_RESULTS = int(os.getenv("INLINE_MAX_RESULTS", "20"))
+    INLINE_CACHE_SECONDS = int(os.getenv("INLINE_CACHE_SECONDS", "60"))
+    # Segundos mínimos entre ediciones de la respuesta mientras llegan las fuentes
+    EDIT_MIN_INTERVAL = float(os.getenv("EDIT_MIN_INTERVAL", "1.0"))
+    FRESHNESS_HALF_LIFE_DAYS = float(os.getenv("FRESHNESS_HALF_LIFE_DAYS", "3"))
+    
+    @staticmethod
+    def get_source_weights() -> Dict[str, float]:
+        weights_str = os.getenv(
+            "SOURCE_WEIGHTS",
+            "CuCoders:1.0,Cubisima:1.0,Revolico:0.9"
+        )
+        weights = {}
+        for item in weights_str.split(","):
+            if ":" in item:
+                source, weight = item.split(":", 1)
+                weights[source.strip()] = float(weight)
+        return weights
+    
     @staticmethod
     def get_proxies():
         proxies = {}
@@ -62,3 +144,10 @@ class Config:
     def validate():
         if not Config.TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN is required in .env file")
+        if Config.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError("BOT_MODE must be 'polling' or 'webhook'")
+        if Config.BOT_MODE == "webhook":
+            if not Config.WEBHOOK_URL:
+                raise ValueError("WEBHOOK_URL is required when BOT_MODE=webhook")
+            if not Config.WEBHOOK_SECRET:
+                raise ValueError("WEBHOOK_SECRET is required when BOT_MODE=webhook")
@@ -0,0 +1,124 @@
+"""
+Digest - Resumen diario de ofertas generado por lotes
+A la hora configurada se hace una sola pasada por el OfferStore (ofertas
+vistas por primera vez en las últimas 24 horas) y se agrupan los chats con
+/resumen activado por perfil: los que comparten temas (o usan el filtro
+general) comparten también el renderizado. Los envíos se reparten a lo
+largo de una ventana con FanOutSender, en lugar de un pico a la misma hora.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from bot.config import Config
+from bot.notifier import FanOutSender
+from bot.utils.formatter import HTMLFormatter
+from bot.utils.logger import setup_logger
+from bot.utils.text import offer_search_text
+from filters.keyword_matcher import KeywordMatcher
+from filters.ranking import OfferRanker
+
+logger = setup_logger(__name__)
+
+DIGEST_PERIOD = 24 * 60 * 60
+
+Profile = Tuple[str, ...]
+# Páginas renderizadas una vez y chats que las reciben
+Digest = Tuple[List[str], List[int]]
+
+
+def seconds_until(hour: int, now: Optional[datetime] = None) -> float:
+    """Segundos hasta la próxima vez que el reloj local marque `hour`:00"""
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class DigestScheduler:
+
+    def __init__(
+        self,
+        scraper_manager,
+        subscriptions,
+        sender: FanOutSender,
+        hour: Optional[int] = None,
+        window_minutes: Optional[float] = None
+    ):
+        self.scraper_manager = scraper_manager
+        self.subscriptions = subscriptions
+        self.sender = sender
+        self.hour = hour if hour is not None else Config.DIGEST_HOUR
+        minutes = window_minutes if window_minutes is not None else Config.DIGEST_WINDOW_MINUTES
+        self.window = minutes * 60
+
+    async def run(self):
+        logger.info(f"Daily digest at {self.hour:02d}:00, delivered over {self.window / 60:g} minutes")
+        while True:
+            await asyncio.sleep(seconds_until(self.hour))
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                logger.error(f"Error building daily digest: {e}", exc_info=True)
+
+    async def run_cycle(self, now: Optional[float] = None) -> int:
+        """Genera todos los resúmenes y los encola; devuelve los chats que lo recibirán"""
+        # Los chats se agrupan aquí, en el bucle: los handlers modifican las suscripciones
+        # y el hilo no debe iterarlas. La pasada por el store y el renderizado van al hilo
+        groups = self.group_chats()
+        digests = await asyncio.to_thread(self.build, now, groups)
+        return self.deliver(digests)
+
+    def group_chats(self) -> Dict[Profile, List[int]]:
+        """Chats con /resumen agrupados por perfil; () es el filtro general"""
+        groups: Dict[Profile, List[int]] = {}
+        for chat_id in sorted(list(self.subscriptions.digest)):
+            profile = tuple(sorted(self.subscriptions.get(chat_id)))
+            groups.setdefault(profile, []).append(chat_id)
+        return groups
+
+    def build(
+        self,
+        now: Optional[float] = None,
+        groups: Optional[Dict[Profile, List[int]]] = None
+    ) -> Dict[Profile, Digest]:
+        now = time.time() if now is None else now
+        groups = self.group_chats() if groups is None else groups
+        if not groups:
+            return {}
+
+        # El store guarda también los duplicados que el ciclo en vivo descartó
+        offers = self.scraper_manager.dedupe_stored(self.scraper_manager.store.new_since(now - DIGEST_PERIOD))
+        texts = [offer_search_text(offer) for offer in offers]
+
+        digests: Dict[Profile, Digest] = {}
+        for profile, chats in groups.items():
+            matcher = KeywordMatcher(list(profile)) if profile else self.scraper_manager.job_filter.matcher
+            matching = [offer for offer, text in zip(offers, texts) if matcher.search(text)]
+            if not matching:
+                continue
+            top = OfferRanker(matcher).top_k(matching, Config.DIGEST_MAX_OFFERS)
+            digests[profile] = (list(HTMLFormatter.iter_digest_pages(top, len(matching))), chats)
+
+        logger.info(
+            f"Digest: {len(offers)} offers from the last 24h, "
+            f"{len(digests)}/{len(groups)} profiles with results"
+        )
+        return digests
+
+    def deliver(self, digests: Dict[Profile, Digest]) -> int:
+        """Encola cada resumen con su turno repartido uniformemente en la ventana"""
+        recipients = [(chat_id, pages) for pages, chats in digests.values() for chat_id in chats]
+        if not recipients:
+            return 0
+
+        start = time.monotonic()
+        step = self.window / len(recipients)
+        for position, (chat_id, pages) in enumerate(recipients):
+            for page in pages:
+                self.sender.enqueue(chat_id, page, not_before=start + position * step)
+
+        logger.info(f"Digest queued for {len(recipients)} chats over {self.window / 60:g} minutes")
+        return len(recipients)
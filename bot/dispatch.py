@@ -0,0 +1,174 @@
+"""
+Dispatch - Orden de atención de updates con prioridades
+Los comandos baratos (/start, /help, botones ◀ ▶, /buscar...) pasan delante
+de los pesados (los "Ofertas", que scrapean). Cada chat tiene como máximo un
+pedido pesado en curso y otro pendiente: las repeticiones mientras tanto se
+funden con el pendiente en vez de encolar más scrapes. Los pesados tienen su
+propio límite, por debajo del total: siempre queda hueco para los baratos.
+Expone profundidad de cola y tiempos de espera como métricas.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, List, Optional, Tuple
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from bot.config import Config
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PRIORITY_CHEAP = 0
+PRIORITY_HEAVY = 1
+_PRIORITY_NAMES = {PRIORITY_CHEAP: 'cheap', PRIORITY_HEAVY: 'heavy'}
+
+# Tiempos de espera recientes que se guardan por prioridad (para p95)
+_WAIT_SAMPLES = 500
+
+
+class PriorityUpdateProcessor(BaseUpdateProcessor):
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_heavy: Optional[int] = None):
+        # El semáforo de PTB solo acota cuántos updates esperan a la vez;
+        # el límite real de ejecución (y el orden) lo decide este procesador
+        super().__init__(max_concurrent_updates=Config.MAX_QUEUED_UPDATES)
+        self.slots = max_concurrent or Config.MAX_CONCURRENT_UPDATES
+        # Los pesados esperan un scrape que va de uno en uno: nunca ocupan todos los huecos
+        self.heavy_slots = max(1, min(max_heavy or Config.MAX_HEAVY_UPDATES, self.slots - 1))
+        self._heavy_limit = asyncio.Semaphore(self.heavy_slots)
+        self._heavy_waiting = 0
+        # Filtro de PTB que marca un update como pesado (lo fija TelegramBot.setup_handlers)
+        self.heavy_filter = None
+
+        self._active = 0
+        self._seq = itertools.count()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+        # Pedidos pesados por chat que tienen o esperan el lock: se borra al llegar a 0
+        self._chat_users: Dict[int, int] = {}
+        self._heavy_pending = set()
+
+        self.processed = {PRIORITY_CHEAP: 0, PRIORITY_HEAVY: 0}
+        self.collapsed = 0
+        self._waits: Dict[int, Deque[float]] = {
+            PRIORITY_CHEAP: deque(maxlen=_WAIT_SAMPLES),
+            PRIORITY_HEAVY: deque(maxlen=_WAIT_SAMPLES),
+        }
+
+    async def initialize(self) -> None:
+        logger.info(f"PriorityUpdateProcessor: {self.slots} updates concurrentes, {self.heavy_slots} pesados")
+
+    async def shutdown(self) -> None:
+        pass
+
+    def priority(self, update: object) -> int:
+        if isinstance(update, Update) and self.heavy_filter is not None and self.heavy_filter.check_update(update):
+            return PRIORITY_HEAVY
+        return PRIORITY_CHEAP
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        priority = self.priority(update)
+        if priority == PRIORITY_CHEAP:
+            await self._run(priority, coroutine, time.monotonic())
+            return
+
+        chat = update.effective_chat
+        chat_id = chat.id if chat else 0
+        if chat_id in self._heavy_pending:
+            # Ya hay uno esperando para este chat: responderá también a esta repetición
+            self.collapsed += 1
+            logger.info(f"Collapsed repeated heavy request from chat {chat_id}")
+            coroutine.close()
+            return
+
+        enqueued = time.monotonic()
+        self._heavy_pending.add(chat_id)
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        self._chat_users[chat_id] = self._chat_users.get(chat_id, 0) + 1
+        waiting = True
+        try:
+            async with lock:
+                # Empieza el turno de este chat: una repetición a partir de ahora será el próximo pendiente
+                waiting = False
+                self._heavy_pending.discard(chat_id)
+                self._heavy_waiting += 1
+                try:
+                    await self._heavy_limit.acquire()
+                finally:
+                    self._heavy_waiting -= 1
+                try:
+                    await self._run(priority, coroutine, enqueued)
+                finally:
+                    self._heavy_limit.release()
+        finally:
+            # Solo el pedido que sigue esperando (cancelado) es dueño del hueco pendiente
+            if waiting:
+                self._heavy_pending.discard(chat_id)
+            # Al soltar el lock el siguiente aún no lo tomó: se cuenta a quien espera, no lock.locked()
+            self._chat_users[chat_id] -= 1
+            if not self._chat_users[chat_id]:
+                del self._chat_users[chat_id]
+                del self._chat_locks[chat_id]
+
+    async def _run(self, priority: int, coroutine: Awaitable[Any], enqueued: float):
+        await self._acquire(priority)
+        self._waits[priority].append(time.monotonic() - enqueued)
+        try:
+            await coroutine
+        finally:
+            self.processed[priority] += 1
+            self._release()
+
+    async def _acquire(self, priority: int):
+        if self._active < self.slots and not self._waiters:
+            self._active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Si el hueco ya se nos había cedido, se le pasa al siguiente
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        # El hueco pasa directamente al siguiente en espera por prioridad (y orden de llegada)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    @property
+    def queue_depth(self) -> Dict[str, int]:
+        depth = {name: 0 for name in _PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depth[_PRIORITY_NAMES[priority]] += 1
+        depth[_PRIORITY_NAMES[PRIORITY_HEAVY]] += self._heavy_waiting
+        return depth
+
+    def metrics(self) -> Dict[str, Any]:
+        waits = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            waits[_PRIORITY_NAMES[priority]] = {
+                'avg_ms': round(1000 * sum(ordered) / len(ordered), 1) if ordered else 0.0,
+                'p95_ms': round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 1) if ordered else 0.0,
+                'max_ms': round(1000 * ordered[-1], 1) if ordered else 0.0,
+            }
+        return {
+            'active': self._active,
+            'queue_depth': self.queue_depth,
+            'heavy_pending_chats': len(self._heavy_pending),
+            'processed': {_PRIORITY_NAMES[p]: count for p, count in self.processed.items()},
+            'collapsed': self.collapsed,
+            'wait': waits,
+        }
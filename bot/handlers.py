@@ -1,9 +1,20 @@
-from telegram import Update
+import html
+import time
+from contextlib import aclosing
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
+from telegram.error import BadRequest, TelegramError
 from scrapers.scraper_manager import ScraperManager
 from bot.utils.formatter import HTMLFormatter
+from bot.pager import OfferPager, Snapshot
 from bot.utils.logger import setup_logger
+from bot.utils.text import offer_search_text
+from filters.prefix_index import PrefixIndex
+from filters.subscriptions import SubscriptionStore
+from filters.ranking import OfferRanker
+from bot.config import Config
+from storage.offer_store import link_hash
 
 logger = setup_logger(__name__)
 
@@ -13,6 +24,9 @@ class BotHandlers:
     def __init__(self):
         self.scraper_manager = ScraperManager()
         self.formatter = HTMLFormatter()
+        self.subscriptions = SubscriptionStore()
+        self.pager = OfferPager()
+        self.inline_index = PrefixIndex()
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
@@ -36,6 +50,9 @@ El bot buscará automáticamente en:
 📝 Redacción
 🤖 Automatizaciones
 
+¿Buscas otra cosa? Elige tus temas con /suscribir
+o busca en el historial con /buscar
+
 <i>¡Empieza ahora escribiendo "Ofertas"!</i>"""
         
         await update.message.reply_text(
@@ -51,7 +68,12 @@ El bot buscará automáticamente en:
 <b>Comandos disponibles:</b>
 /start - Inicia el bot y muestra el mensaje de bienvenida
 /help - Muestra este mensaje de ayuda
-<code>Ofertas</code> - Busca ofertas laborales actuales
+<code>Ofertas</code> - Busca ofertas laborales (tras la primera vez, solo las nuevas)
+/suscribir <code>tema1, tema2</code> - Filtra las ofertas por tus propios temas
+/desuscribir - Vuelve al filtro general
+/buscar <code>términos</code> - Busca en las ofertas ya guardadas (al instante)
+/resumen - Activa o desactiva el resumen diario de ofertas
+<code>@nombre_del_bot texto</code> - Busca ofertas por título desde cualquier chat
 
 <b>¿Qué hace este bot?</b>
 Busca ofertas de trabajo en múltiples plataformas cubanas y las filtra según tus intereses:
@@ -74,17 +96,25 @@ Busca ofertas de trabajo en múltiples plataformas cubanas y las filtra según t
     
     async def ofertas_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
+        chat_id = update.effective_chat.id
         logger.info(f"User {user.id} ({user.username}) requested job offers")
         
+        # Cursor leído antes del scrape: lo que aparezca ahora cuenta como nuevo
+        since = self._delta_cursor(chat_id)
+        
         searching_msg = await update.message.reply_text(
             self.formatter.format_searching_message(),
             parse_mode=ParseMode.HTML
         )
         
         try:
-            offers = await self.scraper_manager.scrape_all()
+            await self._scrape_progressively(chat_id, searching_msg, since)
+            # Cursor por versión de los datos, no la hora del pedido: los chats que preguntan
+            # con la misma versión comparten cursor y con él snapshots y páginas renderizadas
+            seen_until = self.scraper_manager.version_time
             
-            result_html = self.formatter.format_job_offers(offers)
+            snapshot = self._offers_snapshot(chat_id, since)
+            offers = snapshot.offers
             
             # Agregar métricas al final (si están disponibles)
             metrics_summary = ""
@@ -114,39 +144,21 @@ Busca ofertas de trabajo en múltiples plataformas cubanas y las filtra según t
             except:
                 pass
             
-            full_message = result_html + metrics_summary
-            
-            # Telegram tiene un límite de 4096 caracteres por mensaje
-            MAX_MESSAGE_LENGTH = 4000  # Dejamos margen de seguridad
+            # Solo la página 1; ◀ ▶ renderizan las demás bajo demanda desde el snapshot
+            text, keyboard = self.pager.render(snapshot.id, 0)
+            # Las estadísticas son opcionales: solo si la página 1 sigue cabiendo en un mensaje
+            if metrics_summary and self.formatter.fits(text + metrics_summary):
+                text += metrics_summary
+            await searching_msg.edit_text(
+                text,
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True,
+                reply_markup=keyboard
+            )
             
-            if len(full_message) <= MAX_MESSAGE_LENGTH:
-                # El mensaje cabe en un solo envío
-                await searching_msg.edit_text(
-                    full_message,
-                    parse_mode=ParseMode.HTML,
-                    disable_web_page_preview=True
-                )
-            else:
-                # Dividir el mensaje en partes
-                # Primero eliminamos el mensaje de "buscando..."
-                await searching_msg.delete()
-                
-                # Dividir por ofertas individuales para no cortar a mitad de una oferta
-                parts = self._split_message_by_offers(full_message, MAX_MESSAGE_LENGTH)
-                
-                for i, part in enumerate(parts):
-                    if i == 0:
-                        header = f"<b>📋 Ofertas de trabajo ({i+1}/{len(parts)})</b>\n\n"
-                    else:
-                        header = f"<b>📋 Continuación ({i+1}/{len(parts)})</b>\n\n"
-                    
-                    await update.message.reply_text(
-                        header + part,
-                        parse_mode=ParseMode.HTML,
-                        disable_web_page_preview=True
-                    )
+            self.scraper_manager.store.set_cursor(chat_id, seen_until)
             
-            logger.info(f"Successfully sent {len(offers)} offers to user {user.id}")
+            logger.info(f"Successfully sent {len(offers)} {'new ' if since else ''}offers to user {user.id}")
         
         except Exception as e:
             logger.error(f"Error processing ofertas request: {str(e)}", exc_info=True)
@@ -157,31 +169,228 @@ Busca ofertas de trabajo en múltiples plataformas cubanas y las filtra según t
                 parse_mode=ParseMode.HTML
             )
     
-    def _split_message_by_offers(self, message: str, max_length: int) -> list:
-        """Divide el mensaje en partes respetando el límite de caracteres."""
-        parts = []
-        current_part = ""
-        
-        # Dividir por doble salto de línea (separador típico entre ofertas)
-        sections = message.split("\n\n")
-        
-        for section in sections:
-            # Si agregar esta sección excede el límite
-            if len(current_part) + len(section) + 2 > max_length:
-                if current_part:
-                    parts.append(current_part.strip())
-                current_part = section
-            else:
-                if current_part:
-                    current_part += "\n\n" + section
+    def _delta_cursor(self, chat_id: int) -> float:
+        """first_seen a partir del cual responder solo con lo nuevo; 0 = lista completa"""
+        if not Config.DELTA_REPLIES:
+            return 0.0
+        return self.scraper_manager.store.get_cursor(chat_id) or 0.0
+    
+    async def _scrape_progressively(self, chat_id: int, message, since: float = 0.0):
+        """Scrapea y, según termina cada fuente, muestra la página 1 con lo que ya hay
+        
+        Las ediciones intermedias se espacian EDIT_MIN_INTERVAL segundos (límite de
+        Telegram); la final, con todas las fuentes, la hace ofertas_handler.
+        """
+        sources = [scraper.source_name for scraper in self.scraper_manager.scrapers]
+        done = []
+        last_edit = time.monotonic()
+        
+        async with aclosing(self.scraper_manager.iter_source_results()) as results:
+            async for result in results:
+                done.append(result)
+                finished = {r.source for r in done}
+                pending = [source for source in sources if source not in finished]
+                
+                if not pending or time.monotonic() - last_edit < Config.EDIT_MIN_INTERVAL:
+                    continue
+                
+                snapshot = self._offers_snapshot(chat_id, since)
+                if not snapshot.offers:
+                    continue
+                
+                text, keyboard = self.pager.render(snapshot.id, 0)
+                progress = self.formatter.format_progress(done, pending)
+                if self.formatter.fits(progress + text):
+                    text = progress + text
+                try:
+                    await message.edit_text(
+                        text,
+                        parse_mode=ParseMode.HTML,
+                        disable_web_page_preview=True,
+                        reply_markup=keyboard
+                    )
+                    last_edit = time.monotonic()
+                except TelegramError as e:
+                    # Una edición intermedia perdida no importa: la final llega igual
+                    logger.warning(f"Skipped progress edit: {e}")
+    
+    def _offers_snapshot(self, chat_id: int, since: float = 0.0) -> Snapshot:
+        """Ofertas ordenadas para el perfil del chat (temas propios o filtro general)
+        
+        Con `since` devuelve la vista delta (solo first_seen > since), enlazada
+        al snapshot completo para el botón "Ver todas".
+        """
+        matcher = self.subscriptions.matcher_for(chat_id)
+        profile = tuple(matcher.keywords) if matcher else ()
+        version = self.scraper_manager.version
+        
+        def builder(since: float):
+            def build():
+                if matcher:
+                    # Con temas propios se filtra sobre todas las ofertas recientes
+                    offers = [
+                        offer for offer in self.scraper_manager.recent_offers
+                        if matcher.search(offer_search_text(offer))
+                    ]
                 else:
-                    current_part = section
+                    offers = self.scraper_manager.matched_offers
+                if since:
+                    offers = [offer for offer in offers if offer.get('first_seen', 0.0) > since]
+                
+                # Solo las mejores N, ordenadas una vez por snapshot
+                ranker = OfferRanker(matcher or self.scraper_manager.job_filter.matcher)
+                return ranker.top_k(offers, Config.TOP_OFFERS), len(offers)
+            return build
+        
+        full = self.pager.snapshot(version, profile, builder(0.0))
+        if not since:
+            return full
+        return self.pager.snapshot(version, profile, builder(since), since=since, full_id=full.id)
+    
+    async def page_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        query = update.callback_query
+        target = OfferPager.parse_callback(query.data)
+        if target is None:
+            await query.answer()
+            return
+        
+        rendered = self.pager.render(*target)
+        if rendered is None:
+            await query.answer("Esta lista ya caducó. Escribe Ofertas para verla actualizada.", show_alert=True)
+            return
         
-        # Agregar la última parte
-        if current_part:
-            parts.append(current_part.strip())
+        text, keyboard = rendered
+        await query.answer()
+        try:
+            await query.edit_message_text(
+                text,
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True,
+                reply_markup=keyboard
+            )
+        except BadRequest as e:
+            # Doble pulsación: la página ya es la que se muestra
+            if "not modified" not in str(e).lower():
+                raise
+    
+    async def inline_query_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        query = update.inline_query
+        manager = self.scraper_manager
+        # Solo memoria: el índice se pone al día con la diferencia si hubo ofertas nuevas
+        self.inline_index.sync(manager.version, manager.recent_offers)
         
-        return parts if parts else [message[:max_length]]
+        # Telegram rechaza más de 50 resultados por respuesta inline
+        limit = min(Config.INLINE_MAX_RESULTS, 50)
+        if query.query.strip():
+            offers = self.inline_index.search(query.query, limit=limit)
+        else:
+            offers = manager.matched_offers[:limit]
+        
+        results = [
+            InlineQueryResultArticle(
+                id=str(link_hash(offer['link'])),
+                title=offer['title'],
+                description=f"{offer['company']} · {offer['source']}",
+                url=offer['link'],
+                input_message_content=InputTextMessageContent(
+                    self.formatter.format_shared_offer(offer),
+                    parse_mode=ParseMode.HTML,
+                    disable_web_page_preview=True
+                )
+            )
+            for offer in offers
+        ]
+        await query.answer(results, cache_time=Config.INLINE_CACHE_SECONDS)
+    
+    async def subscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        chat_id = update.effective_chat.id
+        text = " ".join(context.args or [])
+        topics = self.subscriptions.subscribe(chat_id, text.split(",")) if text.strip() else []
+        
+        if not topics:
+            topics = self.subscriptions.get(chat_id)
+            current = html.escape(", ".join(topics)) if topics else "ninguno (filtro general)"
+            message = f"""<b>🔔 Tus temas</b>
+
+Actualmente: <i>{current}</i>
+
+Para cambiarlos escribe los temas separados por comas:
+<code>/suscribir python, community manager, diseñador*</code>
+
+<i>Un * al final busca por prefijo (diseñador* incluye diseñadora).</i>"""
+        else:
+            logger.info(f"User {update.effective_user.id} subscribed to {len(topics)} topics")
+            message = f"""<b>✅ Suscripción actualizada</b>
+
+Tus temas: <i>{html.escape(", ".join(topics))}</i>
+
+Te avisaré cuando aparezcan ofertas nuevas sobre ellos.
+Escribe <code>Ofertas</code> para ver las que ya hay."""
+        
+        await update.message.reply_text(
+            message,
+            parse_mode=ParseMode.HTML
+        )
+    
+    async def search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        query = " ".join(context.args or []).strip()
+        
+        if not query:
+            await update.message.reply_text(
+                "<b>🔎 Buscar en el historial</b>\n\n"
+                "Escribe qué buscas: <code>/buscar python</code> o <code>/buscar community manager</code>",
+                parse_mode=ParseMode.HTML
+            )
+            return
+        
+        # Solo el índice FTS5 de ofertas guardadas: no se lanza ningún scraper
+        offers = self.scraper_manager.store.search(query, limit=Config.TOP_OFFERS)
+        logger.info(f"User {update.effective_user.id} searched '{query}': {len(offers)} results")
+        
+        for page in self.formatter.iter_search_pages(query, offers):
+            await update.message.reply_text(
+                page,
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True
+            )
+    
+    async def digest_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        chat_id = update.effective_chat.id
+        if Config.DIGEST_HOUR < 0:
+            await update.message.reply_text("El resumen diario no está disponible en este bot.")
+            return
+        
+        enabled = chat_id not in self.subscriptions.digest
+        self.subscriptions.set_digest(chat_id, enabled)
+        
+        if enabled:
+            topics = self.subscriptions.get(chat_id)
+            scope = html.escape(", ".join(topics)) if topics else "el filtro general"
+            message = f"""<b>☀️ Resumen diario activado</b>
+
+Cada día a las {Config.DIGEST_HOUR:02d}:00 recibirás las mejores ofertas nuevas de las últimas 24 horas para <i>{scope}</i>.
+
+Escribe /resumen otra vez para desactivarlo."""
+        else:
+            message = "<b>🌙 Resumen diario desactivado</b>\n\nEscribe /resumen cuando quieras volver a recibirlo."
+        
+        await update.message.reply_text(
+            message,
+            parse_mode=ParseMode.HTML
+        )
+    
+    async def unsubscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        removed = self.subscriptions.unsubscribe(update.effective_chat.id)
+        
+        if removed:
+            message = "<b>🔕 Suscripción cancelada</b>\n\nYa no recibirás avisos y vuelves al filtro general."
+        else:
+            message = "No tenías temas guardados. Usa /suscribir para elegirlos."
+        
+        await update.message.reply_text(
+            message,
+            parse_mode=ParseMode.HTML
+        )
     
     async def unknown_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.debug(f"User {update.effective_user.id} sent unknown command: {update.message.text}")
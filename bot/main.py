@@ -1,8 +1,14 @@
 import sys
+import asyncio
+import signal
 from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, InlineQueryHandler, MessageHandler, filters
 from bot.config import Config
+from bot.digest import DigestScheduler
+from bot.dispatch import PriorityUpdateProcessor
 from bot.handlers import BotHandlers
+from bot.notifier import FanOutSender, OfferNotifier
+from bot.webhook import WebhookServer
 from bot.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -20,14 +26,26 @@ class TelegramBot:
         self.token = Config.TELEGRAM_BOT_TOKEN
         self.handlers = BotHandlers()
         self.application = None
+        self.update_processor = PriorityUpdateProcessor()
+        self.sender = None
+        self.background_tasks = []
         logger.info("TelegramBot initialized successfully")
     
     def setup_handlers(self):
         self.application.add_handler(CommandHandler("start", self.handlers.start_command))
         self.application.add_handler(CommandHandler("help", self.handlers.help_command))
+        self.application.add_handler(CommandHandler("suscribir", self.handlers.subscribe_command))
+        self.application.add_handler(CommandHandler("desuscribir", self.handlers.unsubscribe_command))
+        self.application.add_handler(CommandHandler("buscar", self.handlers.search_command))
+        self.application.add_handler(CommandHandler("resumen", self.handlers.digest_command))
+        
+        self.application.add_handler(CallbackQueryHandler(self.handlers.page_callback, pattern=r'^pg:'))
+        self.application.add_handler(InlineQueryHandler(self.handlers.inline_query_handler))
         
         ofertas_filter = filters.TEXT & filters.Regex(r'(?i)^ofertas$')
         self.application.add_handler(MessageHandler(ofertas_filter, self.handlers.ofertas_handler))
+        # "Ofertas" scrapea: va detrás de los comandos baratos y uno por chat a la vez
+        self.update_processor.heavy_filter = ofertas_filter
         
         self.application.add_handler(
             MessageHandler(filters.COMMAND, self.handlers.unknown_command)
@@ -41,6 +59,26 @@ class TelegramBot:
         logger.info("Bot is starting up...")
         bot_info = await application.bot.get_me()
         logger.info(f"Bot @{bot_info.username} is ready to receive messages")
+        
+        # Ciclos propios con asyncio (sin depender del extra job-queue de PTB)
+        subscriptions = self.handlers.subscriptions
+        if Config.SCRAPE_INTERVAL_MINUTES > 0 or Config.DIGEST_HOUR >= 0:
+            self.sender = FanOutSender(application.bot, on_blocked=subscriptions.forget)
+            self.sender.start()
+        if Config.SCRAPE_INTERVAL_MINUTES > 0:
+            notifier = OfferNotifier(self.handlers.scraper_manager, subscriptions, self.sender)
+            self.background_tasks.append(asyncio.create_task(notifier.run()))
+        if Config.DIGEST_HOUR >= 0:
+            digest = DigestScheduler(self.handlers.scraper_manager, subscriptions, self.sender)
+            self.background_tasks.append(asyncio.create_task(digest.run()))
+    
+    async def post_stop(self, application: Application):
+        for task in self.background_tasks:
+            task.cancel()
+        await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        self.background_tasks = []
+        if self.sender:
+            await self.sender.stop()
     
     async def post_shutdown(self, application: Application):
         logger.info("Bot is shutting down...")
@@ -52,17 +90,57 @@ class TelegramBot:
             Application.builder()
             .token(self.token)
             .post_init(self.post_init)
+            .post_stop(self.post_stop)
             .post_shutdown(self.post_shutdown)
+            .concurrent_updates(self.update_processor)
             .build()
         )
         
         self.setup_handlers()
         
+        if Config.BOT_MODE == "webhook":
+            logger.info("Starting bot in webhook mode...")
+            asyncio.run(self.run_webhook())
+            return
+        
         logger.info("Starting bot polling...")
         self.application.run_polling(
             allowed_updates=Update.ALL_TYPES,
             drop_pending_updates=True
         )
+    
+    async def run_webhook(self):
+        """Ciclo de vida de la Application con nuestro servidor aiohttp en vez del updater de PTB"""
+        application = self.application
+        server = WebhookServer(application, metrics=self.update_processor.metrics)
+        stop_event = asyncio.Event()
+        
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+        
+        await application.initialize()
+        # post_init/post_stop/post_shutdown solo los llama PTB en run_polling/run_webhook
+        await self.post_init(application)
+        try:
+            await server.start()
+            await application.bot.set_webhook(
+                url=Config.WEBHOOK_URL.rstrip('/') + server.path,
+                secret_token=Config.WEBHOOK_SECRET,
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=True
+            )
+            await application.start()
+            logger.info("Bot is receiving updates via webhook")
+            
+            await stop_event.wait()
+        finally:
+            await server.stop()
+            if application.running:
+                await application.stop()
+            await self.post_stop(application)
+            await application.shutdown()
+            await self.post_shutdown(application)
 
 
 def main():
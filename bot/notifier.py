@@ -0,0 +1,263 @@
+"""
+Notifier - Envío de ofertas nuevas a los suscriptores
+Un ciclo de scraping en segundo plano detecta las ofertas nunca vistas y las
+reparte con el índice de suscripciones; FanOutSender las envía respetando
+los límites de Telegram (global y por chat), agrupa varias ofertas por
+mensaje y reintenta tras RetryAfter. Un scrape por ciclo sirve a todos los
+usuarios, en lugar de un scrape por cada "Ofertas".
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TelegramError
+from bot.config import Config
+from bot.utils.formatter import HTMLFormatter
+from bot.utils.logger import setup_logger
+from filters.ranking import OfferRanker
+
+logger = setup_logger(__name__)
+
+# Turno de un chat que un worker está atendiendo: no se vuelve a encolar hasta que termine
+_SERVING = float('-inf')
+
+
+class RateLimiter:
+    """Espaciado mínimo entre envíos: `rate` mensajes por segundo como máximo"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = max(now, self._next) + self.interval
+
+
+class FanOutSender:
+    """Cola de mensajes por chat servida por varios workers
+
+    Cada chat tiene su propia cola y un turno (heap por hora de envío
+    permitida), así un chat con RetryAfter o muchos mensajes no bloquea a
+    los demás. Un chat tiene un solo turno vigente: nunca lo atienden dos
+    workers a la vez y sus mensajes salen en orden. Cada mensaje guarda su
+    propio `not_before`: un resumen diferido no retrasa un push inmediato.
+    """
+
+    def __init__(
+        self,
+        bot,
+        global_rate: Optional[float] = None,
+        chat_interval: Optional[float] = None,
+        workers: Optional[int] = None,
+        on_blocked: Optional[Callable[[int], object]] = None
+    ):
+        self.bot = bot
+        self.limiter = RateLimiter(global_rate if global_rate is not None else Config.SEND_GLOBAL_RATE)
+        self.chat_interval = chat_interval if chat_interval is not None else Config.SEND_CHAT_INTERVAL
+        self.workers = workers or Config.SEND_WORKERS
+        # Usuarios que bloquearon el bot: se les deja de enviar (p. ej. se desuscriben)
+        self.on_blocked = on_blocked
+
+        # chat -> [(texto, intentos, not_before)]
+        self._pending: Dict[int, Deque[Tuple[str, int, float]]] = {}
+        self._turns: List[Tuple[float, int, int]] = []
+        # chat -> hora de su turno vigente (_SERVING mientras un worker lo atiende);
+        # las entradas del heap que no coinciden quedaron obsoletas y se descartan
+        self._scheduled: Dict[int, float] = {}
+        self._next_allowed: Dict[int, float] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+        self.sent = 0
+        self.retried = 0
+        self.dropped = 0
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+            logger.info(f"FanOutSender iniciado con {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, chat_id: int, text: str, not_before: float = 0.0):
+        """Encola un mensaje; `not_before` (time.monotonic) retrasa solo este mensaje"""
+        self._pending.setdefault(chat_id, deque()).append((text, 0, not_before))
+        self._schedule(chat_id, max(self._next_allowed.get(chat_id, 0.0), not_before))
+
+    def notify(self, chat_id: int, offers: List[Dict[str, str]], batch_size: Optional[int] = None):
+        """Encola las ofertas en mensajes de `batch_size` ofertas"""
+        batch_size = batch_size or Config.NOTIFY_BATCH_SIZE
+        batches = [offers[i:i + batch_size] for i in range(0, len(offers), batch_size)]
+        for number, batch in enumerate(batches, 1):
+            self.enqueue(chat_id, HTMLFormatter.format_new_offers(batch, number, len(batches)))
+
+    @property
+    def queued(self) -> int:
+        return sum(len(messages) for messages in self._pending.values())
+
+    async def join(self):
+        """Espera a que se vacíen todas las colas (para tests y apagado ordenado)"""
+        while self._pending:
+            await asyncio.sleep(0.01)
+
+    def _schedule(self, chat_id: int, at: float):
+        """Da turno al chat en `at`, o lo adelanta si ya tenía uno más tarde"""
+        current = self._scheduled.get(chat_id)
+        if current is not None and current <= at:
+            return
+        self._scheduled[chat_id] = at
+        heapq.heappush(self._turns, (at, next(self._seq), chat_id))
+        self._wakeup.set()
+
+    async def _next_turn(self) -> int:
+        while True:
+            if not self._turns:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            at, _, chat_id = self._turns[0]
+            if self._scheduled.get(chat_id) != at:
+                heapq.heappop(self._turns)
+                continue
+
+            delay = at - time.monotonic()
+            if delay <= 0:
+                heapq.heappop(self._turns)
+                self._scheduled[chat_id] = _SERVING
+                return chat_id
+
+            # Dormir hasta el turno o hasta que llegue uno más temprano
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._next_turn()
+            retry_at = await self._send_next(chat_id)
+
+            del self._scheduled[chat_id]
+            messages = self._pending.get(chat_id)
+            if messages:
+                ready = min(not_before for _, _, not_before in messages)
+                self._schedule(chat_id, max(retry_at or self._next_allowed.get(chat_id, 0.0), ready))
+            else:
+                self._pending.pop(chat_id, None)
+
+    async def _send_next(self, chat_id: int) -> Optional[float]:
+        """Envía el primer mensaje listo del chat; devuelve la hora del reintento si hay que esperar"""
+        messages = self._pending[chat_id]
+        now = time.monotonic()
+        index = next((i for i, (_, _, not_before) in enumerate(messages) if not_before <= now), None)
+        if index is None:
+            return None
+        text, attempts, not_before = messages[index]
+
+        await self.limiter.wait()
+        try:
+            await self.bot.send_message(
+                chat_id,
+                text,
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True
+            )
+        except RetryAfter as e:
+            # Telegram dice cuánto esperar: el mensaje se queda primero en la cola
+            self.retried += 1
+            wait = float(e.retry_after)
+            logger.warning(f"RetryAfter {wait}s sending to chat {chat_id}")
+            return time.monotonic() + wait
+        except Forbidden:
+            logger.info(f"Chat {chat_id} blocked the bot, dropping {len(messages)} messages")
+            self.dropped += len(messages)
+            messages.clear()
+            if self.on_blocked:
+                self.on_blocked(chat_id)
+            return None
+        except BadRequest as e:
+            # Mensaje inválido (HTML, chat inexistente): reintentar no sirve
+            logger.error(f"Bad request sending to chat {chat_id}: {e}")
+            del messages[index]
+            self.dropped += 1
+            return None
+        except NetworkError as e:
+            if attempts + 1 < Config.MAX_RETRIES:
+                self.retried += 1
+                messages[index] = (text, attempts + 1, not_before)
+                return time.monotonic() + 2 ** attempts
+            logger.error(f"Giving up sending to chat {chat_id}: {e}")
+            del messages[index]
+            self.dropped += 1
+            return None
+        except TelegramError as e:
+            logger.error(f"Error sending to chat {chat_id}: {e}")
+            del messages[index]
+            self.dropped += 1
+            return None
+
+        del messages[index]
+        self.sent += 1
+        self._next_allowed[chat_id] = time.monotonic() + self.chat_interval
+        return None
+
+
+class OfferNotifier:
+    """Ciclo de scraping en segundo plano que avisa a los suscriptores de lo nuevo"""
+
+    def __init__(self, scraper_manager, subscriptions, sender: FanOutSender, interval_minutes: Optional[float] = None):
+        self.scraper_manager = scraper_manager
+        self.subscriptions = subscriptions
+        self.sender = sender
+        minutes = interval_minutes if interval_minutes is not None else Config.SCRAPE_INTERVAL_MINUTES
+        self.interval = minutes * 60
+        # Con el historial vacío todo parece nuevo: el primer ciclo solo llena el store
+        self._primed = len(scraper_manager.store) > 0
+
+    async def run(self):
+        logger.info(f"Background scraping every {self.interval / 60:g} minutes")
+        while True:
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                logger.error(f"Error in background scrape cycle: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_cycle(self) -> int:
+        """Un scrape y el reparto de las ofertas nuevas; devuelve los chats avisados"""
+        await self.scraper_manager.scrape_all()
+        # No solo las de este scrape: también las que encontró antes un "Ofertas" de un usuario
+        new_offers = self.scraper_manager.take_unnotified()
+
+        if not self._primed:
+            self._primed = True
+            logger.info(f"First cycle on an empty store: {len(new_offers)} offers stored, no pushes")
+            return 0
+        if not new_offers or not len(self.subscriptions.index):
+            return 0
+
+        by_chat = self.subscriptions.index.match_offers(new_offers)
+        for chat_id, offers in by_chat.items():
+            # Tras una caída larga puede haber muchas: solo las mejores para sus temas
+            ranker = OfferRanker(self.subscriptions.matcher_for(chat_id))
+            self.sender.notify(chat_id, ranker.top_k(offers, Config.NOTIFY_MAX_OFFERS))
+
+        logger.info(f"Notifying {len(by_chat)} chats about {len(new_offers)} new offers")
+        return len(by_chat)
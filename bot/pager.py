@@ -0,0 +1,154 @@
+"""
+Pager - Respuestas de "Ofertas" paginadas con botones ◀ ▶
+Cada respuesta apunta a un snapshot: la lista ya ordenada de ofertas para
+una versión de los datos y un perfil (filtro general o temas del usuario).
+Al pulsar un botón se renderiza solo la página pedida desde el snapshot y
+se edita el mensaje; las páginas ya renderizadas van a un RenderCache LRU
+por (versión, perfil, cursor, página) que comparten todos los chats con el
+mismo filtro. Un snapshot "delta" (solo lo visto por primera vez
+después del cursor del chat) enlaza con el completo en un botón "Ver todas";
+el cursor es el de la versión de su última consulta, así que los chats que
+preguntaron con la misma versión comparten el delta.
+"""
+
+import itertools
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from bot.config import Config
+from bot.utils.formatter import HTMLFormatter
+from bot.utils.logger import setup_logger
+from bot.utils.render_cache import RenderCache
+
+logger = setup_logger(__name__)
+
+CALLBACK_PREFIX = "pg"
+NOOP = f"{CALLBACK_PREFIX}:noop"
+
+Profile = Tuple[str, ...]
+
+
+class Snapshot:
+
+    __slots__ = ('id', 'version', 'profile', 'offers', 'total', 'since', 'full_id')
+
+    def __init__(
+        self,
+        snapshot_id: int,
+        version: int,
+        profile: Profile,
+        offers: List[Dict[str, str]],
+        total: int,
+        since: float = 0.0,
+        full_id: Optional[int] = None
+    ):
+        self.id = snapshot_id
+        self.version = version
+        self.profile = profile
+        self.offers = offers
+        self.total = total
+        # Delta: solo ofertas con first_seen > since; full_id es el snapshot con todas
+        self.since = since
+        self.full_id = full_id
+
+
+class OfferPager:
+
+    def __init__(
+        self,
+        per_page: Optional[int] = None,
+        max_snapshots: Optional[int] = None,
+        renders: Optional[RenderCache] = None
+    ):
+        self.per_page = per_page or Config.OFFERS_PER_PAGE
+        self.max_snapshots = max_snapshots or Config.MAX_SNAPSHOTS
+        self._ids = itertools.count(1)
+        self.snapshots: "OrderedDict[int, Snapshot]" = OrderedDict()
+        self._by_key: Dict[Tuple[int, Profile, float], int] = {}
+        self.renders = renders or RenderCache()
+        self.version = 0
+
+    def snapshot(
+        self,
+        version: int,
+        profile: Profile,
+        build: Callable[[], Tuple[List[Dict[str, str]], int]],
+        since: float = 0.0,
+        full_id: Optional[int] = None
+    ) -> Snapshot:
+        """Snapshot de (versión, perfil, cursor); `build` (ofertas ordenadas, total) solo corre la primera vez"""
+        key = (version, profile, since)
+        snapshot_id = self._by_key.get(key)
+        if snapshot_id in self.snapshots:
+            self.snapshots.move_to_end(snapshot_id)
+            return self.snapshots[snapshot_id]
+
+        if version > self.version:
+            # Datos nuevos: las páginas de versiones anteriores ya solo ocupan memoria
+            self.version = version
+            self.renders.discard_older(version)
+
+        offers, total = build()
+        snapshot = Snapshot(next(self._ids), version, profile, offers, total, since, full_id)
+        self.snapshots[snapshot.id] = snapshot
+        self._by_key[key] = snapshot.id
+
+        while len(self.snapshots) > self.max_snapshots:
+            self._evict(next(iter(self.snapshots)))
+        return snapshot
+
+    def _evict(self, snapshot_id: int):
+        snapshot = self.snapshots.pop(snapshot_id)
+        self._by_key.pop((snapshot.version, snapshot.profile, snapshot.since), None)
+
+    def page_count(self, snapshot: Snapshot) -> int:
+        return max(1, -(-len(snapshot.offers) // self.per_page))
+
+    def render(self, snapshot_id: int, page: int) -> Optional[Tuple[str, Optional[InlineKeyboardMarkup]]]:
+        """Texto y teclado de una página; None si el snapshot ya no existe"""
+        snapshot = self.snapshots.get(snapshot_id)
+        if snapshot is None:
+            return None
+
+        pages = self.page_count(snapshot)
+        page = min(max(page, 0), pages - 1)
+
+        key = (snapshot.version, snapshot.profile, snapshot.since, page)
+        text = self.renders.get(key)
+        if text is None:
+            start = page * self.per_page
+            text = HTMLFormatter.format_offers_page(
+                snapshot.offers[start:start + self.per_page],
+                start=start + 1,
+                page=page + 1,
+                pages=pages,
+                total=snapshot.total,
+                new_only=snapshot.full_id is not None
+            )
+            self.renders.put(key, text)
+
+        return text, self.keyboard(snapshot_id, page, pages, snapshot.full_id)
+
+    @staticmethod
+    def keyboard(snapshot_id: int, page: int, pages: int, full_id: Optional[int] = None) -> Optional[InlineKeyboardMarkup]:
+        rows = []
+        if pages > 1:
+            buttons = []
+            if page > 0:
+                buttons.append(InlineKeyboardButton("◀", callback_data=f"{CALLBACK_PREFIX}:{snapshot_id}:{page - 1}"))
+            buttons.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data=NOOP))
+            if page < pages - 1:
+                buttons.append(InlineKeyboardButton("▶", callback_data=f"{CALLBACK_PREFIX}:{snapshot_id}:{page + 1}"))
+            rows.append(buttons)
+        if full_id is not None:
+            rows.append([InlineKeyboardButton("📋 Ver todas", callback_data=f"{CALLBACK_PREFIX}:{full_id}:0")])
+        return InlineKeyboardMarkup(rows) if rows else None
+
+    @staticmethod
+    def parse_callback(data: str) -> Optional[Tuple[int, int]]:
+        """"pg:<snapshot>:<página>" -> (snapshot, página); None para el botón del contador"""
+        try:
+            _, snapshot_id, page = data.split(':')
+            return int(snapshot_id), int(page)
+        except ValueError:
+            return None
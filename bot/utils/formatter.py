@@ -1,46 +1,235 @@
+import itertools
 from datetime import datetime
-from typing import List, Dict
+from html import escape
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+def utf16_len(text: str) -> int:
+    """Longitud como la cuenta Telegram: unidades UTF-16 (un emoji suele ocupar 2)"""
+    return len(text.encode('utf-16-le')) // 2
 
 
 class HTMLFormatter:
     
+    # Límite de Telegram por mensaje; se mide sobre el HTML, que siempre ocupa más que el texto visible
+    MAX_MESSAGE_LENGTH = 4096
+    
+    # Título y empresa vienen del sitio sin límite: se recortan como la descripción
+    TITLE_MAX_LENGTH = 120
+    COMPANY_MAX_LENGTH = 60
+    
+    CONTINUATION_HEADER = "<b>📋 Continuación</b>\n\n"
+    FILTER_FOOTER = "\n<i>✨ Filtrado por: IA, Diseño, Redacción, Automatizaciones</i>"
+    
     @staticmethod
-    def format_job_offers(offers: List[Dict[str, str]]) -> str:
+    def format_job_offers(offers: List[Dict[str, str]], total: Optional[int] = None) -> str:
         if not offers:
             return HTMLFormatter._format_no_offers()
         
+        parts = [HTMLFormatter._format_header(offers, total)]
+        parts.extend(HTMLFormatter._iter_offer_blocks(offers))
+        parts.append(HTMLFormatter.FILTER_FOOTER)
+        return ''.join(parts)
+    
+    @staticmethod
+    def paginate(
+        header: str,
+        blocks: Iterable[str],
+        footer: str = "",
+        max_length: Optional[int] = None
+    ) -> Iterator[str]:
+        """Agrupa bloques enteros en páginas; nunca corta un bloque (ni sus etiquetas)
+        
+        Es un generador: la página 1 puede enviarse mientras las siguientes aún no se han formateado.
+        """
+        max_length = max_length or HTMLFormatter.MAX_MESSAGE_LENGTH
+        continuation = HTMLFormatter.CONTINUATION_HEADER
+        
+        parts = [header]
+        size = utf16_len(header)
+        has_content = False
+        
+        for block in itertools.chain(blocks, [footer] if footer else []):
+            block_size = utf16_len(block)
+            if has_content and size + block_size > max_length:
+                yield ''.join(parts)
+                parts = [continuation]
+                size = utf16_len(continuation)
+            
+            parts.append(block)
+            size += block_size
+            has_content = True
+        
+        yield ''.join(parts)
+    
+    @staticmethod
+    def format_offers_page(
+        offers: List[Dict[str, str]],
+        start: int,
+        page: int,
+        pages: int,
+        total: int,
+        new_only: bool = False
+    ) -> str:
+        """Una página de la respuesta paginada; la numeración sigue entre páginas
+        
+        Con `new_only` la página es de la vista "solo nuevas desde tu última consulta".
+        """
+        if not offers:
+            return HTMLFormatter._format_no_new_offers() if new_only else HTMLFormatter._format_no_offers()
+        
         current_date = datetime.now().strftime("%d/%m/%Y %H:%M")
+        page_info = f" · página {page}/{pages}" if pages > 1 else ""
+        if new_only:
+            title, counter = "🆕 Ofertas nuevas desde tu última consulta", "Ofertas nuevas"
+        else:
+            title, counter = "🔍 Ofertas Laborales en Cuba", "Total de ofertas encontradas"
+        header = f"""<b>{title}</b>
+📅 Fecha de búsqueda: {current_date}
+📊 {counter}: {total}{page_info}
+
+━━━━━━━━━━━━━━━━━━━━
+
+"""
+        parts = [header]
+        parts.extend(HTMLFormatter._iter_offer_blocks(offers, start))
+        parts.append(HTMLFormatter.FILTER_FOOTER)
+        text = ''.join(parts)
+        if HTMLFormatter.fits(text):
+            return text
         
-        html = f"""<b>🔍 Ofertas Laborales en Cuba</b>
+        # Enlaces o textos muy largos: la página se repite sin descripciones y, si aún
+        # no cabe, con las ofertas que entran y un aviso, antes que pasarse del límite
+        parts = [header]
+        # Sitio para el pie y el aviso de ofertas que no caben
+        size = utf16_len(header) + utf16_len(HTMLFormatter.FILTER_FOOTER) + 80
+        for position, offer in enumerate(offers):
+            block = HTMLFormatter._format_offer(start + position, offer, 0)
+            size += utf16_len(block)
+            if size > HTMLFormatter.MAX_MESSAGE_LENGTH:
+                parts.append(f"<i>… y {len(offers) - position} más que no caben en este mensaje</i>\n")
+                break
+            parts.append(block)
+        parts.append(HTMLFormatter.FILTER_FOOTER)
+        return ''.join(parts)
+    
+    @staticmethod
+    def fits(text: str) -> bool:
+        """True si el mensaje cabe en un solo mensaje de Telegram"""
+        return utf16_len(text) <= HTMLFormatter.MAX_MESSAGE_LENGTH
+    
+    @staticmethod
+    def format_progress(done: List, pending: List[str]) -> str:
+        """Línea de estado mientras faltan fuentes por responder"""
+        finished = []
+        for result in done:
+            mark = "⚠️" if result.error else "✅"
+            new = f" ({result.new} nuevas)" if result.new else ""
+            finished.append(f"{mark} {result.source}{new}")
+        waiting = [f"⌛ {source}" for source in pending]
+        return f"<i>⏳ Buscando… {' · '.join(finished + waiting)}</i>\n\n"
+    
+    @staticmethod
+    def _format_header(offers: List[Dict[str, str]], total: Optional[int] = None) -> str:
+        current_date = datetime.now().strftime("%d/%m/%Y %H:%M")
+        total = total if total is not None else len(offers)
+        shown = f"\n⭐ Mostrando las {len(offers)} más relevantes" if total > len(offers) else ""
+        
+        return f"""<b>🔍 Ofertas Laborales en Cuba</b>
 📅 Fecha de búsqueda: {current_date}
-📊 Total de ofertas encontradas: {len(offers)}
+📊 Total de ofertas encontradas: {total}{shown}
 
 ━━━━━━━━━━━━━━━━━━━━
 
 """
+    
+    @staticmethod
+    def _iter_offer_blocks(offers: Iterable[Dict[str, str]], start: int = 1) -> Iterator[str]:
+        for idx, offer in enumerate(offers, start):
+            yield HTMLFormatter._format_offer(idx, offer)
+    
+    @staticmethod
+    def _format_offer(idx: int, offer: Dict[str, str], description_length: int = 150) -> str:
+        title = offer.get('title', 'Sin título')
+        company = offer.get('company', 'No especificada')
+        description = offer.get('description', 'Sin descripción')
+        link = offer.get('link', '#')
+        source = offer.get('source', 'Fuente desconocida')
         
-        for idx, offer in enumerate(offers, 1):
-            title = offer.get('title', 'Sin título')
-            company = offer.get('company', 'No especificada')
-            description = offer.get('description', 'Sin descripción')
-            link = offer.get('link', '#')
-            source = offer.get('source', 'Fuente desconocida')
-            
-            description = HTMLFormatter._truncate_description(description, 150)
-            
-            html += f"""<b>{idx}. {title}</b>
+        # Se recorta antes de escapar (para no partir una entidad) y se escapa todo el texto
+        # del sitio: un "<" o "&" en un título haría fallar el mensaje entero en modo HTML
+        title = escape(HTMLFormatter._truncate_description(title, HTMLFormatter.TITLE_MAX_LENGTH))
+        company = escape(HTMLFormatter._truncate_description(company, HTMLFormatter.COMPANY_MAX_LENGTH))
+        description = escape(HTMLFormatter._truncate_description(description, description_length))
+        description_line = f"📝 {description}\n" if description_length else ""
+        
+        return f"""<b>{idx}. {title}</b>
 🏢 Empresa: <i>{company}</i>
-🌐 Fuente: {source}
-📝 {description}
-🔗 <a href="{link}">Ver oferta completa</a>
+🌐 Fuente: {escape(source)}
+{description_line}🔗 <a href="{escape(link, quote=True)}">Ver oferta completa</a>
 
 ━━━━━━━━━━━━━━━━━━━━
 
 """
+    
+    @staticmethod
+    def format_shared_offer(offer: Dict[str, str]) -> str:
+        """Una oferta suelta, tal como se envía al elegirla en el modo inline"""
+        # Texto de terceros, escapado como en _format_offer
+        description = HTMLFormatter._truncate_description(offer.get('description', 'Sin descripción'), 300)
+        return f"""<b>{escape(offer.get('title', 'Sin título'))}</b>
+🏢 Empresa: <i>{escape(offer.get('company', 'No especificada'))}</i>
+🌐 Fuente: {escape(offer.get('source', 'Fuente desconocida'))}
+📝 {escape(description)}
+🔗 <a href="{escape(offer.get('link', '#'), quote=True)}">Ver oferta completa</a>"""
+    
+    @staticmethod
+    def iter_search_pages(query: str, offers: List[Dict[str, str]]) -> Iterator[str]:
+        """Resultados de /buscar sobre las ofertas guardadas, paginados"""
+        query = escape(query)
+        if not offers:
+            yield f"""<b>🔎 Búsqueda: {query}</b>
+
+❌ No hay ofertas guardadas que coincidan.
+
+<i>Prueba con menos palabras o con el inicio de una palabra (p. ej. <code>diseñ</code>).</i>"""
+            return
         
-        html += "\n<i>✨ Filtrado por: IA, Diseño, Redacción, Automatizaciones</i>"
-        
-        return html
+        header = f"""<b>🔎 Búsqueda: {query}</b>
+📊 {len(offers)} ofertas más relevantes del historial
+
+━━━━━━━━━━━━━━━━━━━━
+
+"""
+        yield from HTMLFormatter.paginate(header, HTMLFormatter._iter_offer_blocks(offers))
+    
+    @staticmethod
+    def format_new_offers(offers: List[Dict[str, str]], part: int = 1, parts: int = 1) -> str:
+        """Aviso push de ofertas nuevas para los temas del usuario"""
+        counter = f" ({part}/{parts})" if parts > 1 else ""
+        html = f"""<b>🔔 Nuevas ofertas para tus temas{counter}</b>
+
+━━━━━━━━━━━━━━━━━━━━
+
+"""
+        blocks = [html]
+        blocks.extend(HTMLFormatter._iter_offer_blocks(offers))
+        blocks.append("\n<i>Cambia tus temas con /suscribir o deja de recibir avisos con /desuscribir</i>")
+        return ''.join(blocks)
+    
+    @staticmethod
+    def iter_digest_pages(offers: List[Dict[str, str]], total: int) -> Iterator[str]:
+        """Resumen diario: las mejores ofertas del día para un perfil, en páginas enteras"""
+        current_date = datetime.now().strftime("%d/%m/%Y")
+        shown = f"\n⭐ Las {len(offers)} más relevantes" if total > len(offers) else ""
+        header = f"""<b>☀️ Resumen del día · {current_date}</b>
+📊 Ofertas nuevas en las últimas 24 horas: {total}{shown}
+
+━━━━━━━━━━━━━━━━━━━━
+
+"""
+        footer = "\n<i>Escribe Ofertas para ver la lista completa o /resumen para dejar de recibirlo</i>"
+        yield from HTMLFormatter.paginate(header, HTMLFormatter._iter_offer_blocks(offers), footer)
     
     @staticmethod
     def _format_no_offers() -> str:
@@ -52,6 +241,16 @@ class HTMLFormatter:
 
 <i>Intenta nuevamente más tarde.</i>"""
     
+    @staticmethod
+    def _format_no_new_offers() -> str:
+        current_date = datetime.now().strftime("%d/%m/%Y %H:%M")
+        return f"""<b>🆕 Ofertas nuevas desde tu última consulta</b>
+📅 Fecha de búsqueda: {current_date}
+
+✅ No hay ofertas nuevas desde la última vez que preguntaste.
+
+<i>Pulsa «Ver todas» para ver de nuevo la lista completa.</i>"""
+    
     @staticmethod
     def _truncate_description(description: str, max_length: int = 150) -> str:
         if len(description) <= max_length:
@@ -0,0 +1,63 @@
+"""
+Render Cache - Páginas HTML ya renderizadas, acotadas por memoria
+Una página depende solo de la versión de los datos, el perfil de filtro
+(y cursor delta) y el número de página: se renderiza una vez y la reutilizan
+todas las peticiones hasta que cambie la versión. Se expulsa por LRU cuando
+el total de bytes supera el límite.
+"""
+
+import sys
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+from bot.config import Config
+
+# (versión, perfil, cursor, página)
+RenderKey = Tuple[int, Tuple[str, ...], float, int]
+
+
+class RenderCache:
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(Config.RENDER_CACHE_MB * 1024 * 1024)
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self.nbytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: RenderKey) -> Optional[str]:
+        text = self._entries.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key: RenderKey, text: str):
+        if key in self._entries:
+            self._remove(key)
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = text
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def discard_older(self, version: int):
+        """Quita las páginas de versiones anteriores: ya no las va a pedir ninguna respuesta nueva"""
+        for key in [key for key in self._entries if key[0] < version]:
+            self._remove(key)
+
+    def _remove(self, key: RenderKey):
+        self.nbytes -= sys.getsizeof(self._entries.pop(key))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: RenderKey) -> bool:
+        return key in self._entries
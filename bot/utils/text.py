@@ -0,0 +1,29 @@
+"""
+Text - Normalización de texto para filtros, dedupe y búsqueda
+Se calcula una vez por oferta (Offer.search_text) y se reutiliza
+"""
+
+import re
+import unicodedata
+from typing import Dict
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """casefold + NFKD sin diacríticos + espacios colapsados ("Diseño  UX" -> "diseno ux")"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', stripped).strip()
+
+
+def offer_search_text(offer: Dict[str, str]) -> str:
+    """Texto de búsqueda de una oferta: el precalculado o, si falta, calculado al vuelo"""
+    text = offer.get('search_text')
+    if text is None:
+        text = normalize_text(
+            f"{offer.get('title', '')} {offer.get('description', '')} {offer.get('company', '')}"
+        )
+    return text
@@ -0,0 +1,109 @@
+"""
+Webhook - Servidor HTTP asíncrono (aiohttp) para recibir updates de Telegram
+Telegram hace POST de cada update a WEBHOOK_PATH con la cabecera
+X-Telegram-Bot-Api-Secret-Token; el servidor la valida y mete el update en
+la cola de la Application. /health responde para Docker y balanceadores y
+/metrics expone la cola de despacho (profundidad y tiempos de espera).
+"""
+
+import hmac
+import json
+from typing import Any, Callable, Dict, Optional
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+from bot.config import Config
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+
+    def __init__(
+        self,
+        application: Application,
+        path: Optional[str] = None,
+        secret: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        metrics: Optional[Callable[[], Dict[str, Any]]] = None
+    ):
+        self.application = application
+        self.path = path or Config.WEBHOOK_PATH
+        self.secret = secret if secret is not None else Config.WEBHOOK_SECRET
+        self.host = host or Config.WEBHOOK_HOST
+        self.port = port if port is not None else Config.WEBHOOK_PORT
+        self.metrics = metrics
+        self.runner: Optional[web.AppRunner] = None
+
+        self.received = 0
+        self.rejected = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/metrics", self.handle_metrics)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not self.secret or not hmac.compare_digest(token, self.secret):
+            self.rejected += 1
+            logger.warning(f"Rejected webhook request from {request.remote}: bad secret token")
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+            # Update.de_json espera un objeto con update_id; una lista o un escalar no es un update
+            if not isinstance(data, dict) or not isinstance(data.get('update_id'), int):
+                update = None
+            else:
+                update = Update.de_json(data, self.application.bot)
+        except (json.JSONDecodeError, ValueError, TypeError, KeyError, AttributeError):
+            update = None
+
+        if update is None:
+            logger.warning(f"Invalid update payload from {request.remote}")
+            return web.Response(status=400)
+
+        self.received += 1
+        await self.application.update_queue.put(update)
+        return web.Response()
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        running = self.application.running
+        return web.json_response(
+            {
+                'status': 'ok' if running else 'starting',
+                'updates_received': self.received,
+                'updates_rejected': self.rejected,
+                'update_queue': self.application.update_queue.qsize(),
+            },
+            status=200 if running else 503
+        )
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        data = {
+            'updates_received': self.received,
+            'updates_rejected': self.rejected,
+            'update_queue': self.application.update_queue.qsize(),
+        }
+        if self.metrics:
+            data['dispatch'] = self.metrics()
+        return web.json_response(data)
+
+    async def start(self):
+        self.runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        logger.info(f"Webhook server listening on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,101 @@
+"""
+Dedupe - Elimina ofertas repetidas entre fuentes y categorías
+Una oferta es duplicada si coincide su URL canónica (sin parámetros de
+tracking ni fragmento, host normalizado) o su huella de contenido
+(título + empresa normalizados). Todo son búsquedas en sets.
+"""
+
+import hashlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from bot.utils.logger import setup_logger
+from bot.utils.text import normalize_text
+
+logger = setup_logger(__name__)
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'yclid', 'dclid', 'msclkid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', 'ref', 'ref_src'
+}
+
+_DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+
+def canonical_url(link: str) -> str:
+    """URL normalizada: https, host sin www ni puerto por defecto, sin tracking ni fragmento"""
+    parts = urlsplit(link.strip())
+    scheme = parts.scheme.lower() or 'https'
+    host = parts.netloc.lower()
+
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and host.endswith(default_port):
+        host = host[:-len(default_port)]
+    if host.startswith('www.'):
+        host = host[4:]
+    if scheme == 'http':
+        scheme = 'https'
+
+    path = parts.path.rstrip('/') or '/'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def content_fingerprint(offer: Dict[str, str]) -> str:
+    """Huella de título + empresa; sin empresa conocida se añade el inicio de la descripción"""
+    title = normalize_text(offer.get('title', ''))
+    company = offer.get('company', '')
+    if not company or company == 'No especificada':
+        # Evita fusionar ofertas distintas con el mismo título genérico
+        company = offer.get('description', '')[:100]
+
+    key = f"{title}|{normalize_text(company)}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _fingerprint(offer: Dict[str, str]) -> str:
+    # Offer la cachea; un dict la calcula en cada pasada
+    return offer.get('fingerprint') or content_fingerprint(offer)
+
+
+class OfferDeduplicator:
+
+    def __init__(self):
+        # Duplicados aportados por cada fuente en la última pasada
+        self.last_stats: Dict[str, int] = {}
+
+    def dedupe(
+        self,
+        offers: List[Dict[str, str]],
+        known: Optional[Iterable[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """Devuelve las ofertas únicas, en orden; `known` son ofertas ya aceptadas antes"""
+        seen_urls = set()
+        seen_fingerprints = set()
+        for offer in known or []:
+            seen_urls.add(canonical_url(offer.get('link', '')))
+            seen_fingerprints.add(_fingerprint(offer))
+
+        unique = []
+        duplicates: Counter = Counter()
+        for offer in offers:
+            url = canonical_url(offer.get('link', ''))
+            fingerprint = _fingerprint(offer)
+
+            if url in seen_urls or fingerprint in seen_fingerprints:
+                duplicates[offer.get('source', 'Desconocida')] += 1
+                continue
+
+            seen_urls.add(url)
+            seen_fingerprints.add(fingerprint)
+            unique.append(offer)
+
+        self.last_stats = dict(duplicates)
+        if duplicates:
+            per_source = ", ".join(f"{source}: {count}" for source, count in duplicates.most_common())
+            logger.info(f"Dedupe removed {sum(duplicates.values())} duplicates ({per_source})")
+
+        return unique
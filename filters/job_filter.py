@@ -1,6 +1,8 @@
 from typing import List, Dict
 from bot.config import Config
 from bot.utils.logger import setup_logger
+from bot.utils.text import offer_search_text
+from filters.keyword_matcher import KeywordMatcher
 
 logger = setup_logger(__name__)
 
@@ -9,6 +11,8 @@ class JobFilter:
     
     def __init__(self):
         self.keywords = Config.get_filter_keywords()
+        # Autómata compilado una sola vez: una pasada por oferta, con límites de palabra
+        self.matcher = KeywordMatcher(self.keywords)
         logger.info(f"Initialized JobFilter with {len(self.keywords)} keywords")
     
     def filter_offers(self, offers: List[Dict[str, str]]) -> List[Dict[str, str]]:
@@ -23,16 +27,14 @@ class JobFilter:
         logger.info(f"Filtered {len(offers)} offers down to {len(filtered)} relevant offers")
         return filtered
     
+    def matched_keywords(self, offer: Dict[str, str]) -> List[str]:
+        """Palabras clave que aparecen en la oferta"""
+        return self.matcher.find(self._offer_text(offer))
+    
     def _matches_filter(self, offer: Dict[str, str]) -> bool:
-        title = offer.get('title', '').lower()
-        description = offer.get('description', '').lower()
-        company = offer.get('company', '').lower()
-        
-        combined_text = f"{title} {description} {company}"
-        
-        for keyword in self.keywords:
-            if keyword in combined_text:
-                logger.debug(f"Offer matched keyword: {keyword}")
-                return True
-        
-        return False
+        return self.matcher.search(self._offer_text(offer))
+    
+    @staticmethod
+    def _offer_text(offer: Dict[str, str]) -> str:
+        # Normalizado y cacheado en Offer.search_text: sin mayúsculas ni acentos
+        return offer_search_text(offer)
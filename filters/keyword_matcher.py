@@ -0,0 +1,52 @@
+"""
+Keyword Matcher - Busca todas las palabras clave en una sola pasada
+Compila una única expresión regular con alternancia y límites de palabra,
+así "ia" no coincide dentro de "media" ni "bot" dentro de "robot".
+Una palabra clave terminada en "*" coincide como prefijo ("diseñador*").
+Las palabras clave se pliegan igual que el texto (normalize_text): "diseño"
+coincide con "diseno". El texto a buscar debe venir ya normalizado.
+"""
+
+import re
+from typing import Iterable, List
+from bot.utils.logger import setup_logger
+from bot.utils.text import normalize_text
+
+logger = setup_logger(__name__)
+
+
+class KeywordMatcher:
+
+    def __init__(self, keywords: Iterable[str]):
+        # Sin duplicados ni vacíos, conservando el orden de configuración
+        self.keywords: List[str] = [
+            kw for kw in dict.fromkeys(k.strip().lower() for k in keywords)
+            if kw.rstrip('*')
+        ]
+        self.pattern = self._compile(self.keywords)
+        logger.debug(f"KeywordMatcher compilado con {len(self.keywords)} palabras clave")
+
+    @staticmethod
+    def _compile(keywords: List[str]) -> re.Pattern:
+        alternatives = []
+        # Las más largas primero: "machine learning" gana a "ml", "designer" a "design"
+        for index, keyword in sorted(enumerate(keywords), key=lambda item: -len(item[1])):
+            body = r'\s+'.join(re.escape(word) for word in normalize_text(keyword.rstrip('*')).split())
+            tail = r'\w*' if keyword.endswith('*') else r'(?!\w)'
+            alternatives.append(f"(?P<k{index}>{body}{tail})")
+
+        if not alternatives:
+            return re.compile(r'(?!x)x')  # nunca coincide
+        return re.compile(r'(?<!\w)(?:' + '|'.join(alternatives) + ')')
+
+    def search(self, text: str) -> bool:
+        """True si alguna palabra clave aparece en el texto"""
+        return self.pattern.search(text) is not None
+
+    def find(self, text: str) -> List[str]:
+        """Palabras clave que aparecen en el texto, en orden de aparición"""
+        hits = dict.fromkeys(
+            self.keywords[int(match.lastgroup[1:])]
+            for match in self.pattern.finditer(text)
+        )
+        return list(hits)
@@ -0,0 +1,191 @@
+"""
+Near Dedupe - Detecta casi-duplicados (anuncios reposteados o retocados)
+Cada oferta recibe una firma MinHash de los shingles de su texto
+normalizado (título, descripción y empresa); un índice LSH por bandas encuentra candidatos
+en tiempo sub-lineal sobre una ventana móvil de ofertas recientes, sin
+comparar todas contra todas.
+"""
+
+import operator
+import random
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from bot.config import Config
+from bot.utils.logger import setup_logger
+from bot.utils.text import offer_search_text
+from filters.dedupe import canonical_url
+
+logger = setup_logger(__name__)
+
+Signature = Tuple[int, ...]
+
+_MASK64 = (1 << 64) - 1
+
+
+class MinHasher:
+    """MinHash de una sola permutación (OPH) con densificación óptima.
+
+    Cada shingle se hashea una vez y cae en uno de num_perm bins, donde se
+    guarda el mínimo: O(shingles) por oferta en lugar de O(shingles * num_perm).
+    Cada bin vacío toma el valor del primer bin ocupado de su propia secuencia
+    de sondeo (Shrivastava, 2017); así un shingle compartido no se copia a
+    bins consecutivos y no genera bandas LSH iguales por sí solo.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 2, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        # Secuencia de sondeo fija por bin: igual para todas las firmas
+        self.probes = [
+            rng.sample([j for j in range(num_perm) if j != i], num_perm - 1)
+            for i in range(num_perm)
+        ]
+
+    def shingles(self, text: str) -> Set[str]:
+        """k-gramas de palabras de un texto ya normalizado"""
+        words = text.split()
+        k = self.shingle_size
+        if len(words) <= k:
+            return {' '.join(words)} if words else set()
+        return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+    def signature(self, text: str) -> Signature:
+        k = self.num_perm
+        bins: List[Optional[int]] = [None] * k
+        # hash() de str basta: el índice vive en memoria, dentro de un mismo proceso
+        for shingle in self.shingles(text):
+            h = hash(shingle) & _MASK64
+            slot, value = h % k, h // k
+            current = bins[slot]
+            if current is None or value < current:
+                bins[slot] = value
+
+        if all(value is None for value in bins):
+            return tuple([_MASK64] * k)
+        if None in bins:
+            bins = self._densify(bins)
+        return tuple(bins)
+
+    def _densify(self, bins: List[Optional[int]]) -> List[int]:
+        """Rellena cada bin vacío con el primer bin ocupado de su secuencia de sondeo"""
+        offset = (_MASK64 // self.num_perm) + 1
+        dense = list(bins)
+        for i, value in enumerate(bins):
+            if value is None:
+                for attempt, j in enumerate(self.probes[i], 1):
+                    if bins[j] is not None:
+                        dense[i] = bins[j] + attempt * offset
+                        break
+        return dense
+
+    @staticmethod
+    def similarity(first: Signature, second: Signature) -> float:
+        """Estimación de Jaccard: fracción de posiciones iguales"""
+        return sum(map(operator.eq, first, second)) / len(first)
+
+
+class LSHIndex:
+
+    def __init__(self, bands: int, rows: int, window_seconds: float):
+        self.bands = bands
+        self.rows = rows
+        self.window_seconds = window_seconds
+        self.buckets: List[Dict[int, Set[str]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[str, Signature] = {}
+        self._added_at: Dict[str, float] = {}
+        self._timeline: Deque[Tuple[float, str]] = deque()
+
+    def _band_keys(self, signature: Signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, hash(signature[start:start + self.rows])
+
+    def query(self, signature: Signature) -> Set[str]:
+        candidates: Set[str] = set()
+        for band, key in self._band_keys(signature):
+            bucket = self.buckets[band].get(key)
+            if bucket:
+                candidates |= bucket
+        return candidates
+
+    def add(self, key: str, signature: Signature, now: float):
+        if key not in self.signatures:
+            for band, band_key in self._band_keys(signature):
+                self.buckets[band].setdefault(band_key, set()).add(key)
+            self.signatures[key] = signature
+        self._added_at[key] = now
+        self._timeline.append((now, key))
+
+    def expire(self, now: float):
+        """Saca de la ventana las ofertas más viejas que window_seconds"""
+        cutoff = now - self.window_seconds
+        while self._timeline and self._timeline[0][0] < cutoff:
+            added, key = self._timeline.popleft()
+            # Entradas antiguas de una clave que se volvió a ver después
+            if self._added_at.get(key) != added:
+                continue
+            signature = self.signatures.pop(key)
+            del self._added_at[key]
+            for band, band_key in self._band_keys(signature):
+                bucket = self.buckets[band].get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.buckets[band][band_key]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+
+class NearDuplicateDetector:
+
+    BANDS = 16
+    ROWS = 4
+
+    def __init__(self, threshold: Optional[float] = None, window_hours: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else Config.NEAR_DUP_THRESHOLD
+        window_hours = window_hours if window_hours is not None else Config.NEAR_DUP_WINDOW_HOURS
+        self.hasher = MinHasher(num_perm=self.BANDS * self.ROWS)
+        self.index = LSHIndex(self.BANDS, self.ROWS, window_hours * 3600)
+        # Casi-duplicados descartados por fuente en la última pasada
+        self.last_stats: Dict[str, int] = {}
+
+    def _signature(self, offer: Dict[str, str]) -> Signature:
+        # Texto normalizado cacheado en Offer.search_text (título, descripción y empresa)
+        return self.hasher.signature(offer_search_text(offer))
+
+    def find_duplicate(self, key: str, signature: Signature) -> Optional[str]:
+        """Clave de una oferta reciente casi idéntica (distinta de la propia), o None"""
+        for candidate in self.index.query(signature):
+            if candidate == key:
+                continue
+            if MinHasher.similarity(signature, self.index.signatures[candidate]) >= self.threshold:
+                return candidate
+        return None
+
+    def filter(self, offers: List[Dict[str, str]], now: Optional[float] = None) -> List[Dict[str, str]]:
+        """Descarta las ofertas casi idénticas a otra de la ventana y registra las demás"""
+        now = time.time() if now is None else now
+        self.index.expire(now)
+
+        kept = []
+        duplicates: Counter = Counter()
+        for offer in offers:
+            key = canonical_url(offer.get('link', ''))
+            signature = self._signature(offer)
+
+            if self.find_duplicate(key, signature):
+                duplicates[offer.get('source', 'Desconocida')] += 1
+                continue
+
+            self.index.add(key, signature, now)
+            kept.append(offer)
+
+        self.last_stats = dict(duplicates)
+        if duplicates:
+            per_source = ", ".join(f"{source}: {count}" for source, count in duplicates.most_common())
+            logger.info(f"Near-dedupe removed {sum(duplicates.values())} reposts ({per_source})")
+
+        return kept
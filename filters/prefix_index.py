@@ -0,0 +1,93 @@
+"""
+Prefix Index - Búsqueda por prefijo sobre los títulos de las ofertas recientes
+Los tokens normalizados de cada título van a un array ordenado; un prefijo
+("disen") se resuelve con dos bisect y la unión de sus listas de ofertas,
+en microsegundos y sin tocar la base. Al cambiar la versión de los datos
+solo se añaden las ofertas nuevas y se quitan las que salieron de la ventana.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set
+from bot.utils.logger import setup_logger
+from bot.utils.text import normalize_text
+from filters.subscriptions import tokenize
+
+logger = setup_logger(__name__)
+
+# Mayor que cualquier carácter de un token: cierra el rango de un prefijo
+_PREFIX_END = '\U0010ffff'
+
+
+class PrefixIndex:
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.tokens: List[str] = []
+        self._postings: Dict[str, Set[str]] = {}
+        self._offers: Dict[str, Dict[str, str]] = {}
+        self._offer_tokens: Dict[str, Set[str]] = {}
+
+    def sync(self, version: int, offers: Iterable[Dict[str, str]]):
+        """Pone el índice al día con `offers` si la versión cambió (solo la diferencia)"""
+        if version == self.version:
+            return
+
+        current = {offer['link']: offer for offer in offers}
+        removed = [link for link in self._offers if link not in current]
+        added = [offer for link, offer in current.items() if link not in self._offers]
+        for link in removed:
+            self._remove(link)
+        for offer in added:
+            self._add(offer)
+
+        self.version = version
+        logger.debug(f"PrefixIndex v{version}: +{len(added)} -{len(removed)}, {len(self.tokens)} tokens")
+
+    def _add(self, offer: Dict[str, str]):
+        link = offer['link']
+        tokens = set(tokenize(normalize_text(offer.get('title', ''))))
+        self._offers[link] = offer
+        self._offer_tokens[link] = tokens
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                insort(self.tokens, token)
+            postings.add(link)
+
+    def _remove(self, link: str):
+        del self._offers[link]
+        for token in self._offer_tokens.pop(link):
+            postings = self._postings[token]
+            postings.discard(link)
+            if not postings:
+                del self._postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def _matching(self, prefix: str) -> Set[str]:
+        start = bisect_left(self.tokens, prefix)
+        end = bisect_left(self.tokens, prefix + _PREFIX_END, start)
+        links: Set[str] = set()
+        for token in self.tokens[start:end]:
+            links |= self._postings[token]
+        return links
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, str]]:
+        """Ofertas cuyo título tiene un token que empieza por cada término, las más recientes primero"""
+        terms = sorted(set(tokenize(normalize_text(query))), key=len, reverse=True)
+        if not terms:
+            return []
+
+        # El término más largo suele ser el más selectivo: se intersecta desde ahí
+        links = self._matching(terms[0])
+        for term in terms[1:]:
+            if not links:
+                break
+            links &= self._matching(term)
+
+        offers = [self._offers[link] for link in links]
+        offers.sort(key=lambda offer: offer.get('first_seen', 0.0), reverse=True)
+        return offers[:limit]
+
+    def __len__(self) -> int:
+        return len(self._offers)
@@ -0,0 +1,70 @@
+"""
+Ranking - Puntúa las ofertas por relevancia y selecciona las mejores
+Coincidencias en el título pesan más que en la descripción, las ofertas
+recientes más que las viejas, y cada fuente tiene su propio peso.
+"""
+
+import heapq
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from bot.config import Config
+from bot.utils.logger import setup_logger
+from bot.utils.text import normalize_text, offer_search_text
+from filters.keyword_matcher import KeywordMatcher
+
+logger = setup_logger(__name__)
+
+# CuCoders publica la fecha en la URL: /empleos/2024-01-14/...
+_LINK_DATE = re.compile(r'/(\d{4}-\d{2}-\d{2})/')
+
+
+class OfferRanker:
+
+    TITLE_WEIGHT = 3.0
+    BODY_WEIGHT = 1.0
+    # Factor de frescura cuando no se sabe la fecha de la oferta
+    UNKNOWN_FRESHNESS = 0.5
+
+    def __init__(self, matcher: KeywordMatcher):
+        self.matcher = matcher
+        self.source_weights = Config.get_source_weights()
+        self.half_life = Config.FRESHNESS_HALF_LIFE_DAYS * 86400
+
+    def score(self, offer: Dict[str, str], now: Optional[float] = None) -> float:
+        title_hits = set(self.matcher.find(normalize_text(offer.get('title', ''))))
+        body_hits = set(self.matcher.find(offer_search_text(offer))) - title_hits
+        relevance = self.TITLE_WEIGHT * len(title_hits) + self.BODY_WEIGHT * len(body_hits)
+
+        freshness = self._freshness(offer, now or time.time())
+        source_weight = self.source_weights.get(offer.get('source', ''), 1.0)
+
+        return relevance * (0.5 + freshness) * source_weight
+
+    def _freshness(self, offer: Dict[str, str], now: float) -> float:
+        """1.0 para una oferta de ahora, 0.5 tras FRESHNESS_HALF_LIFE_DAYS..."""
+        published = offer.get('first_seen')
+        if published is None:
+            match = _LINK_DATE.search(offer.get('link', ''))
+            if match:
+                try:
+                    published = datetime.strptime(match.group(1), '%Y-%m-%d').timestamp()
+                except ValueError:
+                    published = None
+
+        if published is None or self.half_life <= 0:
+            return self.UNKNOWN_FRESHNESS
+
+        age = max(0.0, now - published)
+        return 0.5 ** (age / self.half_life)
+
+    def top_k(self, offers: List[Dict[str, str]], k: int) -> List[Dict[str, str]]:
+        """Las k ofertas con mejor puntuación (heap: O(n log k)); empates en orden de scraping"""
+        if k <= 0 or not offers:
+            return []
+
+        now = time.time()
+        best = heapq.nlargest(k, offers, key=lambda offer: self.score(offer, now))
+        logger.debug(f"Ranked {len(offers)} offers, keeping top {len(best)}")
+        return best
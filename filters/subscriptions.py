@@ -0,0 +1,216 @@
+"""
+Subscriptions - Temas por usuario e índice invertido tema -> usuarios
+Cada oferta nueva se tokeniza una vez y los suscriptores se encuentran con
+búsquedas en diccionario, en tiempo proporcional a las coincidencias y no
+al número de usuarios.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from bot.config import Config
+from bot.utils.logger import setup_logger
+from bot.utils.text import normalize_text, offer_search_text
+from filters.keyword_matcher import KeywordMatcher
+
+logger = setup_logger(__name__)
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens de un texto ya normalizado"""
+    return _TOKEN.findall(text)
+
+
+class SubscriptionIndex:
+
+    def __init__(self):
+        # "python" -> usuarios
+        self.words: Dict[str, Set[int]] = {}
+        # "disenador" (de "diseñador*") -> usuarios
+        self.prefixes: Dict[str, Set[int]] = {}
+        # primer token -> {(("community", "manager"), es_prefijo): usuarios}
+        # ("diseño graf*" -> (("diseno", "graf"), True): el último token es prefijo)
+        self.phrases: Dict[str, Dict[Tuple[Tuple[str, ...], bool], Set[int]]] = {}
+        self._chat_entries: Dict[int, List[Tuple[str, Tuple[str, ...]]]] = {}
+        self._max_prefix = 0
+
+    @staticmethod
+    def _entry(topic: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        tokens = tuple(tokenize(normalize_text(topic.rstrip('*'))))
+        if not tokens:
+            return None
+        if len(tokens) > 1:
+            return ('prefix_phrase' if topic.endswith('*') else 'phrase'), tokens
+        return ('prefix' if topic.endswith('*') else 'word'), tokens
+
+    def add(self, chat_id: int, topics: Iterable[str]):
+        self.remove(chat_id)
+        entries = [entry for entry in map(self._entry, topics) if entry]
+
+        for kind, tokens in entries:
+            if kind == 'word':
+                self.words.setdefault(tokens[0], set()).add(chat_id)
+            elif kind == 'prefix':
+                self.prefixes.setdefault(tokens[0], set()).add(chat_id)
+                self._max_prefix = max(self._max_prefix, len(tokens[0]))
+            else:
+                key = (tokens, kind == 'prefix_phrase')
+                self.phrases.setdefault(tokens[0], {}).setdefault(key, set()).add(chat_id)
+
+        self._chat_entries[chat_id] = entries
+
+    def remove(self, chat_id: int):
+        for kind, tokens in self._chat_entries.pop(chat_id, []):
+            if kind in ('phrase', 'prefix_phrase'):
+                by_first = self.phrases.get(tokens[0], {})
+                self._discard(by_first, (tokens, kind == 'prefix_phrase'), chat_id)
+                if not by_first:
+                    self.phrases.pop(tokens[0], None)
+            else:
+                self._discard(self.words if kind == 'word' else self.prefixes, tokens[0], chat_id)
+
+    @staticmethod
+    def _discard(index: dict, key, chat_id: int):
+        users = index.get(key)
+        if users is not None:
+            users.discard(chat_id)
+            if not users:
+                del index[key]
+
+    def match(self, offer: Dict[str, str]) -> Set[int]:
+        """Usuarios cuyos temas aparecen en la oferta"""
+        tokens = tokenize(offer_search_text(offer))
+        users: Set[int] = set()
+
+        for position, token in enumerate(tokens):
+            hit = self.words.get(token)
+            if hit:
+                users |= hit
+
+            if self.prefixes:
+                for end in range(1, min(len(token), self._max_prefix) + 1):
+                    hit = self.prefixes.get(token[:end])
+                    if hit:
+                        users |= hit
+
+            for (phrase, prefix), hit in self.phrases.get(token, {}).items():
+                window = tokens[position:position + len(phrase)]
+                if len(window) < len(phrase) or tuple(window[:-1]) != phrase[:-1]:
+                    continue
+                if window[-1] == phrase[-1] or (prefix and window[-1].startswith(phrase[-1])):
+                    users |= hit
+
+        return users
+
+    def match_offers(self, offers: Iterable[Dict[str, str]]) -> Dict[int, List[Dict[str, str]]]:
+        """Reparte las ofertas entre los usuarios suscritos a sus temas"""
+        by_chat: Dict[int, List[Dict[str, str]]] = {}
+        for offer in offers:
+            for chat_id in self.match(offer):
+                by_chat.setdefault(chat_id, []).append(offer)
+        return by_chat
+
+    def __len__(self) -> int:
+        return len(self._chat_entries)
+
+
+class SubscriptionStore:
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.path = Path(data_dir or Config.DATA_DIR) / "subscriptions.json"
+        self.topics: Dict[int, List[str]] = {}
+        # Chats que pidieron el resumen diario (/resumen)
+        self.digest: Set[int] = set()
+        self.index = SubscriptionIndex()
+        self._matchers: Dict[int, KeywordMatcher] = {}
+
+        self._load()
+        logger.info(f"SubscriptionStore inicializado con {len(self.topics)} suscriptores")
+
+    def _load(self):
+        """Carga las suscripciones persistidas (si existen)"""
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            for chat_id, topics in data.get('topics', {}).items():
+                self.topics[int(chat_id)] = topics
+                self.index.add(int(chat_id), topics)
+            self.digest = set(data.get('digest', []))
+
+        except Exception as e:
+            logger.error(f"Error leyendo suscripciones: {e}")
+
+    def save(self):
+        """Guarda las suscripciones en disco (escritura atómica)"""
+        data = {
+            'topics': {str(chat_id): topics for chat_id, topics in self.topics.items()},
+            'digest': sorted(self.digest),
+        }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error guardando suscripciones: {e}")
+
+    def subscribe(self, chat_id: int, topics: Iterable[str]) -> List[str]:
+        """Reemplaza los temas del usuario; devuelve los temas guardados"""
+        clean = [topic for topic in dict.fromkeys(t.strip().lower() for t in topics) if topic.rstrip('*')]
+        if not clean:
+            return []
+
+        self.topics[chat_id] = clean
+        self.index.add(chat_id, clean)
+        self._matchers.pop(chat_id, None)
+        self.save()
+        logger.info(f"Chat {chat_id} suscrito a {len(clean)} temas")
+        return clean
+
+    def unsubscribe(self, chat_id: int) -> bool:
+        if chat_id not in self.topics:
+            return False
+
+        del self.topics[chat_id]
+        self.index.remove(chat_id)
+        self._matchers.pop(chat_id, None)
+        self.save()
+        logger.info(f"Chat {chat_id} canceló su suscripción")
+        return True
+
+    def set_digest(self, chat_id: int, enabled: bool):
+        if enabled:
+            self.digest.add(chat_id)
+        else:
+            self.digest.discard(chat_id)
+        self.save()
+        logger.info(f"Chat {chat_id} {'activó' if enabled else 'desactivó'} el resumen diario")
+
+    def forget(self, chat_id: int):
+        """Chat que bloqueó el bot: sin temas ni resumen"""
+        self.digest.discard(chat_id)
+        if not self.unsubscribe(chat_id):
+            self.save()
+
+    def get(self, chat_id: int) -> List[str]:
+        return self.topics.get(chat_id, [])
+
+    def matcher_for(self, chat_id: int) -> Optional[KeywordMatcher]:
+        """Matcher con los temas del usuario (None si usa el filtro global)"""
+        if chat_id not in self.topics:
+            return None
+        matcher = self._matchers.get(chat_id)
+        if matcher is None:
+            matcher = KeywordMatcher(self.topics[chat_id])
+            self._matchers[chat_id] = matcher
+        return matcher
@@ -1,24 +1,74 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Iterable, Callable, Container, Tuple
+from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
 import time
 import random
 import requests
+from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import json
 import hashlib
 import base64
 from bot.config import Config
 from bot.utils.logger import setup_logger
+from scrapers.offer import Offer
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from scrapers.proxy_rotator import ProxyRotator
 from scrapers.cache import CacheManager
 from scrapers.metrics import ScrapingMetrics
+from scrapers.selector_memory import SelectorCascade, SelectorMemory
+from scrapers.parse_pool import get_parse_pool
 
 logger = setup_logger(__name__)
 
+# HTML crudo y codificación con la que decodificarlo (None = que la detecte BeautifulSoup)
+Page = Tuple[bytes, Optional[str]]
+
+# orjson es opcional: decodifica JSON embebido varias veces más rápido
+try:
+    import orjson
+    _json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
+# Un semáforo por host, compartido por todos los scrapers y sus páginas
+_host_limits: Dict[str, threading.BoundedSemaphore] = {}
+_host_limits_lock = threading.Lock()
+
+
+@contextmanager
+def _host_slot(url: str):
+    """Limita las conexiones simultáneas a un mismo host (MAX_CONNECTIONS_PER_HOST)"""
+    host = urlparse(url).netloc.lower()
+    with _host_limits_lock:
+        semaphore = _host_limits.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max(1, Config.MAX_CONNECTIONS_PER_HOST))
+            _host_limits[host] = semaphore
+    
+    with semaphore:
+        yield
+
 
 class BaseScraper(ABC):
     
+    # Cascada de selectores CSS para encontrar ofertas (vacía = el scraper no la usa)
+    LISTING_SELECTORS: List[str] = []
+    
+    # Base para resolver URLs relativas en datos estructurados
+    BASE_URL = ""
+    
+    # Parámetro de query que selecciona la página del listado
+    PAGE_PARAM = "page"
+    
+    # Tipos de <script> que pueden traer ofertas como JSON embebido
+    STRUCTURED_SCRIPT_TYPES = ['application/ld+json', 'application/json']
+    
     def __init__(self, source_name: str, use_cache: bool = True, use_proxy: bool = True):
         self.source_name = source_name
         self.ua = UserAgent()
@@ -42,8 +92,35 @@ class BaseScraper(ABC):
         
         self.metrics = ScrapingMetrics()
         
+        # Enlaces ya vistos (lo asigna el ScraperManager); None = parseo completo
+        self.seen_links: Optional[Container[str]] = None
+        self.stopped_at_seen = False
+        
+        # Memoria del selector ganador, persistida entre reinicios
+        if self.LISTING_SELECTORS:
+            self.selector_memory = SelectorMemory(source_name, self.LISTING_SELECTORS)
+        else:
+            self.selector_memory = None
+        
         logger.info(f"Initialized {source_name} scraper with session ID: {self.session_id}")
     
+    @classmethod
+    def for_parsing(cls, source_name: str, selector_order: Optional[List[str]] = None) -> 'BaseScraper':
+        """Instancia que solo sirve para _parse_offers (workers de ParsePool)
+        
+        Sin sesión, proxies, caché ni memoria en disco: la cascada usa el orden que
+        manda el proceso padre y anota los intentos para que él los registre.
+        """
+        parser = cls.__new__(cls)
+        parser.source_name = source_name
+        parser.seen_links = None
+        parser.stopped_at_seen = False
+        if cls.LISTING_SELECTORS:
+            parser.selector_memory = SelectorCascade(selector_order or cls.LISTING_SELECTORS)
+        else:
+            parser.selector_memory = None
+        return parser
+    
     def _create_session(self) -> requests.Session:
         session = requests.Session()
         
@@ -131,7 +208,8 @@ class BaseScraper(ABC):
                         self.text = content.decode('utf-8', errors='ignore')
                         self.encoding = 'utf-8'
                 
-                return CachedResponse(cached_data.get('content', b''))
+                # El contenido se guarda en cache como hex
+                return CachedResponse(bytes.fromhex(cached_data.get('content', '')))
         
         # CHECK 2: Verificar si usamos proxy
         proxy = None
@@ -223,7 +301,8 @@ class BaseScraper(ABC):
                 raise requests.exceptions.HTTPError(f"Unexpected status: {response.status_code}")
         
         try:
-            response = _do_request()
+            with _host_slot(url):
+                response = _do_request()
             
             # Registrar métricas de éxito
             elapsed_time = time.time() - start_time
@@ -238,6 +317,283 @@ class BaseScraper(ABC):
             logger.error(f"❌ FALLO - {url[:50]}... | {str(e)[:100]}")
             return None
     
+    def _select_listings(self, soup) -> list:
+        """Busca las ofertas probando primero el selector que funcionó la última vez"""
+        if not self.selector_memory:
+            return []
+        
+        job_listings, selector = self.selector_memory.select(soup)
+        if job_listings:
+            logger.debug(f"Found {len(job_listings)} potential job listings using selector: {selector}")
+        return job_listings
+    
+    def _parse_content(self, content: bytes, encoding: Optional[str] = None) -> List[Dict[str, str]]:
+        """Parsea el HTML crudo, en el pool de procesos si está habilitado"""
+        pool = get_parse_pool()
+        if pool:
+            try:
+                order = self.selector_memory.ordered() if self.selector_memory else None
+                rows, attempts = pool.parse(type(self), self.source_name, content, encoding, order)
+                # La memoria de selectores solo la escribe este proceso
+                if self.selector_memory:
+                    self.selector_memory.apply(attempts)
+                # El worker no conoce seen_links: el corte incremental se aplica aquí,
+                # antes de materializar las ofertas
+                return [self._create_offer(*row) for row in self._iter_unseen(rows, lambda row: row[3])]
+            except Exception as e:
+                logger.warning(f"Parse pool failed, parsing in-thread: {str(e)[:100]}")
+        
+        soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+        return self._parse_offers(soup)
+    
+    @abstractmethod
+    def _parse_offers(self, soup) -> List[Dict[str, str]]:
+        pass
+    
+    def _extract_link(self, job_element) -> Optional[str]:
+        """Enlace de una oferta sin extraer el resto (None = no hay atajo)"""
+        return None
+    
+    def _absolute_url(self, link: str) -> str:
+        link = link.strip()
+        if link and self.BASE_URL and not link.startswith('http'):
+            return urljoin(self.BASE_URL, link)
+        return link
+    
+    def _iter_unseen(self, items: Iterable, link_of: Callable) -> Iterator:
+        """Recorre las ofertas (más nuevas primero) saltando las ya vistas.
+        
+        Se detiene tras INCREMENTAL_STOP_RUN enlaces conocidos seguidos, así el
+        coste de parseo escala con las ofertas nuevas y no con el tamaño de la página.
+        """
+        self.stopped_at_seen = False
+        if self.seen_links is None or Config.INCREMENTAL_STOP_RUN <= 0:
+            yield from items
+            return
+        
+        known_run = 0
+        new_count = 0
+        for item in items:
+            link = link_of(item)
+            if link and link in self.seen_links:
+                known_run += 1
+                if known_run >= Config.INCREMENTAL_STOP_RUN:
+                    self.stopped_at_seen = True
+                    logger.debug(f"{self.source_name}: {known_run} known links in a row, stopping parse")
+                    return
+                continue
+            
+            known_run = 0
+            new_count += 1
+            yield item
+        
+        # Una página corta con solo ofertas conocidas también cuenta como vista
+        if known_run and not new_count:
+            self.stopped_at_seen = True
+    
+    def _extract_structured_offers(self, soup) -> Tuple[bool, List[Dict[str, str]]]:
+        """Extrae ofertas de JSON-LD (JobPosting) y props JSON embebidas, sin recorrer el DOM
+        
+        Devuelve (hay datos estructurados, ofertas nuevas): una página cuyas ofertas
+        estructuradas ya son todas conocidas no debe caer a las heurísticas de DOM.
+        """
+        postings = []
+        
+        for script in soup.find_all('script', type=self.STRUCTURED_SCRIPT_TYPES):
+            data = self._decode_json(script.string or script.get_text())
+            if data is not None:
+                postings.extend(self._find_job_postings(data))
+        
+        # Islas de Astro: las props van serializadas como {clave: [tipo, valor]}
+        for island in soup.find_all('astro-island', props=True):
+            data = self._decode_json(island['props'])
+            if data:
+                postings.extend(self._find_job_postings(self._unwrap_astro_props(data)))
+        
+        candidates = []
+        page_links = set()
+        for posting in postings:
+            link = self._posting_link(posting)
+            if link and link not in page_links:
+                page_links.add(link)
+                candidates.append((posting, link))
+        
+        # El corte incremental va sobre los postings crudos: los ya vistos no se convierten en ofertas
+        offers = []
+        for posting, _ in self._iter_unseen(candidates, lambda candidate: candidate[1]):
+            offer = self._offer_from_job_posting(posting)
+            if offer:
+                offers.append(offer)
+        
+        if candidates:
+            logger.debug(f"Found {len(offers)}/{len(candidates)} new offers in structured data")
+        return bool(candidates), offers
+    
+    @staticmethod
+    def _decode_json(raw: Optional[str]):
+        if not raw or not raw.strip():
+            return None
+        try:
+            # orjson solo acepta str exacto, no NavigableString
+            return _json_loads(str(raw))
+        except Exception as e:
+            logger.debug(f"Invalid embedded JSON: {str(e)[:80]}")
+            return None
+    
+    @classmethod
+    def _unwrap_astro_props(cls, value):
+        """Deshace la serialización de props de Astro ([0, valor] / [1, lista])"""
+        if isinstance(value, dict):
+            return {key: cls._unwrap_astro_props(item) for key, item in value.items()}
+        if isinstance(value, list):
+            if len(value) == 2 and isinstance(value[0], int):
+                kind, inner = value
+                if kind == 1 and isinstance(inner, list):
+                    return [cls._unwrap_astro_props(item) for item in inner]
+                return cls._unwrap_astro_props(inner)
+            return [cls._unwrap_astro_props(item) for item in value]
+        return value
+    
+    @classmethod
+    def _find_job_postings(cls, data, depth: int = 0) -> Iterator[Dict]:
+        """Recorre el JSON buscando objetos JobPosting (incluye @graph e ItemList)"""
+        if depth > 12:
+            return
+        
+        if isinstance(data, list):
+            for item in data:
+                yield from cls._find_job_postings(item, depth + 1)
+        elif isinstance(data, dict):
+            types = data.get('@type', [])
+            if isinstance(types, str):
+                types = [types]
+            if 'JobPosting' in types:
+                yield data
+                return
+            for value in data.values():
+                if isinstance(value, (dict, list)):
+                    yield from cls._find_job_postings(value, depth + 1)
+    
+    def _offer_from_job_posting(self, posting: Dict) -> Optional[Dict[str, str]]:
+        title = posting.get('title') or posting.get('name') or ''
+        link = self._posting_link(posting)
+        if not isinstance(title, str) or not title.strip() or not link:
+            return None
+        
+        company = posting.get('hiringOrganization') or ''
+        if isinstance(company, dict):
+            company = company.get('name', '')
+        if not isinstance(company, str):
+            company = ''
+        
+        description = posting.get('description') or ''
+        if not isinstance(description, str):
+            description = ''
+        if '<' in description:
+            description = BeautifulSoup(description, 'html.parser').get_text(' ', strip=True)
+        
+        return self._create_offer(title, company, description or 'Sin descripción disponible', link)
+    
+    def _posting_link(self, posting: Dict) -> Optional[str]:
+        """URL absoluta http(s) de la oferta; @id suele ser "#job" o una URN y no vale como enlace"""
+        for key in ('url', '@id'):
+            value = posting.get(key)
+            if not isinstance(value, str) or not value.strip():
+                continue
+            link = urljoin(self.BASE_URL, value.strip()) if self.BASE_URL else value.strip()
+            parsed = urlparse(link)
+            if parsed.scheme in ('http', 'https') and parsed.netloc and not value.strip().startswith('#'):
+                return link
+        return None
+    
+    def _fetch_direct(self, url: str) -> Optional[Page]:
+        """Request directo (sin cache ni proxies), usado por Cubisima y CuCoders"""
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        }
+        
+        with _host_slot(url):
+            response = requests.get(
+                url,
+                headers=headers,
+                timeout=Config.REQUEST_TIMEOUT
+            )
+        
+        if response.status_code != 200:
+            logger.warning(f"Failed to fetch {url}, status: {response.status_code}")
+            return None
+        # Cubisima y CuCoders se decodifican siempre como UTF-8 (su cabecera no siempre lo dice)
+        return response.content, 'utf-8'
+    
+    def _fetch_with_session(self, url: str) -> Optional[Page]:
+        """Request con cache, proxies y retry (_make_request)"""
+        response = self._make_request(url)
+        if not response:
+            return None
+        # La misma codificación que usaría response.text: la de la cabecera o la detectada
+        encoding = response.encoding or getattr(response, 'apparent_encoding', None)
+        return response.content, encoding
+    
+    def _page_url(self, url: str, page: int) -> str:
+        """URL de la página N del listado (la 1 es la URL configurada)"""
+        if page <= 1:
+            return url
+        parsed = urlparse(url)
+        # Se conservan los parámetros tal cual (p. ej. "?categoriaestricta" sin valor)
+        params = [part for part in parsed.query.split('&') if part and part.split('=')[0] != self.PAGE_PARAM]
+        params.append(f"{self.PAGE_PARAM}={page}")
+        return parsed._replace(query='&'.join(params)).geturl()
+    
+    def _crawl(self, url: str, fetch: Callable[[str], Optional[Page]]) -> List[Dict[str, str]]:
+        """Recorre hasta MAX_PAGES páginas del listado.
+        
+        Las páginas 2..N se descargan en paralelo en ventanas del tamaño del
+        límite por host y se parsean en orden; el recorrido termina en la
+        primera página que solo trae ofertas ya vistas.
+        """
+        page = fetch(url)
+        if not page:
+            return []
+        
+        offers = self._parse_content(*page)
+        crawl_links = {offer['link'] for offer in offers}
+        
+        if self.stopped_at_seen or not offers or Config.MAX_PAGES <= 1:
+            return offers
+        
+        def fetch_page(page: int) -> Optional[Page]:
+            try:
+                return fetch(self._page_url(url, page))
+            except Exception as e:
+                logger.debug(f"Error fetching page {page} of {url}: {str(e)[:80]}")
+                return None
+        
+        window = max(1, Config.MAX_CONNECTIONS_PER_HOST)
+        page = 2
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            while page <= Config.MAX_PAGES:
+                pages = range(page, min(page + window, Config.MAX_PAGES + 1))
+                for number, fetched in zip(pages, executor.map(fetch_page, pages)):
+                    page_offers = [
+                        offer for offer in (self._parse_content(*fetched) if fetched else [])
+                        if offer['link'] not in crawl_links
+                    ]
+                    offers.extend(page_offers)
+                    crawl_links.update(offer['link'] for offer in page_offers)
+                    
+                    # Página sin ofertas nuevas (o que repite la anterior): no hay más que ver
+                    if self.stopped_at_seen or not page_offers:
+                        logger.debug(f"{self.source_name}: stopping pagination at page {number}")
+                        return offers
+                page += window
+        
+        return offers
+    
     @abstractmethod
     def scrape(self) -> List[Dict[str, str]]:
         pass
@@ -248,11 +604,12 @@ class BaseScraper(ABC):
         company: str,
         description: str,
         link: str
-    ) -> Dict[str, str]:
-        return {
-            'title': title.strip(),
-            'company': company.strip() if company else 'No especificada',
-            'description': description.strip(),
-            'link': link.strip(),
-            'source': self.source_name
-        }
+    ) -> Offer:
+        # Texto normalizado y huella se calculan al primer uso y quedan cacheados
+        return Offer(
+            title.strip(),
+            company.strip() if company else 'No especificada',
+            description.strip(),
+            link.strip(),
+            self.source_name
+        )
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from scrapers.base_scraper import BaseScraper
 from bot.config import Config
@@ -9,6 +9,22 @@ logger = setup_logger(__name__)
 
 class CubisimaScraper(BaseScraper):
     
+    BASE_URL = "https://www.cubisima.com/"
+    
+    # Multiple strategies to find job listings
+    LISTING_SELECTORS = [
+        'div.job-listing',
+        'div.offer-item',
+        'article.job',
+        'div.row',
+        'div.listing-item',
+        '.job-item',
+        '.offer',
+        'li.resultado',
+        'div.resultado',
+        '.list-item'
+    ]
+    
     def __init__(self):
         super().__init__("Cubisima", use_cache=True, use_proxy=True)
         self.urls = [
@@ -25,34 +41,8 @@ class CubisimaScraper(BaseScraper):
             logger.debug(f"Scraping URL: {url}")
             
             # Use direct request approach to avoid encoding issues
-            import requests
-            from bot.config import Config
-            
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                }
-                
-                response = requests.get(
-                    url, 
-                    headers=headers, 
-                    timeout=Config.REQUEST_TIMEOUT
-                )
-                
-                if response.status_code != 200:
-                    logger.warning(f"Failed to fetch {url}, status: {response.status_code}")
-                    continue
-                
-                # Force UTF-8 encoding
-                response.encoding = 'utf-8'
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                offers = self._parse_offers(soup)
+                offers = self._crawl(url, self._fetch_direct)
                 all_offers.extend(offers)
                 logger.info(f"Scraped {len(offers)} offers from {url}")
                 
@@ -64,28 +54,14 @@ class CubisimaScraper(BaseScraper):
         return all_offers
     
     def _parse_offers(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        offers = []
+        # Fast path: JSON-LD / JSON embebido; las heurísticas de DOM solo si no hay
+        # (aunque todas sus ofertas sean ya conocidas)
+        structured, offers = self._extract_structured_offers(soup)
+        if structured:
+            return offers
         
-        # Multiple strategies to find job listings
-        selectors = [
-            'div.job-listing',
-            'div.offer-item',
-            'article.job',
-            'div.row',
-            'div.listing-item',
-            '.job-item',
-            '.offer',
-            'li.resultado',
-            'div.resultado',
-            '.list-item'
-        ]
-        
-        job_listings = []
-        for selector in selectors:
-            job_listings = soup.select(selector)
-            if job_listings:
-                logger.debug(f"Found {len(job_listings)} potential job listings using selector: {selector}")
-                break
+        # Cascada adaptativa: el último selector ganador se prueba primero
+        job_listings = self._select_listings(soup)
         
         if not job_listings:
             # Try finding by common job-related text patterns
@@ -97,7 +73,8 @@ class CubisimaScraper(BaseScraper):
             
             logger.debug(f"Found {len(job_listings)} potential jobs by text pattern")
         
-        for job in job_listings:
+        # Solo se extraen las ofertas nuevas (ver BaseScraper._iter_unseen)
+        for job in self._iter_unseen(job_listings, self._extract_link):
             try:
                 offer = self._extract_job_info(job)
                 if offer:
@@ -110,6 +87,23 @@ class CubisimaScraper(BaseScraper):
         
         return offers
     
+    def _extract_link(self, job_element) -> Optional[str]:
+        """Cheap link lookup, mirrors the title/link strategies of _extract_job_info"""
+        title_elem = None
+        for tag in ['h1', 'h2', 'h3', 'h4', 'h5']:
+            title_elem = job_element.find(tag)
+            if title_elem:
+                link_elem = title_elem.find('a') or title_elem.find_parent('a')
+                if link_elem:
+                    return self._absolute_url(link_elem.get('href', '')) or None
+        
+        if not title_elem:
+            link_elem = job_element.find('a', class_=['job-title', 'title', 'offer-title']) or job_element.find('a')
+            if link_elem:
+                return self._absolute_url(link_elem.get('href', '')) or None
+        
+        return None
+    
     def _extract_job_info(self, job_element) -> Dict[str, str]:
         """Extract job information from a job listing element"""
         try:
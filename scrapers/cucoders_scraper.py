@@ -9,6 +9,8 @@ logger = setup_logger(__name__)
 
 class CucodersScraper(BaseScraper):
     
+    BASE_URL = "https://cucoders.dev/"
+    
     def __init__(self):
         super().__init__("CuCoders", use_cache=True, use_proxy=True)
         self.url = Config.CUCODERS_URL
@@ -17,34 +19,8 @@ class CucodersScraper(BaseScraper):
         logger.info(f"Starting scraping from {self.source_name}")
         
         # Use direct request approach to avoid encoding issues
-        import requests
-        from bot.config import Config
-        
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-            
-            response = requests.get(
-                self.url, 
-                headers=headers, 
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Failed to fetch data from {self.source_name}, status: {response.status_code}")
-                return []
-            
-            # Force UTF-8 encoding
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            offers = self._parse_offers(soup)
+            offers = self._crawl(self.url, self._fetch_direct)
             logger.info(f"Successfully scraped {len(offers)} offers from {self.source_name}")
             return offers
             
@@ -57,18 +33,8 @@ class CucodersScraper(BaseScraper):
     
     def _scrape_with_base_method(self) -> List[Dict[str, str]]:
         """Fallback scraping using the base scraper method"""
-        response = self._make_request(self.url)
-        if not response:
-            logger.error(f"Failed to fetch data from {self.source_name}")
-            return []
-        
         try:
-            # Handle encoding properly
-            if response.encoding.lower() not in ['utf-8', 'utf8']:
-                response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            offers = self._parse_offers(soup)
+            offers = self._crawl(self.url, self._fetch_with_session)
             logger.info(f"Successfully scraped {len(offers)} offers from {self.source_name}")
             return offers
         except Exception as e:
@@ -76,7 +42,11 @@ class CucodersScraper(BaseScraper):
             return []
     
     def _parse_offers(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        offers = []
+        # Fast path: JSON-LD / JSON embebido; las heurísticas de DOM solo si no hay
+        # (aunque todas sus ofertas sean ya conocidas)
+        structured, offers = self._extract_structured_offers(soup)
+        if structured:
+            return offers
         
         # CuCoders uses Astro framework with dynamic content
         # Look for job listings in the actual structure observed
@@ -99,26 +69,16 @@ class CucodersScraper(BaseScraper):
             logger.debug(f"Job link {i+1}: {href} -> {text}...")
         
         if job_links:
-            # Group links by their parent container to avoid duplicates
-            seen_containers = set()
+            # Containers are resolved lazily so the incremental cut-off also
+            # skips the container lookup for already-seen jobs
+            containers = self._iter_containers(job_links)
             
-            for link in job_links:
+            for link, container in self._iter_unseen(containers, lambda pair: self._absolute_url(pair[0].get('href', ''))):
                 try:
-                    # Get the container div that holds this job
-                    container = link.find_parent('div', class_='inline-grid')
-                    if not container:
-                        container = link.find_parent('div', class_=lambda x: x and 'inline-grid' in x if x else False)
-                    
-                    if container:
-                        container_id = str(container)
-                        if container_id in seen_containers:
-                            continue
-                        seen_containers.add(container_id)
-                        
-                        offer = self._extract_job_info(container)
-                        if offer:
-                            offers.append(offer)
-                            logger.debug(f"Parsed offer: {offer['title']}")
+                    offer = self._extract_job_info(container)
+                    if offer:
+                        offers.append(offer)
+                        logger.debug(f"Parsed offer: {offer['title']}")
                 
                 except Exception as e:
                     logger.debug(f"Error parsing job container: {str(e)}")
@@ -127,6 +87,28 @@ class CucodersScraper(BaseScraper):
         logger.debug(f"Total offers extracted: {len(offers)}")
         return offers
     
+    def _iter_containers(self, job_links):
+        """Yield (link, container) pairs, grouping links by their parent container to avoid duplicates"""
+        seen_containers = set()
+        
+        for link in job_links:
+            try:
+                # Get the container div that holds this job
+                container = link.find_parent('div', class_='inline-grid')
+                if not container:
+                    container = link.find_parent('div', class_=lambda x: x and 'inline-grid' in x if x else False)
+                
+                if container:
+                    container_id = str(container)
+                    if container_id in seen_containers:
+                        continue
+                    seen_containers.add(container_id)
+                    yield link, container
+            
+            except Exception as e:
+                logger.debug(f"Error parsing job container: {str(e)}")
+                continue
+    
     def _extract_job_info(self, job_element) -> Dict[str, str]:
         """Extract job information from a job listing element"""
         try:
@@ -0,0 +1,102 @@
+"""
+Offer - Registro compacto de una oferta de empleo
+Usa __slots__ en lugar de un dict por oferta: sin diccionario por instancia,
+la fuente internada (un solo str compartido por fuente) y el texto
+normalizado y la huella calculados solo cuando alguien los pide.
+Se comporta como un Mapping de solo lectura (offer['title'], offer.get(...))
+para que filtros, formatter y métricas sigan funcionando sin cambios.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+from bot.utils.text import normalize_text
+from filters.dedupe import content_fingerprint
+
+# Claves visibles en la vista de dict, en el orden de siempre
+FIELDS = ('title', 'company', 'description', 'link', 'source')
+
+# Claves calculadas: accesibles con offer['search_text'] pero fuera de keys()/to_dict()
+DERIVED = ('search_text', 'fingerprint')
+
+
+class Offer(Mapping):
+
+    __slots__ = (
+        'title', 'company', 'description', 'link', 'source',
+        'first_seen', '_search_text', '_fingerprint'
+    )
+
+    def __init__(
+        self,
+        title: str,
+        company: str,
+        description: str,
+        link: str,
+        source: str,
+        first_seen: Optional[float] = None
+    ):
+        self.title = title
+        self.company = company
+        self.description = description
+        self.link = link
+        # Pocas fuentes distintas para miles de ofertas: un único objeto str por fuente
+        self.source = sys.intern(source)
+        self.first_seen = first_seen
+        self._search_text: Optional[str] = None
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Offer':
+        return cls(
+            data.get('title', ''),
+            data.get('company', 'No especificada'),
+            data.get('description', ''),
+            data.get('link', ''),
+            data.get('source', 'Desconocida'),
+            data.get('first_seen')
+        )
+
+    @property
+    def search_text(self) -> str:
+        """Título, descripción y empresa normalizados (calculado una vez)"""
+        if self._search_text is None:
+            self._search_text = normalize_text(f"{self.title} {self.description} {self.company}")
+        return self._search_text
+
+    @property
+    def fingerprint(self) -> str:
+        """Huella de contenido para dedupe (calculada una vez)"""
+        if self._fingerprint is None:
+            self._fingerprint = content_fingerprint(self)
+        return self._fingerprint
+
+    def __getitem__(self, key: str) -> Any:
+        if key in FIELDS or key in DERIVED:
+            return getattr(self, key)
+        if key == 'first_seen' and self.first_seen is not None:
+            return self.first_seen
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in FIELDS and key != 'first_seen':
+            raise KeyError(key)
+        setattr(self, key, sys.intern(value) if key == 'source' else value)
+        if key != 'first_seen':
+            # El texto cambió: se recalcula la próxima vez
+            self._search_text = None
+            self._fingerprint = None
+
+    def __iter__(self) -> Iterator[str]:
+        yield from FIELDS
+        if self.first_seen is not None:
+            yield 'first_seen'
+
+    def __len__(self) -> int:
+        return len(FIELDS) + (self.first_seen is not None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"Offer(title={self.title!r}, source={self.source!r}, link={self.link!r})"
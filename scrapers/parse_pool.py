@@ -0,0 +1,85 @@
+"""
+Parse Pool - Parseo de HTML en procesos separados para escapar del GIL
+La descarga sigue en los hilos del ScraperManager; aquí solo viaja el HTML crudo
+(bytes) hacia los workers y vuelven tuplas compactas de ofertas. Los workers no
+tienen red ni estado persistente: reciben el orden de selectores del padre y le
+devuelven los intentos para que él actualice su SelectorMemory
+"""
+
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from bs4 import BeautifulSoup
+from bot.config import Config
+from bot.utils.logger import setup_logger
+from scrapers.selector_memory import Attempts
+
+logger = setup_logger(__name__)
+
+# (title, company, description, link): lo mínimo para reconstruir la oferta
+OfferRow = Tuple[str, str, str, str]
+
+
+def parse_html(
+    scraper_cls: type,
+    source_name: str,
+    content: bytes,
+    encoding: Optional[str] = None,
+    selector_order: Optional[List[str]] = None
+) -> Tuple[List[OfferRow], Attempts]:
+    """Parsea una página con el _parse_offers del scraper; devuelve (tuplas, intentos de selectores)"""
+    parser = scraper_cls.for_parsing(source_name, selector_order)
+    soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+    rows = [
+        (offer['title'], offer['company'], offer['description'], offer['link'])
+        for offer in parser._parse_offers(soup)
+    ]
+    attempts = parser.selector_memory.attempts if parser.selector_memory else []
+    return rows, attempts
+
+
+class ParsePool:
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        # spawn: el proceso padre tiene hilos activos, fork no es seguro
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        logger.info(f"ParsePool inicializado con {workers} procesos")
+
+    def parse(
+        self,
+        scraper_cls: type,
+        source_name: str,
+        content: bytes,
+        encoding: Optional[str] = None,
+        selector_order: Optional[List[str]] = None
+    ) -> Tuple[List[OfferRow], Attempts]:
+        """Envía la página a un worker y espera las tuplas de ofertas y los intentos de selectores"""
+        future = self.executor.submit(parse_html, scraper_cls, source_name, content, encoding, selector_order)
+        return future.result(timeout=Config.REQUEST_TIMEOUT)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[ParsePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """Pool compartido por todos los scrapers, o None si PARSE_WORKERS=0"""
+    global _pool
+
+    if Config.PARSE_WORKERS <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool(Config.PARSE_WORKERS)
+            atexit.register(_pool.shutdown)
+    return _pool
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 import time
 import random
@@ -27,6 +27,22 @@ except ImportError as e:
 
 class RevolicoScraper(BaseScraper):
     
+    BASE_URL = "https://www.revolico.com/"
+    
+    # Multiple strategies to find job listings
+    LISTING_SELECTORS = [
+        'li.listing-item',
+        'div.ad-item',
+        'article',
+        'div.listing',
+        '.result-item',
+        '.ad-listing',
+        'div[class*="item"]',
+        'li[class*="listing"]',
+        '.post-item',
+        '.job-item'
+    ]
+    
     def __init__(self):
         super().__init__("Revolico", use_cache=True, use_proxy=True)
         self.url = Config.REVOLICO_URL
@@ -124,35 +140,11 @@ class RevolicoScraper(BaseScraper):
         
         logger.error(f"❌ FALLO TOTAL: No se pudieron obtener ofertas de {self.source_name}")
         return []
-        
-        # Try multiple URL strategies
-        urls_to_try = [
-            "https://www.revolico.com/empleos",
-            "https://www.revolico.com/empleos",
-        ]
-        
-        # Probar cada URL con método mejorado
-        for url in urls_to_try:
-            logger.info(f"🔗 Probando URL: {url}")
-            
-            try:
-                response = self._make_request(url)
-                
-                if response and response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    offers = self._parse_offers(soup)
-                    
-                    if offers:
-                        return offers
-                
-                # Esperar entre intentos
-                time.sleep(random.uniform(3, 6))
-                
-            except Exception as e:
-                logger.debug(f"Error con URL {url}: {str(e)[:80]}")
-                continue
-        
-        return []
+    
+    def _scrape_with_http(self) -> List[Dict[str, str]]:
+        """Método HTTP mejorado (cache, proxies y retry) recorriendo varias páginas"""
+        logger.info(f"🔗 Probando URL: {self.url}")
+        return self._crawl(self.url, self._fetch_with_session)
     
     def _strategy_basic(self, url: str):
         """Basic request with random headers"""
@@ -227,28 +219,14 @@ class RevolicoScraper(BaseScraper):
             self.driver = None
     
     def _parse_offers(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
-        offers = []
-        
-        # Multiple strategies to find job listings
-        selectors = [
-            'li.listing-item',
-            'div.ad-item',
-            'article',
-            'div.listing',
-            '.result-item',
-            '.ad-listing',
-            'div[class*="item"]',
-            'li[class*="listing"]',
-            '.post-item',
-            '.job-item'
-        ]
+        # Fast path: JSON-LD / JSON embebido; las heurísticas de DOM solo si no hay
+        # (aunque todas sus ofertas sean ya conocidas)
+        structured, offers = self._extract_structured_offers(soup)
+        if structured:
+            return offers
         
-        job_listings = []
-        for selector in selectors:
-            job_listings = soup.select(selector)
-            if job_listings:
-                logger.debug(f"Found {len(job_listings)} potential job listings using selector: {selector}")
-                break
+        # Cascada adaptativa: el último selector ganador se prueba primero
+        job_listings = self._select_listings(soup)
         
         if not job_listings:
             # Try finding by common job-related text patterns
@@ -260,7 +238,8 @@ class RevolicoScraper(BaseScraper):
             
             logger.debug(f"Found {len(job_listings)} potential jobs by text pattern")
         
-        for job in job_listings:
+        # Solo se extraen las ofertas nuevas (ver BaseScraper._iter_unseen)
+        for job in self._iter_unseen(job_listings, self._extract_link):
             try:
                 offer = self._extract_job_info(job)
                 if offer:
@@ -273,6 +252,13 @@ class RevolicoScraper(BaseScraper):
         
         return offers
     
+    def _extract_link(self, job_element) -> Optional[str]:
+        """Cheap link lookup, mirrors the anchor strategy of _extract_job_info"""
+        link_elem = job_element.find('a')
+        if not link_elem or not link_elem.get('href'):
+            return None
+        return self._absolute_url(link_elem['href'])
+    
     def _extract_job_info(self, job_element) -> Dict[str, str]:
         """Extract job information from a job listing element"""
         try:
@@ -1,15 +1,28 @@
-from typing import List, Dict
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ThreadPoolExecutor
 from scrapers.revolico_scraper import RevolicoScraper
 from scrapers.cubisima_scraper import CubisimaScraper
 from scrapers.cucoders_scraper import CucodersScraper
 from filters.job_filter import JobFilter
+from filters.dedupe import OfferDeduplicator
+from filters.near_dedupe import NearDuplicateDetector
+from storage.offer_store import OfferStore
+from storage.bloom import SeenSet
+from bot.config import Config
 from bot.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
+class SourceResult(NamedTuple):
+    source: str
+    scraped: int
+    new: int
+    error: Optional[str] = None
+
+
 class ScraperManager:
     
     def __init__(self):
@@ -19,36 +32,93 @@ class ScraperManager:
             CucodersScraper()
         ]
         self.job_filter = JobFilter()
+        self.deduplicator = OfferDeduplicator()
+        self.near_duplicates = NearDuplicateDetector()
+        
+        # Historial en SQLite: tras un reinicio se retoma desde las últimas ofertas vistas
+        self.store = OfferStore()
+        
+        # Incremental: los scrapers dejan de parsear al llegar a enlaces ya vistos,
+        # así que cada ciclo solo aporta ofertas nuevas y las relevantes se acumulan.
+        # Filtro de Bloom en disco delante del store: memoria acotada tras meses de enlaces
+        self.seen_links = SeenSet(self.store)
+        self.matched_offers: List[Dict[str, str]] = []
+        # Todas las ofertas recientes, sin filtrar (para los temas de cada usuario)
+        self.recent_offers: List[Dict[str, str]] = []
+        if Config.INCREMENTAL_STOP_RUN > 0:
+            for scraper in self.scrapers:
+                scraper.seen_links = self.seen_links
+        
+        # Ofertas nunca vistas del último ciclo
+        self.last_new_offers: List[Dict[str, str]] = []
+        # Ofertas nuevas aún sin avisar a los suscriptores, las haya encontrado el ciclo
+        # de fondo o un "Ofertas" (las más recientes primero, acotadas como las demás)
+        self.unnotified_offers: List[Dict[str, str]] = []
+        # Cambia cada vez que entran ofertas nuevas: clave de los snapshots de respuestas
+        self.version = 0
+        # first_seen de las ofertas que trajo la versión actual: el cursor de "solo nuevas"
+        # que se guarda por chat, igual para todos los que preguntaron con la misma versión
+        self.version_time = 0.0
+        self._scrape_lock = asyncio.Lock()
+        
+        self._restore_recent()
+        
         logger.info(f"Initialized ScraperManager with {len(self.scrapers)} scrapers")
     
     async def scrape_all(self) -> List[Dict[str, str]]:
         logger.info("Starting parallel scraping from all sources")
         
-        loop = asyncio.get_event_loop()
-        all_offers = []
-        
-        with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
-            future_to_scraper = {
-                executor.submit(scraper.scrape): scraper 
-                for scraper in self.scrapers
-            }
-            
-            for future in as_completed(future_to_scraper):
-                scraper = future_to_scraper[future]
-                try:
-                    offers = future.result()
-                    all_offers.extend(offers)
-                    logger.info(f"{scraper.source_name} returned {len(offers)} offers")
-                except Exception as e:
-                    logger.error(f"Error scraping {scraper.source_name}: {str(e)}")
-        
-        logger.info(f"Total offers scraped (before filtering): {len(all_offers)}")
+        async for _ in self.iter_source_results():
+            pass
         
-        filtered_offers = self.job_filter.filter_offers(all_offers)
-        
-        logger.info(f"Total offers after filtering: {len(filtered_offers)}")
+        return self.matched_offers
+    
+    async def iter_source_results(self) -> AsyncIterator[SourceResult]:
+        """Un resultado por fuente, en orden de llegada, ya fusionado en las ofertas conocidas
         
-        return filtered_offers
+        La fuente más rápida se puede mostrar sin esperar a la más lenta. Quien consuma
+        el iterador a medias debe cerrarlo (contextlib.aclosing) para soltar el lock.
+        """
+        # Un ciclo a la vez: el de segundo plano y los "Ofertas" comparten scrapers y store
+        async with self._scrape_lock:
+            self.last_new_offers = []
+            executor = ThreadPoolExecutor(max_workers=len(self.scrapers))
+            tasks = [
+                asyncio.ensure_future(self._run_scraper(executor, scraper))
+                for scraper in self.scrapers
+            ]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    source, offers, error = await next_done
+                    fresh_offers = self._merge_batch(offers)
+                    self.last_new_offers.extend(fresh_offers)
+                    yield SourceResult(source, len(offers), len(fresh_offers), error)
+            finally:
+                # Si se abandona el iterador, el lock no se suelta con scrapers aún corriendo:
+                # se cancelan los que no empezaron y se espera a los hilos que ya corren
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+    
+    async def _run_scraper(self, executor: ThreadPoolExecutor, scraper) -> Tuple[str, List[Dict[str, str]], Optional[str]]:
+        # Esperar sin bloquear el event loop: el bot sigue atendiendo mientras se scrapea
+        try:
+            offers = await asyncio.wrap_future(executor.submit(self._scrape, scraper))
+            logger.info(f"{scraper.source_name} returned {len(offers)} offers")
+            return scraper.source_name, offers, None
+        except Exception as e:
+            logger.error(f"Error scraping {scraper.source_name}: {str(e)}")
+            return scraper.source_name, [], str(e)
+    
+    @staticmethod
+    def _scrape(scraper) -> List[Dict[str, str]]:
+        """scrape() en el hilo del scraper; la memoria de selectores se guarda una vez por scrape"""
+        try:
+            return scraper.scrape()
+        finally:
+            if scraper.selector_memory:
+                scraper.selector_memory.flush()
     
     def scrape_all_sync(self) -> List[Dict[str, str]]:
         logger.info("Starting sequential scraping from all sources")
@@ -56,16 +126,74 @@ class ScraperManager:
         
         for scraper in self.scrapers:
             try:
-                offers = scraper.scrape()
+                offers = self._scrape(scraper)
                 all_offers.extend(offers)
                 logger.info(f"{scraper.source_name} returned {len(offers)} offers")
             except Exception as e:
                 logger.error(f"Error scraping {scraper.source_name}: {str(e)}")
         
-        logger.info(f"Total offers scraped (before filtering): {len(all_offers)}")
+        return self._merge_cycle(all_offers)
+    
+    def _restore_recent(self):
+        """Carga las últimas ofertas guardadas como punto de partida del primer ciclo"""
+        stored = self.store.new_since(0, limit=Config.MAX_KEPT_OFFERS)
+        self.seen_links.update(offer['link'] for offer in stored)
+        if stored:
+            self.version_time = stored[0]['first_seen']
+        # El store guarda también los duplicados: se vuelven a descartar (y se siembra el índice LSH)
+        self.recent_offers = self.dedupe_stored(stored, self.near_duplicates)
+        self.matched_offers = self.job_filter.filter_offers(self.recent_offers)
+        
+        if self.recent_offers:
+            logger.info(f"Restored {len(self.recent_offers)} offers from the store")
+    
+    def dedupe_stored(
+        self,
+        offers: List[Dict[str, str]],
+        near_duplicates: Optional[NearDuplicateDetector] = None
+    ) -> List[Dict[str, str]]:
+        """Quita de ofertas del store (más recientes primero) los duplicados que el ciclo en vivo descartó
+        
+        Se recorren en orden de llegada, como en vivo: se conserva la primera copia.
+        Sin `near_duplicates` se usa un detector nuevo y el índice en vivo no se toca.
+        """
+        near_duplicates = near_duplicates or NearDuplicateDetector()
+        chronological = self.deduplicator.dedupe(offers[::-1])
+        return near_duplicates.filter(chronological)[::-1]
+    
+    def take_unnotified(self) -> List[Dict[str, str]]:
+        """Entrega (y vacía) las ofertas nuevas pendientes de avisar"""
+        offers, self.unnotified_offers = self.unnotified_offers, []
+        return offers
+    
+    def _merge_cycle(self, new_offers: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Fusiona un ciclo completo de una vez; devuelve las ofertas relevantes acumuladas"""
+        self.last_new_offers = self._merge_batch(new_offers)
+        return self.matched_offers
+    
+    def _merge_batch(self, new_offers: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Filtra solo las ofertas nuevas del lote, las antepone a las ya conocidas y las devuelve"""
+        logger.info(f"Total offers scraped (before filtering): {len(new_offers)}")
+        
+        # Un solo upsert por lote; el store decide qué ofertas no se habían visto nunca
+        # (los fallbacks sin corte incremental pueden repetir ofertas ya conocidas)
+        now = time.time()
+        fresh_offers = self.store.upsert(new_offers, now=now)
+        self.seen_links.update(offer['link'] for offer in fresh_offers)
+        
+        # La misma oferta en varias categorías de Cubisima o repetida en Revolico
+        fresh_offers = self.deduplicator.dedupe(fresh_offers, known=self.recent_offers)
+        # Anuncios reposteados con cambios menores, contra la ventana de ofertas recientes
+        fresh_offers = self.near_duplicates.filter(fresh_offers)
         
-        filtered_offers = self.job_filter.filter_offers(all_offers)
+        if fresh_offers:
+            self.version += 1
+            self.version_time = now
+            self.unnotified_offers = (fresh_offers + self.unnotified_offers)[:Config.MAX_KEPT_OFFERS]
+        self.recent_offers = (fresh_offers + self.recent_offers)[:Config.MAX_KEPT_OFFERS]
+        filtered_offers = self.job_filter.filter_offers(fresh_offers)
         
         logger.info(f"Total offers after filtering: {len(filtered_offers)}")
         
-        return filtered_offers
+        self.matched_offers = (filtered_offers + self.matched_offers)[:Config.MAX_KEPT_OFFERS]
+        return fresh_offers
@@ -0,0 +1,143 @@
+"""
+Selector Memory - Recuerda qué selector CSS funcionó en cada sitio
+Prueba primero el último selector ganador y ordena el resto por tasa de acierto,
+así una página típica necesita un solo soup.select. Solo escribe a disco cuando
+cambia el ganador; las estadísticas se guardan una vez por scrape (flush).
+Los workers de ParsePool usan SelectorCascade: el orden llega del proceso padre
+y los intentos vuelven a él, que es el único que escribe la memoria
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from bot.config import Config
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# (selector, encontró elementos) en el orden en que se probaron
+Attempts = List[Tuple[str, bool]]
+
+
+class SelectorCascade:
+    """Cascada en un orden fijo que anota cada intento, sin estado persistente"""
+
+    def __init__(self, order: List[str]):
+        self.order = list(order)
+        self.attempts: Attempts = []
+
+    def select(self, soup) -> Tuple[list, Optional[str]]:
+        for selector in self.order:
+            elements = soup.select(selector)
+            self.attempts.append((selector, bool(elements)))
+            if elements:
+                return elements, selector
+        return [], None
+
+
+class SelectorMemory:
+
+    # Peso que conserva la historia en cada observación (los layouts cambian)
+    DECAY = 0.9
+
+    def __init__(self, site: str, selectors: List[str], data_dir: Optional[str] = None):
+        self.site = site
+        self.selectors = list(selectors)
+        self.path = Path(data_dir or Config.DATA_DIR) / f"selectors_{site.lower()}.json"
+        self.last_winner: Optional[str] = None
+        self.stats: Dict[str, Dict[str, float]] = {}
+        # Estadísticas en memoria aún no escritas a disco
+        self.dirty = False
+
+        self._load()
+        logger.debug(f"SelectorMemory {site}: último ganador={self.last_winner}")
+
+    def _load(self):
+        """Carga la memoria persistida (si existe)"""
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            stats = data.get('stats', {})
+            # Ignorar selectores que ya no están en la lista del scraper
+            self.stats = {s: stats[s] for s in self.selectors if s in stats}
+            winner = data.get('last_winner')
+            self.last_winner = winner if winner in self.selectors else None
+
+        except Exception as e:
+            logger.error(f"Error leyendo memoria de selectores: {e}")
+
+    def save(self):
+        """Guarda la memoria en disco (escritura atómica)"""
+        data = {
+            'site': self.site,
+            'last_winner': self.last_winner,
+            'stats': self.stats
+        }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except Exception as e:
+            logger.error(f"Error guardando memoria de selectores: {e}")
+
+    def hit_rate(self, selector: str) -> float:
+        """Tasa de acierto suavizada: un selector sin historia vale 0.5"""
+        stat = self.stats.get(selector, {})
+        return (stat.get('hits', 0.0) + 1) / (stat.get('attempts', 0.0) + 2)
+
+    def ordered(self) -> List[str]:
+        """Selectores en el orden en que deben probarse"""
+        position = {s: i for i, s in enumerate(self.selectors)}
+        return sorted(
+            self.selectors,
+            key=lambda s: (s != self.last_winner, -self.hit_rate(s), position[s])
+        )
+
+    def record(self, selector: str, hit: bool):
+        """Registra el resultado de probar un selector"""
+        stat = self.stats.setdefault(selector, {'hits': 0.0, 'attempts': 0.0})
+        stat['hits'] = stat['hits'] * self.DECAY + (1.0 if hit else 0.0)
+        stat['attempts'] = stat['attempts'] * self.DECAY + 1.0
+        self.dirty = True
+
+        if hit:
+            if selector != self.last_winner:
+                logger.info(f"{self.site}: nuevo selector ganador '{selector}' (antes: {self.last_winner})")
+            self.last_winner = selector
+
+    def select(self, soup) -> Tuple[list, Optional[str]]:
+        """Ejecuta la cascada en orden adaptativo y devuelve (elementos, selector ganador)"""
+        cascade = SelectorCascade(self.ordered())
+        elements, selector = cascade.select(soup)
+        self.apply(cascade.attempts)
+        return elements, selector
+
+    def apply(self, attempts: Attempts):
+        """Registra los intentos de una cascada (propia o de un worker de ParsePool)"""
+        if not attempts:
+            return
+
+        previous = self.last_winner
+        for selector, hit in attempts:
+            if selector in self.selectors:
+                self.record(selector, hit)
+        if not any(hit for _, hit in attempts):
+            self.last_winner = None
+
+        # Un cambio de ganador (layout nuevo) se persiste ya; el resto espera a flush()
+        if self.last_winner != previous:
+            self.save()
+
+    def flush(self):
+        """Guarda las estadísticas acumuladas si hay cambios (al terminar cada scrape)"""
+        if self.dirty:
+            self.save()
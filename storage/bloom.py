@@ -0,0 +1,192 @@
+"""
+Bloom - Conjunto de enlaces vistos con memoria acotada
+Un filtro de Bloom escalable (capas que crecen al llenarse, con tasa de
+falsos positivos cada vez más estricta) guardado en archivos mapeados con
+mmap: ocupa ~2 bytes por enlace con 0.1% de falsos positivos y sobrevive
+a los reinicios sin cargarse en memoria. SeenSet lo consulta antes que el
+OfferStore, así la mayoría de los enlaces nuevos nunca tocan la base.
+"""
+
+import hashlib
+import math
+import mmap
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional
+from bot.config import Config
+from bot.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# magic, bits, hashes, capacity, count
+_HEADER = struct.Struct('<4sQIQQ')
+_MAGIC = b'BLM1'
+_COUNT_OFFSET = _HEADER.size - 8
+
+
+def _hash_pair(key: str):
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de dos hashes
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BloomFilter:
+    """Una capa de tamaño fijo sobre un archivo mapeado en memoria"""
+
+    def __init__(self, path: Path, capacity: int = 0, error_rate: float = 0.0):
+        """Abre la capa guardada en `path` o la crea con la capacidad y tasa dadas"""
+        self.path = path
+        if path.exists():
+            self._open()
+        else:
+            bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+            hashes = max(1, round(bits / capacity * math.log(2)))
+            self._create(bits, hashes, capacity)
+
+    def _create(self, bits: int, hashes: int, capacity: int):
+        size = _HEADER.size + (bits + 7) // 8
+        with open(self.path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, bits, hashes, capacity, 0))
+            f.truncate(size)
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'r+b') as f:
+            self.mm = mmap.mmap(f.fileno(), 0)
+        magic, self.bits, self.hashes, self.capacity, self.count = _HEADER.unpack_from(self.mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} no es un filtro de Bloom")
+
+    def _positions(self, h1: int, h2: int):
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def contains(self, h1: int, h2: int) -> bool:
+        mm, offset = self.mm, _HEADER.size
+        return all(mm[offset + (bit >> 3)] & (1 << (bit & 7)) for bit in self._positions(h1, h2))
+
+    def add(self, h1: int, h2: int):
+        mm, offset = self.mm, _HEADER.size
+        for bit in self._positions(h1, h2):
+            mm[offset + (bit >> 3)] |= 1 << (bit & 7)
+        self.count += 1
+        struct.pack_into('<Q', mm, _COUNT_OFFSET, self.count)
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        self.mm.flush()
+        self.mm.close()
+
+
+class ScalableBloomFilter:
+    """Capas de Bloom: cuando una se llena se abre otra más grande y más estricta"""
+
+    GROWTH = 2
+    # Cada capa nueva divide su tasa de error: el total queda acotado por error_rate / (1 - 0.5)
+    TIGHTENING = 0.5
+
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        name: str = 'seen',
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None
+    ):
+        self.dir = Path(data_dir or Config.DATA_DIR)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.capacity = capacity or Config.SEEN_FILTER_CAPACITY
+        # La mitad del presupuesto para la primera capa; las demás se ajustan con TIGHTENING
+        self.error_rate = (error_rate or Config.SEEN_FILTER_ERROR_RATE) * (1 - self.TIGHTENING)
+        self._lock = threading.Lock()
+
+        self.layers: List[BloomFilter] = []
+        while self._layer_path(len(self.layers)).exists():
+            self.layers.append(BloomFilter(self._layer_path(len(self.layers))))
+        if not self.layers:
+            self._add_layer()
+
+        logger.info(f"ScalableBloomFilter '{name}': {len(self.layers)} capas, {len(self)} enlaces")
+
+    def _layer_path(self, index: int) -> Path:
+        return self.dir / f"{self.name}.bloom.{index}"
+
+    def _add_layer(self):
+        index = len(self.layers)
+        self.layers.append(BloomFilter(
+            self._layer_path(index),
+            self.capacity * self.GROWTH ** index,
+            self.error_rate * self.TIGHTENING ** index
+        ))
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = _hash_pair(key)
+        return any(layer.contains(h1, h2) for layer in reversed(self.layers))
+
+    def add(self, key: str) -> bool:
+        """Añade la clave; False si (probablemente) ya estaba"""
+        h1, h2 = _hash_pair(key)
+        with self._lock:
+            if any(layer.contains(h1, h2) for layer in self.layers):
+                return False
+            if self.layers[-1].full:
+                self._add_layer()
+            self.layers[-1].add(h1, h2)
+            return True
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self.layers)
+
+    def flush(self):
+        for layer in self.layers:
+            layer.flush()
+
+    def close(self):
+        for layer in self.layers:
+            layer.close()
+
+
+class SeenSet:
+    """Enlaces ya vistos: Bloom como primer filtro y el OfferStore como respuesta exacta
+
+    Los scrapers lo usan como `seen_links` (solo necesitan `in`). Un "no" del
+    filtro es definitivo; un "sí" se confirma en la base, así un falso
+    positivo nunca hace que se salte una oferta nueva.
+    """
+
+    def __init__(self, store, bloom: Optional[ScalableBloomFilter] = None):
+        self.store = store
+        self.bloom = bloom or ScalableBloomFilter(str(store.path.parent))
+        # Filtro nuevo junto a una base con historial (primer arranque o archivo borrado)
+        if not len(self.bloom) and len(store):
+            self.bloom.update(store.iter_urls())
+            self.bloom.flush()
+            logger.info(f"SeenSet: filtro reconstruido con {len(self.bloom)} enlaces del store")
+
+        self.bloom_misses = 0
+        self.store_checks = 0
+
+    def __contains__(self, link: str) -> bool:
+        if link not in self.bloom:
+            self.bloom_misses += 1
+            return False
+        self.store_checks += 1
+        return self.store.has_link(link)
+
+    def add(self, link: str):
+        # El store ya tiene la oferta (upsert del ciclo): aquí solo se alimenta el filtro
+        self.bloom.add(link)
+
+    def update(self, links: Iterable[str]):
+        self.bloom.update(links)
@@ -0,0 +1,240 @@
+"""
+Offer Store - Historial persistente de ofertas en SQLite
+Cada ciclo de scraping se guarda en una sola transacción (upsert por hash
+del enlace canónico) y cada oferta conserva la fecha en que se vio por
+primera vez, así tras un reinicio se sigue distinguiendo lo nuevo de lo viejo.
+Se guarda el enlace canónico (link) y el scrapeado tal cual (url).
+Un índice FTS5 (sin acentos, con prefijos y bm25) permite buscar en el
+historial sin scrapear; triggers lo mantienen al día con cada upsert.
+Cada chat guarda además su cursor (hasta qué first_seen ya le mostramos)
+para responder solo con lo nuevo.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+from bot.config import Config
+from bot.utils.logger import setup_logger
+from bot.utils.text import normalize_text
+from filters.dedupe import canonical_url
+from filters.subscriptions import tokenize
+from scrapers.offer import Offer
+
+logger = setup_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS offers (
+    id INTEGER PRIMARY KEY,
+    link_hash INTEGER NOT NULL,
+    link TEXT NOT NULL,
+    url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    description TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_offers_link_hash ON offers(link_hash);
+CREATE INDEX IF NOT EXISTS idx_offers_first_seen ON offers(first_seen);
+CREATE TABLE IF NOT EXISTS chat_cursors (
+    chat_id INTEGER PRIMARY KEY,
+    seen_until REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Índice de texto externo: guarda solo los tokens, el contenido sigue en `offers`
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+    title, company, description,
+    content='offers', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS offers_fts_insert AFTER INSERT ON offers BEGIN
+    INSERT INTO offers_fts(rowid, title, company, description)
+    VALUES (new.id, new.title, new.company, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_fts_delete AFTER DELETE ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title, company, description)
+    VALUES ('delete', old.id, old.title, old.company, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS offers_fts_update AFTER UPDATE OF title, company, description ON offers BEGIN
+    INSERT INTO offers_fts(offers_fts, rowid, title, company, description)
+    VALUES ('delete', old.id, old.title, old.company, old.description);
+    INSERT INTO offers_fts(rowid, title, company, description)
+    VALUES (new.id, new.title, new.company, new.description);
+END;
+"""
+
+# Pesos bm25 por columna (title, company, description): como en OfferRanker, el título manda
+SEARCH = """
+SELECT o.title, o.company, o.description, o.url, o.source, o.first_seen
+FROM offers_fts
+JOIN offers o ON o.id = offers_fts.rowid
+WHERE offers_fts MATCH ?
+ORDER BY bm25(offers_fts, 3.0, 1.0, 1.0)
+LIMIT ?
+"""
+
+UPSERT = """
+INSERT INTO offers (link_hash, link, url, source, title, company, description, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(link_hash) DO UPDATE SET
+    title = excluded.title,
+    company = excluded.company,
+    description = excluded.description,
+    url = excluded.url,
+    last_seen = excluded.last_seen
+"""
+
+# Límite de parámetros por consulta IN (...)
+_CHUNK = 500
+
+
+def link_hash(link: str) -> int:
+    """Hash de 64 bits con signo del enlace canónico (cabe en un INTEGER de SQLite)"""
+    digest = hashlib.blake2b(canonical_url(link).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class OfferStore:
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.path = Path(data_dir or Config.DATA_DIR) / "offers.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Los scrapers corren en hilos: una conexión compartida protegida por un lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._create_fts()
+
+        logger.info(f"OfferStore inicializado: {self.path} ({len(self)} ofertas)")
+
+    def _create_fts(self):
+        """Crea el índice FTS5; en una base anterior al índice lo llena con lo ya guardado"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'offers_fts'"
+        ).fetchone()
+        self.conn.executescript(FTS_SCHEMA)
+        if not exists:
+            with self.conn:
+                self.conn.execute("INSERT INTO offers_fts(offers_fts) VALUES ('rebuild')")
+
+    def _first_seen(self, hashes: List[int]) -> Dict[int, float]:
+        known: Dict[int, float] = {}
+        for start in range(0, len(hashes), _CHUNK):
+            chunk = hashes[start:start + _CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT link_hash, first_seen FROM offers WHERE link_hash IN ({placeholders})",
+                chunk
+            )
+            known.update(rows)
+        return known
+
+    def upsert(self, offers: Iterable[Dict[str, str]], now: Optional[float] = None) -> List[Dict[str, str]]:
+        """Guarda el ciclo en una transacción y fija first_seen en cada oferta; devuelve las nuevas"""
+        now = time.time() if now is None else now
+        offers = list(offers)
+        if not offers:
+            return []
+
+        hashes = [link_hash(offer['link']) for offer in offers]
+
+        with self._lock:
+            known = self._first_seen(list(set(hashes)))
+
+            new_offers = []
+            rows = []
+            for offer, key in zip(offers, hashes):
+                first_seen = known.get(key)
+                if first_seen is None:
+                    # La misma oferta dos veces en el ciclo cuenta como nueva una sola vez
+                    first_seen = known[key] = now
+                    new_offers.append(offer)
+                offer['first_seen'] = first_seen
+                rows.append((
+                    key, canonical_url(offer['link']), offer['link'], offer['source'], offer['title'],
+                    offer['company'], offer['description'], first_seen, now
+                ))
+
+            with self.conn:
+                self.conn.executemany(UPSERT, rows)
+
+        logger.info(f"OfferStore: {len(offers)} ofertas guardadas, {len(new_offers)} nuevas")
+        return new_offers
+
+    def new_since(self, since: float, limit: Optional[int] = None) -> List[Offer]:
+        """Ofertas vistas por primera vez después de `since`, las más recientes primero"""
+        query = (
+            "SELECT title, company, description, url, source, first_seen FROM offers "
+            "WHERE first_seen > ? ORDER BY first_seen DESC, id DESC"
+        )
+        params: list = [since]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [Offer(*row) for row in rows]
+
+    def has_link(self, link: str) -> bool:
+        """Comprobación exacta por hash del enlace canónico (usa el índice único)"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM offers WHERE link_hash = ?", (link_hash(link),)
+            ).fetchone()
+        return row is not None
+
+    def get_cursor(self, chat_id: int) -> Optional[float]:
+        """Hasta qué first_seen vio el chat en su última consulta; None si nunca consultó"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT seen_until FROM chat_cursors WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, chat_id: int, seen_until: float):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO chat_cursors (chat_id, seen_until) VALUES (?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET seen_until = MAX(seen_until, excluded.seen_until)",
+                (chat_id, seen_until)
+            )
+
+    def iter_urls(self) -> Iterator[str]:
+        """Enlaces scrapeados de todo el historial (para reconstruir el filtro de vistos)"""
+        with self._lock:
+            urls = [row[0] for row in self.conn.execute("SELECT url FROM offers")]
+        yield from urls
+
+    @staticmethod
+    def fts_query(terms: str) -> str:
+        """Términos del usuario -> consulta FTS5: todos requeridos, cada uno como prefijo"""
+        # Solo tokens \w+ entre comillas: la sintaxis de FTS5 (OR, NEAR, -, :) no llega de fuera
+        return ' '.join(f'"{token}"*' for token in tokenize(normalize_text(terms)))
+
+    def search(self, terms: str, limit: int = 10) -> List[Offer]:
+        """Ofertas guardadas que contienen todos los términos, las más relevantes primero"""
+        query = self.fts_query(terms)
+        if not query:
+            return []
+
+        with self._lock:
+            rows = self.conn.execute(SEARCH, (query, limit)).fetchall()
+        return [Offer(*row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
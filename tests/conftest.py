@@ -0,0 +1,9 @@
+import pytest
+from bot.config import Config
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Cada test escribe sus datos persistentes (stores, selectores) en un directorio propio"""
+    monkeypatch.setattr(Config, 'DATA_DIR', str(tmp_path))
+    return tmp_path
@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from telegram import Update
+from telegram.ext import filters
+from bot.dispatch import PriorityUpdateProcessor
+
+
+def make_update(update_id, chat_id, text):
+    return Update.de_json({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 1700000000,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Ana'},
+            'text': text,
+        },
+    }, None)
+
+
+def make_processor(slots=1, heavy=None):
+    processor = PriorityUpdateProcessor(max_concurrent=slots, max_heavy=heavy)
+    processor.heavy_filter = filters.TEXT & filters.Regex(r'(?i)^ofertas$')
+    return processor
+
+
+class TestPriorityUpdateProcessor:
+    
+    @pytest.mark.asyncio
+    async def test_cheap_updates_jump_ahead_of_heavy(self):
+        processor = make_processor(slots=1)
+        order = []
+        release = asyncio.Event()
+        
+        async def blocker():
+            await release.wait()
+        
+        async def record(name):
+            order.append(name)
+        
+        tasks = [asyncio.create_task(processor.process_update(make_update(1, 1, '/help'), blocker()))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(processor.process_update(make_update(2, 2, 'Ofertas'), record('heavy'))))
+        tasks.append(asyncio.create_task(processor.process_update(make_update(3, 3, '/start'), record('cheap'))))
+        await asyncio.sleep(0.01)
+        
+        assert processor.queue_depth == {'cheap': 1, 'heavy': 1}
+        release.set()
+        await asyncio.gather(*tasks)
+        
+        assert order == ['cheap', 'heavy']
+        assert processor.metrics()['processed'] == {'cheap': 2, 'heavy': 1}
+    
+    @pytest.mark.asyncio
+    async def test_repeated_heavy_requests_collapse(self):
+        processor = make_processor(slots=4, heavy=2)
+        running = []
+        release = asyncio.Event()
+        
+        async def scrape(n):
+            running.append(n)
+            await release.wait()
+        
+        tasks = [
+            asyncio.create_task(processor.process_update(make_update(i, 7, 'Ofertas'), scrape(i)))
+            for i in range(1, 5)
+        ]
+        tasks.append(asyncio.create_task(processor.process_update(make_update(9, 8, 'Ofertas'), scrape(9))))
+        await asyncio.sleep(0.01)
+        
+        # Uno en curso por chat; de las repeticiones solo queda una pendiente
+        assert running == [1, 9]
+        release.set()
+        await asyncio.gather(*tasks)
+        
+        assert running == [1, 9, 2]
+        metrics = processor.metrics()
+        assert metrics['collapsed'] == 2
+        assert metrics['active'] == 0 and metrics['heavy_pending_chats'] == 0
+        assert metrics['wait']['heavy']['max_ms'] >= 0
+    
+    @pytest.mark.asyncio
+    async def test_request_after_handoff_waits_for_pending(self):
+        processor = make_processor(slots=4)
+        running = []
+        releases = {n: asyncio.Event() for n in (1, 2, 3)}
+        
+        async def scrape(n):
+            running.append(n)
+            await releases[n].wait()
+            running.remove(n)
+        
+        first = asyncio.create_task(processor.process_update(make_update(1, 7, 'Ofertas'), scrape(1)))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(processor.process_update(make_update(2, 7, 'Ofertas'), scrape(2)))
+        await asyncio.sleep(0.01)
+        assert running == [1]
+        
+        # 1 termina y le cede el lock a 2; un pedido nuevo debe esperar a 2, no correr a la vez
+        releases[1].set()
+        await first
+        await asyncio.sleep(0.01)
+        third = asyncio.create_task(processor.process_update(make_update(3, 7, 'Ofertas'), scrape(3)))
+        await asyncio.sleep(0.01)
+        assert running == [2]
+        
+        releases[2].set()
+        await second
+        await asyncio.sleep(0.01)
+        assert running == [3]
+        
+        releases[3].set()
+        await third
+        assert processor.metrics()['heavy_pending_chats'] == 0
+        assert processor._chat_locks == {} and processor._chat_users == {}
+    
+    @pytest.mark.asyncio
+    async def test_heavy_updates_leave_a_slot_for_cheap(self):
+        processor = make_processor(slots=4, heavy=8)
+        release = asyncio.Event()
+        answered = asyncio.Event()
+        
+        async def scrape():
+            await release.wait()
+        
+        async def start():
+            answered.set()
+        
+        tasks = [
+            asyncio.create_task(processor.process_update(make_update(i, i, 'Ofertas'), scrape()))
+            for i in range(1, 7)
+        ]
+        await asyncio.sleep(0.01)
+        assert processor.heavy_slots == 3
+        
+        tasks.append(asyncio.create_task(processor.process_update(make_update(9, 9, '/start'), start())))
+        # /start no espera a que termine ningún scrape
+        await asyncio.wait_for(answered.wait(), timeout=0.5)
+        assert processor.queue_depth == {'cheap': 0, 'heavy': 3}
+        
+        release.set()
+        await asyncio.gather(*tasks)
+        assert processor.metrics()['processed'] == {'cheap': 1, 'heavy': 6}
@@ -1,5 +1,6 @@
 import pytest
 from filters.job_filter import JobFilter
+from bot.utils.text import normalize_text
 
 
 class TestJobFilter:
@@ -109,3 +110,175 @@ class TestJobFilter:
         offers = []
         filtered = self.filter.filter_offers(offers)
         assert len(filtered) == 0
+
+
+class TestKeywordMatcher:
+    
+    def test_short_keywords_respect_word_boundaries(self):
+        from filters.keyword_matcher import KeywordMatcher
+        
+        matcher = KeywordMatcher(['ia', 'ai', 'ml', 'bot'])
+        
+        assert not matcher.search("social media, email y robotica")
+        assert matcher.find("experto en ia y bot de telegram") == ['ia', 'bot']
+    
+    def test_multi_word_and_prefix_keywords(self):
+        from filters.keyword_matcher import KeywordMatcher
+        
+        matcher = KeywordMatcher(['machine learning', 'ml', 'diseñador*'])
+        
+        assert matcher.find(normalize_text("ingeniero de machine  learning")) == ['machine learning']
+        assert matcher.find(normalize_text("Diseñadora gráfica")) == ['diseñador*']
+    
+    def test_job_filter_reports_matched_keywords(self):
+        job_filter = JobFilter()
+        offer = {'title': 'Content Writer', 'description': 'Redacción', 'company': 'Media Co'}
+        
+        assert job_filter.matched_keywords(offer) == ['content', 'writer', 'redacción']
+    
+    def test_accent_folding(self):
+        from filters.keyword_matcher import KeywordMatcher
+        
+        matcher = KeywordMatcher(['diseño', 'automatización'])
+        
+        assert normalize_text("  AUTOMATIZACION\n de   Diseno ") == "automatizacion de diseno"
+        assert matcher.find(normalize_text("AUTOMATIZACION de Diseno")) == ['automatización', 'diseño']
+
+
+class TestOfferRanker:
+    
+    def setup_method(self):
+        from filters.keyword_matcher import KeywordMatcher
+        from filters.ranking import OfferRanker
+        
+        self.ranker = OfferRanker(KeywordMatcher(['python', 'django']))
+    
+    def _offer(self, title, description='', link='http://example.com', source='Test'):
+        return {'title': title, 'company': '', 'description': description, 'link': link, 'source': source}
+    
+    def test_title_hits_outrank_description_hits(self):
+        in_title = self._offer('Python developer')
+        in_body = self._offer('Developer', 'Python y más')
+        
+        assert self.ranker.top_k([in_body, in_title], 2) == [in_title, in_body]
+    
+    def test_fresher_offers_rank_higher(self):
+        import time
+        old = dict(self._offer('Python'), first_seen=time.time() - 30 * 86400)
+        new = dict(self._offer('Python'), first_seen=time.time())
+        
+        assert self.ranker.top_k([old, new], 1) == [new]
+    
+    def test_top_k_limits_results(self):
+        offers = [self._offer(f'Python {i}') for i in range(20)]
+        
+        assert len(self.ranker.top_k(offers, 5)) == 5
+        assert self.ranker.top_k(offers, 0) == []
+
+
+class TestDedupe:
+    
+    def _offer(self, title, link, company='Acme', source='Test'):
+        return {'title': title, 'company': company, 'description': '', 'link': link, 'source': source}
+    
+    def test_canonical_url(self):
+        from filters.dedupe import canonical_url
+        
+        assert canonical_url("http://WWW.Cubisima.com:80/empleos/123/?utm_source=fb&b=2&a=1#top") == \
+            "https://cubisima.com/empleos/123?a=1&b=2"
+    
+    def test_dedupe_by_link_and_fingerprint(self):
+        from filters.dedupe import OfferDeduplicator
+        
+        deduplicator = OfferDeduplicator()
+        original = self._offer('Diseñador UX', 'https://www.cubisima.com/o/1', source='Cubisima')
+        same_link = self._offer('Otro', 'https://cubisima.com/o/1?utm_campaign=x', source='Cubisima')
+        cross_post = self._offer('DISEÑADOR  ux', 'https://www.revolico.com/item/9', source='Revolico')
+        other = self._offer('Redactor', 'https://www.revolico.com/item/10', source='Revolico')
+        
+        unique = deduplicator.dedupe([original, same_link, cross_post, other])
+        
+        assert unique == [original, other]
+        assert deduplicator.last_stats == {'Cubisima': 1, 'Revolico': 1}
+    
+    def test_dedupe_against_known_offers(self):
+        from filters.dedupe import OfferDeduplicator
+        
+        known = self._offer('Python dev', 'https://cucoders.dev/empleos/1')
+        repost = self._offer('Python Dev', 'https://cucoders.dev/empleos/2')
+        
+        assert OfferDeduplicator().dedupe([repost], known=[known]) == []
+
+
+class TestNearDedupe:
+    
+    DESCRIPTION = ("Empresa de software en La Habana busca desarrollador backend con experiencia "
+                   "en Python, Django y PostgreSQL para proyecto de comercio electrónico. "
+                   "Salario competitivo, trabajo remoto y horario flexible.")
+    
+    def _offer(self, title, description, link, source='Test'):
+        return {'title': title, 'company': 'Acme', 'description': description, 'link': link, 'source': source}
+    
+    def test_repost_with_small_edits_is_dropped(self):
+        from filters.near_dedupe import NearDuplicateDetector
+        
+        detector = NearDuplicateDetector(threshold=0.7, window_hours=72)
+        original = self._offer('Desarrollador backend Python', self.DESCRIPTION, 'https://revolico.com/item/1', 'Revolico')
+        repost = self._offer('Desarrollador backend Python', self.DESCRIPTION + " ¡Urgente!",
+                             'https://cubisima.com/o/7', 'Cubisima')
+        other = self._offer('Diseñador gráfico', "Estudio creativo busca diseñador con dominio de Figma "
+                            "e Illustrator para campañas en redes sociales.", 'https://revolico.com/item/2')
+        
+        kept = detector.filter([original, repost, other], now=1000.0)
+        
+        assert kept == [original, other]
+        assert detector.last_stats == {'Cubisima': 1}
+    
+    def test_window_expires_old_offers(self):
+        from filters.near_dedupe import NearDuplicateDetector
+        
+        detector = NearDuplicateDetector(threshold=0.7, window_hours=1)
+        original = self._offer('Desarrollador backend Python', self.DESCRIPTION, 'https://revolico.com/item/1')
+        repost = self._offer('Desarrollador backend Python', self.DESCRIPTION, 'https://revolico.com/item/3')
+        
+        detector.filter([original], now=0.0)
+        
+        assert detector.filter([repost], now=2 * 3600.0) == [repost]
+        assert len(detector.index) == 1
+
+
+class TestPrefixIndex:
+    
+    def _offer(self, i, title, first_seen):
+        return {'title': title, 'company': 'Acme', 'description': '', 'source': 'CuCoders',
+                'link': f"https://cucoders.dev/empleos/{i}", 'first_seen': first_seen}
+    
+    def test_prefix_search_normalizes_and_intersects(self):
+        from filters.prefix_index import PrefixIndex
+        
+        index = PrefixIndex()
+        offers = [
+            self._offer(1, "Diseñador gráfico", 100),
+            self._offer(2, "Diseño UX/UI remoto", 200),
+            self._offer(3, "Python developer", 300),
+        ]
+        index.sync(1, offers)
+        
+        assert [o['title'] for o in index.search("disen")] == ["Diseño UX/UI remoto", "Diseñador gráfico"]
+        assert [o['title'] for o in index.search("DISEÑ graf")] == ["Diseñador gráfico"]
+        assert index.search("rust") == [] and index.search("  ") == []
+    
+    def test_sync_applies_only_the_difference(self):
+        from filters.prefix_index import PrefixIndex
+        
+        index = PrefixIndex()
+        first = [self._offer(1, "Diseñador gráfico", 100), self._offer(2, "Python developer", 200)]
+        index.sync(1, first)
+        index.sync(1, [])
+        assert len(index) == 2
+        
+        index.sync(2, [self._offer(3, "Python data engineer", 300), first[1]])
+        
+        assert len(index) == 2
+        assert "grafico" not in index.tokens and index.tokens == sorted(index.tokens)
+        assert [o['link'][-1] for o in index.search("py")] == ["3", "2"]
@@ -0,0 +1,160 @@
+import pytest
+from bot.utils.formatter import HTMLFormatter, utf16_len
+
+
+def _offers(count, title="Diseñador 🎨🤖 UX"):
+    return [
+        {'title': f"{title} {i}", 'company': 'Acme', 'description': 'Remoto ' * 20,
+         'link': f"https://cubisima.com/o/{i}", 'source': 'Cubisima'}
+        for i in range(count)
+    ]
+
+
+class TestPager:
+    
+    def test_utf16_length(self):
+        assert utf16_len("abc") == 3
+        assert utf16_len("ñ🎨") == 3
+    
+    def test_pages_hold_whole_offers_under_limit(self):
+        offers = _offers(40)
+        header = HTMLFormatter._format_header(offers)
+        pages = list(HTMLFormatter.paginate(header, HTMLFormatter._iter_offer_blocks(offers), "\n<b>FIN</b>", 1500))
+        
+        assert len(pages) > 1
+        assert all(utf16_len(page) <= 1500 for page in pages)
+        assert all(page.count("<b>") == page.count("</b>") for page in pages)
+        for idx, offer in enumerate(offers, 1):
+            block = HTMLFormatter._format_offer(idx, offer)
+            assert sum(block in page for page in pages) == 1
+        assert pages[-1].endswith("<b>FIN</b>")
+        assert pages[1].startswith(HTMLFormatter.CONTINUATION_HEADER)
+    
+    def test_single_page_keeps_header_blocks_and_footer(self):
+        offers = _offers(3)
+        blocks = list(HTMLFormatter._iter_offer_blocks(offers))
+        
+        assert list(HTMLFormatter.paginate("<b>H</b>\n", blocks, "<i>F</i>")) == ["<b>H</b>\n" + "".join(blocks) + "<i>F</i>"]
+    
+    def test_pages_are_rendered_lazily(self, monkeypatch):
+        rendered = []
+        original = HTMLFormatter._format_offer
+        monkeypatch.setattr(HTMLFormatter, '_format_offer',
+                            staticmethod(lambda idx, offer: rendered.append(idx) or original(idx, offer)))
+        
+        pages = HTMLFormatter.iter_search_pages("diseño", _offers(40))
+        next(pages)
+        
+        assert 0 < len(rendered) < 40
+
+
+    def test_offers_page_stays_under_limit_with_long_fields(self):
+        offers = [
+            {'title': "Diseñador 🎨 " * 300, 'company': "Acme " * 300, 'description': "Remoto " * 300,
+             'link': f"https://cubisima.com/o/{i}?" + "x" * 600, 'source': 'Cubisima'}
+            for i in range(5)
+        ]
+        
+        page = HTMLFormatter.format_offers_page(offers, start=1, page=1, pages=2, total=10)
+        
+        assert utf16_len(page) <= HTMLFormatter.MAX_MESSAGE_LENGTH
+        assert "📝" not in page
+        assert 0 < page.count("🔗") < 5 and "más que no caben" in page
+        
+        short = HTMLFormatter.format_offers_page(_offers(5), start=1, page=1, pages=2, total=10)
+        assert short.count("📝") == 5
+
+
+    def test_scraped_text_is_escaped_in_every_message(self):
+        offer = {'title': "Diseñador <UX> & UI", 'company': "A&B", 'description': "Sueldo <b>alto</b>",
+                 'link': 'https://cubisima.com/o/1?a=1&b="x"', 'source': 'Cubisima'}
+        
+        messages = [
+            HTMLFormatter.format_offers_page([offer], start=1, page=1, pages=1, total=1),
+            HTMLFormatter.format_new_offers([offer]),
+            next(HTMLFormatter.iter_search_pages("ux", [offer])),
+            next(HTMLFormatter.iter_digest_pages([offer], 1)),
+        ]
+        
+        for text in messages:
+            assert "<UX>" not in text and "<b>alto</b>" not in text
+            assert "Diseñador &lt;UX&gt; &amp; UI" in text and "A&amp;B" in text
+            assert 'href="https://cubisima.com/o/1?a=1&amp;b=&quot;x&quot;"' in text
+
+
+class TestOfferPager:
+    
+    def _pager(self, **kwargs):
+        from bot.pager import OfferPager
+        return OfferPager(per_page=5, max_snapshots=2, **kwargs)
+    
+    def test_snapshot_is_built_once_per_version_and_profile(self):
+        pager = self._pager()
+        builds = []
+        build = lambda: builds.append(1) or (_offers(12), 40)
+        
+        first = pager.snapshot(1, (), build)
+        assert pager.snapshot(1, (), build) is first
+        assert pager.snapshot(1, ('python',), build) is not first
+        assert len(builds) == 2
+        assert pager.page_count(first) == 3
+    
+    def test_render_pages_and_keyboard(self):
+        pager = self._pager()
+        snapshot = pager.snapshot(1, (), lambda: (_offers(12), 40))
+        
+        text, keyboard = pager.render(snapshot.id, 1)
+        buttons = [button.callback_data for button in keyboard.inline_keyboard[0]]
+        
+        assert "<b>6. " in text and "<b>11. " not in text and "página 2/3" in text
+        assert buttons == [f"pg:{snapshot.id}:0", "pg:noop", f"pg:{snapshot.id}:2"]
+        assert pager.render(snapshot.id, 1)[0] is text
+        assert len(pager.render(snapshot.id, 2)[1].inline_keyboard[0]) == 2
+    
+    def test_evicted_snapshots_expire(self):
+        from bot.pager import OfferPager
+        
+        pager = self._pager()
+        old = pager.snapshot(1, (), lambda: (_offers(3), 3))
+        pager.render(old.id, 0)
+        pager.snapshot(2, (), lambda: (_offers(3), 3))
+        pager.snapshot(3, (), lambda: (_offers(3), 3))
+        
+        assert pager.render(old.id, 0) is None
+        # Las páginas de la versión 1 salen de la caché al llegar datos nuevos
+        assert not any(key[0] == 1 for key in pager.renders._entries)
+        assert OfferPager.parse_callback("pg:noop") is None
+        assert OfferPager.parse_callback("pg:7:2") == (7, 2)
+    
+    def test_render_shared_across_snapshots_of_same_key(self):
+        pager = self._pager()
+        first = pager.snapshot(1, ('python',), lambda: (_offers(6), 6))
+        text = pager.render(first.id, 1)[0]
+        pager.snapshot(1, ('rust',), lambda: (_offers(6), 6))
+        pager.snapshot(1, ('go',), lambda: (_offers(6), 6))
+        
+        # El snapshot se expulsó y se reconstruye, pero la página renderizada sigue en caché
+        again = pager.snapshot(1, ('python',), lambda: (_offers(6), 6))
+        assert again.id != first.id
+        assert pager.render(again.id, 1)[0] is text
+
+
+class TestRenderCache:
+    
+    def test_lru_eviction_by_bytes(self):
+        from bot.utils.render_cache import RenderCache
+        
+        page = "x" * 1000
+        cache = RenderCache(max_bytes=3500)
+        for n in range(3):
+            cache.put((1, (), 0.0, n), page)
+        cache.get((1, (), 0.0, 0))
+        cache.put((1, (), 0.0, 3), page)
+        
+        assert (1, (), 0.0, 0) in cache and (1, (), 0.0, 1) not in cache
+        assert cache.nbytes <= 3500 and cache.evictions == 1
+        
+        cache.put((2, (), 0.0, 0), page)
+        cache.discard_older(2)
+        assert len(cache) == 1
+        assert cache.get((1, (), 0.0, 0)) is None and cache.hits == 1
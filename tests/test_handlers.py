@@ -0,0 +1,177 @@
+import time
+import pytest
+from bot.config import Config
+from bot.handlers import BotHandlers
+
+
+class FakeMessage:
+    
+    def __init__(self):
+        self.edits = []
+        self.replies = []
+    
+    async def reply_text(self, text, **kwargs):
+        reply = FakeMessage()
+        self.replies.append((text, reply))
+        return reply
+    
+    async def edit_text(self, text, **kwargs):
+        self.edits.append((text, kwargs.get('reply_markup')))
+
+
+class FakeUser:
+    id = 1
+    username = "tester"
+
+
+class FakeChat:
+    
+    def __init__(self, chat_id=100):
+        self.id = chat_id
+
+
+class FakeUpdate:
+    
+    def __init__(self, chat_id=100):
+        self.message = FakeMessage()
+        self.effective_user = FakeUser()
+        self.effective_chat = FakeChat(chat_id)
+
+
+def _slow_scraper(scraper, delay, titles):
+    def scrape():
+        time.sleep(delay)
+        return [scraper._create_offer(title, "Acme", "", f"https://{scraper.source_name}/{i}")
+                for i, title in enumerate(titles)]
+    return scrape
+
+
+class TestOfertasHandler:
+    
+    @pytest.mark.asyncio
+    async def test_edits_progressively_then_final_page(self, monkeypatch):
+        monkeypatch.setattr(Config, 'EDIT_MIN_INTERVAL', 0)
+        handlers = BotHandlers()
+        revolico, cubisima, cucoders = handlers.scraper_manager.scrapers
+        revolico.scrape = _slow_scraper(revolico, 0.3, ["Diseñador web"])
+        cubisima.scrape = _slow_scraper(cubisima, 0.0, [])
+        cucoders.scrape = _slow_scraper(cucoders, 0.05, ["Machine learning engineer"])
+        
+        update = FakeUpdate()
+        await handlers.ofertas_handler(update, None)
+        
+        searching = update.message.replies[0][1]
+        progress, final = searching.edits[0][0], searching.edits[-1][0]
+        
+        # Cubisima no trae nada: la primera edición es la de CuCoders, con Revolico pendiente
+        assert len(searching.edits) == 2
+        assert "⌛ Revolico" in progress and "Machine learning engineer" in progress
+        assert "Buscando…" not in final
+        assert "Diseñador web" in final and "Machine learning engineer" in final
+    
+    @pytest.mark.asyncio
+    async def test_later_requests_show_only_new_offers(self):
+        handlers = BotHandlers()
+        revolico, cubisima, cucoders = handlers.scraper_manager.scrapers
+        revolico.scrape = _slow_scraper(revolico, 0.0, [])
+        cubisima.scrape = _slow_scraper(cubisima, 0.0, [])
+        cucoders.scrape = _slow_scraper(cucoders, 0.0, ["Diseñador web"])
+        
+        async def ask():
+            update = FakeUpdate()
+            await handlers.ofertas_handler(update, None)
+            return update.message.replies[0][1].edits[-1]
+        
+        first, _ = await ask()
+        assert "Diseñador web" in first and "nuevas desde" not in first
+        
+        cucoders.scrape = _slow_scraper(cucoders, 0.0, ["Diseñador web", "Machine learning engineer"])
+        delta, keyboard = await ask()
+        assert "Ofertas nuevas: 1" in delta
+        assert "Machine learning engineer" in delta and "Diseñador web" not in delta
+        
+        # "Ver todas" lleva al snapshot completo de la misma versión
+        target = handlers.pager.parse_callback(keyboard.inline_keyboard[-1][0].callback_data)
+        everything, _ = handlers.pager.render(*target)
+        assert "Diseñador web" in everything and "Machine learning engineer" in everything
+        
+        nothing, keyboard = await ask()
+        assert "No hay ofertas nuevas" in nothing
+        assert keyboard.inline_keyboard[-1][0].text == "📋 Ver todas"
+    
+    @pytest.mark.asyncio
+    async def test_chats_with_same_last_version_share_delta_snapshot(self):
+        handlers = BotHandlers()
+        revolico, cubisima, cucoders = handlers.scraper_manager.scrapers
+        revolico.scrape = _slow_scraper(revolico, 0.0, [])
+        cubisima.scrape = _slow_scraper(cubisima, 0.0, [])
+        cucoders.scrape = _slow_scraper(cucoders, 0.0, ["Diseñador web"])
+        
+        async def ask(chat_id):
+            update = FakeUpdate(chat_id)
+            await handlers.ofertas_handler(update, None)
+            return update.message.replies[0][1].edits[-1]
+        
+        await ask(100)
+        time.sleep(0.01)
+        await ask(200)
+        assert handlers.scraper_manager.store.get_cursor(100) == handlers.scraper_manager.store.get_cursor(200)
+        
+        cucoders.scrape = _slow_scraper(cucoders, 0.0, ["Diseñador web", "Machine learning engineer"])
+        _, first = await ask(100)
+        _, second = await ask(200)
+        
+        # Mismo cursor y misma versión: el mismo snapshot delta (y sus páginas) para los dos chats
+        assert first.inline_keyboard[-1][0].callback_data == second.inline_keyboard[-1][0].callback_data
+        # Completo v1, completo v2 y un único delta v2
+        assert len(handlers.pager.snapshots) == 3
+
+
+class FakeInlineQuery:
+    
+    def __init__(self, text):
+        self.query = text
+        self.answers = []
+    
+    async def answer(self, results, **kwargs):
+        self.answers.append(results)
+
+
+class TestInlineQuery:
+    
+    @pytest.mark.asyncio
+    async def test_answers_from_prefix_index(self):
+        handlers = BotHandlers()
+        scraper = handlers.scraper_manager.scrapers[2]
+        handlers.scraper_manager._merge_cycle([
+            scraper._create_offer("Diseñador web", "Acme", "", "https://cucoders.dev/empleos/1"),
+            scraper._create_offer("Machine learning engineer", "Acme", "", "https://cucoders.dev/empleos/2"),
+        ])
+        
+        update = FakeUpdate()
+        update.inline_query = FakeInlineQuery("disen")
+        await handlers.inline_query_handler(update, None)
+        
+        [results] = update.inline_query.answers
+        assert [result.title for result in results] == ["Diseñador web"]
+        assert "<b>Diseñador web</b>" in results[0].input_message_content.message_text
+    
+    @pytest.mark.asyncio
+    async def test_shared_offer_is_escaped_and_results_capped(self, monkeypatch):
+        monkeypatch.setattr(Config, 'INLINE_MAX_RESULTS', 80)
+        handlers = BotHandlers()
+        scraper = handlers.scraper_manager.scrapers[2]
+        handlers.scraper_manager._merge_cycle([
+            scraper._create_offer(f"Diseñador <UX> & UI {i}", "A&B", "", f'https://cucoders.dev/empleos/{i}?a=1&b="x"')
+            for i in range(60)
+        ])
+        
+        update = FakeUpdate()
+        update.inline_query = FakeInlineQuery("disen")
+        await handlers.inline_query_handler(update, None)
+        
+        [results] = update.inline_query.answers
+        text = results[0].input_message_content.message_text
+        assert len(results) == 50
+        assert "<UX>" not in text and "&lt;UX&gt; &amp; UI" in text and "A&amp;B" in text
+        assert 'href="https://cucoders.dev/empleos/' in text and "&amp;b=&quot;x&quot;" in text
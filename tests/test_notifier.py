@@ -0,0 +1,212 @@
+import asyncio
+import time
+import pytest
+from telegram.error import Forbidden, RetryAfter
+from bot.notifier import FanOutSender, OfferNotifier
+
+
+class FakeBot:
+    
+    def __init__(self, failures=None):
+        self.sent = []
+        # chat_id -> excepciones a lanzar antes de aceptar el envío
+        self.failures = failures or {}
+    
+    async def send_message(self, chat_id, text, **kwargs):
+        pending = self.failures.get(chat_id)
+        if pending:
+            raise pending.pop(0)
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+def _offer(i, title='Python dev'):
+    return {'title': f"{title} {i}", 'company': 'Acme', 'description': 'Remoto',
+            'link': f"https://cucoders.dev/empleos/{i}", 'source': 'CuCoders'}
+
+
+class TestFanOutSender:
+    
+    @pytest.mark.asyncio
+    async def test_batches_and_per_chat_interval(self):
+        bot = FakeBot()
+        sender = FanOutSender(bot, global_rate=1000, chat_interval=0.05, workers=2)
+        sender.start()
+        
+        sender.notify(1, [_offer(i) for i in range(7)], batch_size=3)
+        sender.notify(2, [_offer(9)], batch_size=3)
+        await asyncio.wait_for(sender.join(), timeout=2)
+        await sender.stop()
+        
+        chat_1 = [sent for sent in bot.sent if sent[0] == 1]
+        assert len(chat_1) == 3 and "(1/3)" in chat_1[0][1] and "(3/3)" in chat_1[2][1]
+        assert all(b[2] - a[2] >= 0.045 for a, b in zip(chat_1, chat_1[1:]))
+        # El chat 2 no espera a que termine el 1
+        assert bot.sent[1][0] == 2
+    
+    @pytest.mark.asyncio
+    async def test_retry_after_and_blocked_chats(self):
+        blocked = []
+        bot = FakeBot({1: [RetryAfter(0)], 2: [Forbidden("bot was blocked by the user")]})
+        sender = FanOutSender(bot, global_rate=1000, chat_interval=0, workers=1, on_blocked=blocked.append)
+        sender.start()
+        
+        sender.enqueue(1, "hola")
+        sender.enqueue(2, "hola")
+        sender.enqueue(2, "otra")
+        await asyncio.wait_for(sender.join(), timeout=2)
+        await sender.stop()
+        
+        assert [chat for chat, _, _ in bot.sent] == [1]
+        assert (sender.sent, sender.retried, sender.dropped) == (1, 1, 2)
+        assert blocked == [2]
+    
+    @pytest.mark.asyncio
+    async def test_deferred_message_does_not_delay_later_push(self):
+        bot = FakeBot()
+        sender = FanOutSender(bot, global_rate=1000, chat_interval=0, workers=1)
+        
+        # El turno del chat queda para el resumen; los pushes que llegan después lo adelantan
+        sender.enqueue(1, "resumen", not_before=time.monotonic() + 0.2)
+        sender.enqueue(1, "push 1")
+        sender.enqueue(1, "push 2")
+        sender.start()
+        
+        await asyncio.sleep(0.1)
+        assert [text for _, text, _ in bot.sent] == ["push 1", "push 2"]
+        
+        await asyncio.wait_for(sender.join(), timeout=2)
+        await sender.stop()
+        assert [text for _, text, _ in bot.sent] == ["push 1", "push 2", "resumen"]
+    
+    @pytest.mark.asyncio
+    async def test_deferred_message_waits_even_if_chat_is_scheduled(self):
+        bot = FakeBot()
+        sender = FanOutSender(bot, global_rate=1000, chat_interval=0, workers=1)
+        
+        sender.enqueue(1, "push")
+        sender.enqueue(1, "resumen", not_before=time.monotonic() + 0.2)
+        sender.start()
+        await asyncio.wait_for(sender.join(), timeout=2)
+        await sender.stop()
+        
+        assert bot.sent[1][2] - bot.sent[0][2] >= 0.15
+
+
+class TestOfferNotifier:
+    
+    @pytest.mark.asyncio
+    async def test_pushes_only_new_matching_offers(self):
+        from scrapers.scraper_manager import ScraperManager
+        from filters.subscriptions import SubscriptionStore
+        
+        manager = ScraperManager()
+        subscriptions = SubscriptionStore()
+        subscriptions.subscribe(10, ['python'])
+        subscriptions.subscribe(20, ['diseñador*'])
+        sender = FanOutSender(FakeBot())
+        
+        cycles = iter([
+            [_offer(1)],
+            [_offer(1), _offer(2), _offer(3, title='Contador')],
+        ])
+        for scraper in manager.scrapers:
+            scraper.scrape = lambda: []
+        manager.scrapers[0].scrape = lambda: next(cycles)
+        
+        notifier = OfferNotifier(manager, subscriptions, sender, interval_minutes=1)
+        
+        # Historial vacío: el primer ciclo solo llena el store
+        assert await notifier.run_cycle() == 0
+        assert await notifier.run_cycle() == 1
+        assert list(sender._pending) == [10]
+        assert "Python dev 2" in sender._pending[10][0][0]
+    
+    @pytest.mark.asyncio
+    async def test_pushes_offers_found_by_on_demand_scrape(self):
+        from scrapers.scraper_manager import ScraperManager
+        from filters.subscriptions import SubscriptionStore
+        
+        manager = ScraperManager()
+        manager.store.upsert([_offer(1)])
+        subscriptions = SubscriptionStore()
+        subscriptions.subscribe(10, ['python'])
+        sender = FanOutSender(FakeBot())
+        notifier = OfferNotifier(manager, subscriptions, sender, interval_minutes=1)
+        
+        for scraper in manager.scrapers:
+            scraper.scrape = lambda: []
+        manager.scrapers[0].scrape = lambda: [_offer(2)]
+        # Un "Ofertas" scrapea antes que el ciclo de fondo y guarda la oferta como vista
+        async for _ in manager.iter_source_results():
+            pass
+        
+        assert await notifier.run_cycle() == 1
+        assert "Python dev 2" in sender._pending[10][0][0]
+        
+        # Ya avisada: el siguiente ciclo no la repite
+        sender._pending.clear()
+        assert await notifier.run_cycle() == 0
+
+
+class TestDigestScheduler:
+    
+    def test_one_render_per_profile_spread_over_window(self):
+        from scrapers.scraper_manager import ScraperManager
+        from filters.subscriptions import SubscriptionStore
+        from bot.digest import DigestScheduler
+        
+        manager = ScraperManager()
+        now = time.time()
+        manager.store.upsert([_offer(1, title='AI Engineer')], now=now - 2 * 86400)
+        manager.store.upsert([_offer(2), _offer(3, title='AI Engineer')], now=now - 3600)
+        
+        subscriptions = SubscriptionStore()
+        for chat_id, topics in [(1, ['python']), (2, ['python']), (4, ['rust'])]:
+            subscriptions.subscribe(chat_id, topics)
+        for chat_id in (1, 2, 3, 4):
+            subscriptions.set_digest(chat_id, True)
+        
+        sender = FanOutSender(FakeBot())
+        scheduler = DigestScheduler(manager, subscriptions, sender, hour=8, window_minutes=1)
+        digests = scheduler.build(now)
+        
+        # python comparten resumen; rust no tiene ofertas; el chat 3 usa el filtro general
+        assert set(digests) == {('python',), ()}
+        assert digests[('python',)][1] == [1, 2]
+        assert "Python dev 2" in digests[('python',)][0][0]
+        assert "AI Engineer 3" in digests[()][0][0] and "AI Engineer 1" not in digests[()][0][0]
+        
+        assert scheduler.deliver(digests) == 3
+        turns = sorted(at for at, _, _ in sender._turns)
+        assert turns[-1] - turns[0] == pytest.approx(40, abs=1)
+        
+        subscriptions.forget(3)
+        assert 3 not in SubscriptionStore().digest
+    
+    def test_digest_skips_stored_duplicates(self):
+        from scrapers.scraper_manager import ScraperManager
+        from filters.subscriptions import SubscriptionStore
+        from bot.digest import DigestScheduler
+        
+        manager = ScraperManager()
+        original = _offer(1)
+        copy = dict(_offer(1), link="https://www.revolico.com/item/1", source='Revolico')
+        manager._merge_cycle([original])
+        manager._merge_cycle([copy])
+        assert len(manager.store) == 2
+        
+        subscriptions = SubscriptionStore()
+        subscriptions.subscribe(1, ['python'])
+        subscriptions.set_digest(1, True)
+        scheduler = DigestScheduler(manager, subscriptions, FanOutSender(FakeBot()), hour=8, window_minutes=1)
+        
+        [page] = scheduler.build()[('python',)][0]
+        assert page.count("Python dev 1") == 1
+        assert "revolico.com" not in page
+    
+    def test_seconds_until_next_hour(self):
+        from datetime import datetime
+        from bot.digest import seconds_until
+        
+        assert seconds_until(8, datetime(2024, 5, 1, 7, 30)) == 1800
+        assert seconds_until(8, datetime(2024, 5, 1, 8, 0)) == 86400
@@ -35,6 +35,7 @@ class TestScrapers:
         assert offer['description'] == "Test Description"
         assert offer['link'] == "http://example.com"
         assert offer['source'] == "Revolico"
+        assert offer['search_text'] == "test job test description test company"
     
     def test_scraper_create_offer_no_company(self):
         scraper = RevolicoScraper()
@@ -57,3 +58,335 @@ class TestScraperIntegration:
         manager = ScraperManager()
         assert len(manager.scrapers) == 3
         assert manager.job_filter is not None
+
+
+class TestSelectorMemory:
+    
+    def _soup(self, html):
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, 'html.parser')
+    
+    def test_last_winner_is_tried_first(self, tmp_path):
+        from scrapers.selector_memory import SelectorMemory
+        
+        memory = SelectorMemory("Test", ['div.a', 'div.b', 'div.c'], data_dir=str(tmp_path))
+        elements, selector = memory.select(self._soup('<div class="c">x</div>'))
+        
+        assert selector == 'div.c'
+        assert len(elements) == 1
+        assert memory.ordered()[0] == 'div.c'
+    
+    def test_memory_persists_across_instances(self, tmp_path):
+        from scrapers.selector_memory import SelectorMemory
+        
+        memory = SelectorMemory("Test", ['div.a', 'div.b'], data_dir=str(tmp_path))
+        memory.select(self._soup('<div class="b">x</div>'))
+        
+        reloaded = SelectorMemory("Test", ['div.a', 'div.b'], data_dir=str(tmp_path))
+        assert reloaded.last_winner == 'div.b'
+        assert reloaded.ordered() == ['div.b', 'div.a']
+    
+    def test_order_adapts_when_layout_changes(self, tmp_path):
+        from scrapers.selector_memory import SelectorMemory
+        
+        memory = SelectorMemory("Test", ['div.a', 'div.b'], data_dir=str(tmp_path))
+        memory.select(self._soup('<div class="a">x</div>'))
+        _, selector = memory.select(self._soup('<div class="b">x</div>'))
+        
+        assert selector == 'div.b'
+        assert memory.ordered()[0] == 'div.b'
+    
+    def test_saves_only_on_new_winner_or_flush(self, tmp_path):
+        from scrapers.selector_memory import SelectorMemory
+        
+        memory = SelectorMemory("Test", ['div.a', 'div.b'], data_dir=str(tmp_path))
+        memory.select(self._soup('<div class="b">x</div>'))
+        assert memory.path.exists()
+        memory.path.unlink()
+        
+        # Mismo ganador: la página no escribe a disco, solo el flush del final del scrape
+        memory.select(self._soup('<div class="b">y</div>'))
+        assert not memory.path.exists() and memory.dirty
+        memory.flush()
+        assert memory.path.exists() and not memory.dirty
+
+
+class TestStructuredData:
+    
+    def test_cucoders_prefers_json_ld(self):
+        from bs4 import BeautifulSoup
+        
+        html = """<html><head><script type="application/ld+json">
+        {"@context": "https://schema.org", "@graph": [
+            {"@type": "JobPosting", "title": "Diseñador UX",
+             "hiringOrganization": {"@type": "Organization", "name": "Acme"},
+             "description": "<p>Diseño de <b>interfaces</b></p>",
+             "url": "/empleos/2024-01-01/disenador-ux"}
+        ]}
+        </script></head><body></body></html>"""
+        
+        scraper = CucodersScraper()
+        offers = scraper._parse_offers(BeautifulSoup(html, 'html.parser'))
+        
+        assert len(offers) == 1
+        assert offers[0]['title'] == "Diseñador UX"
+        assert offers[0]['company'] == "Acme"
+        assert offers[0]['description'] == "Diseño de interfaces"
+        assert offers[0]['link'] == "https://cucoders.dev/empleos/2024-01-01/disenador-ux"
+    
+    def test_astro_island_props(self):
+        from bs4 import BeautifulSoup
+        import json
+        
+        props = {"jobs": [1, [[0, {"@type": [0, "JobPosting"], "title": [0, "Redactor"],
+                                   "url": [0, "https://cucoders.dev/empleos/2024-01-02/redactor"]}]]]}
+        html = f"<astro-island props='{json.dumps(props)}'></astro-island>"
+        
+        scraper = CucodersScraper()
+        structured, offers = scraper._extract_structured_offers(BeautifulSoup(html, 'html.parser'))
+        
+        assert structured
+        assert [offer['title'] for offer in offers] == ["Redactor"]
+    
+    def test_seen_structured_page_skips_dom_heuristics(self, monkeypatch):
+        from bs4 import BeautifulSoup
+        import json
+        
+        postings = [{"@type": "JobPosting", "title": f"Oferta {i}", "url": f"/o/{i}"} for i in range(5)]
+        dom = "".join(f'<div class="job-listing"><a href="/dom/{i}">Empleo {i}</a></div>' for i in range(5))
+        html = f'<script type="application/ld+json">{json.dumps(postings)}</script>{dom}'
+        
+        scraper = CubisimaScraper()
+        scraper.seen_links = {f"https://www.cubisima.com/o/{i}" for i in range(5)}
+        built = []
+        original = scraper._offer_from_job_posting
+        monkeypatch.setattr(scraper, '_offer_from_job_posting', lambda posting: built.append(posting) or original(posting))
+        monkeypatch.setattr(scraper, '_select_listings', lambda soup: pytest.fail("DOM cascade ran"))
+        
+        offers = scraper._parse_offers(BeautifulSoup(html, 'html.parser'))
+        
+        assert offers == []
+        assert scraper.stopped_at_seen is True
+        assert built == []
+    
+    def test_postings_without_real_url_are_skipped(self):
+        scraper = CucodersScraper()
+        
+        assert scraper._offer_from_job_posting({'title': "QA", '@id': "#job"}) is None
+        assert scraper._offer_from_job_posting({'title': "QA", '@id': "urn:job:42"}) is None
+        offer = scraper._offer_from_job_posting({'title': "QA", 'url': "urn:x", '@id': "/empleos/2024-01-03/qa"})
+        assert offer['link'] == "https://cucoders.dev/empleos/2024-01-03/qa"
+
+
+class TestParsePool:
+    
+    def test_parse_html_returns_compact_rows(self):
+        from pathlib import Path
+        from bs4 import BeautifulSoup
+        from scrapers.parse_pool import parse_html
+        
+        content = (Path(__file__).parent.parent / 'cucoders_content.html').read_bytes()
+        rows, attempts = parse_html(CucodersScraper, "CuCoders", content, 'utf-8')
+        inline = CucodersScraper()._parse_offers(BeautifulSoup(content, 'html.parser', from_encoding='utf-8'))
+        
+        assert rows
+        assert all(isinstance(row, tuple) and len(row) == 4 for row in rows)
+        assert [row[3] for row in rows] == [offer['link'] for offer in inline]
+        assert attempts == []
+    
+    def test_worker_uses_parent_order_and_parent_records_winner(self, tmp_path, monkeypatch):
+        from bot.config import Config
+        from scrapers.parse_pool import parse_html
+        monkeypatch.setattr(Config, "DATA_DIR", str(tmp_path))
+        
+        html = b'<div class="ad-item"><a href="/empleos/1">Oferta 1</a></div>'
+        scraper = RevolicoScraper()
+        order = scraper.selector_memory.ordered()
+        
+        rows, attempts = parse_html(RevolicoScraper, "Revolico", html, None, order)
+        
+        assert [row[3] for row in rows] == ["https://www.revolico.com/empleos/1"]
+        assert attempts[-1] == ('div.ad-item', True)
+        assert not (tmp_path / "selectors_revolico.json").exists()
+        
+        scraper.selector_memory.apply(attempts)
+        assert scraper.selector_memory.ordered()[0] == 'div.ad-item'
+        assert (tmp_path / "selectors_revolico.json").exists()
+
+
+class TestIncrementalParsing:
+    
+    HTML = "<ul>" + "".join(
+        f'<li class="listing-item"><a href="/empleos/{i}">Oferta {i}</a><p>Desc {i}</p></li>'
+        for i in range(10)
+    ) + "</ul>"
+    
+    def _parse(self, scraper):
+        from bs4 import BeautifulSoup
+        return scraper._parse_offers(BeautifulSoup(self.HTML, 'html.parser'))
+    
+    def test_full_parse_without_seen_links(self):
+        scraper = RevolicoScraper()
+        assert len(self._parse(scraper)) == 10
+        assert scraper.stopped_at_seen is False
+    
+    def test_stops_at_run_of_known_links(self):
+        scraper = RevolicoScraper()
+        scraper.seen_links = {f"https://www.revolico.com/empleos/{i}" for i in range(2, 10)}
+        
+        offers = self._parse(scraper)
+        
+        assert [offer['link'] for offer in offers] == [
+            "https://www.revolico.com/empleos/0",
+            "https://www.revolico.com/empleos/1",
+        ]
+        assert scraper.stopped_at_seen is True
+    
+    def test_manager_filters_only_new_offers(self):
+        from scrapers.scraper_manager import ScraperManager
+        
+        manager = ScraperManager()
+        first = {'title': 'AI Engineer', 'company': 'X', 'description': '', 'link': 'http://a', 'source': 'Test'}
+        second = {'title': 'Designer', 'company': 'Y', 'description': '', 'link': 'http://b', 'source': 'Test'}
+        
+        assert manager._merge_cycle([first]) == [first]
+        assert manager._merge_cycle([second, first]) == [second, first]
+        assert 'http://a' in manager.seen_links and 'http://b' in manager.seen_links
+        assert 'http://c' not in manager.seen_links
+
+
+class TestPagination:
+    
+    @staticmethod
+    def _page(start, end):
+        items = "".join(
+            f'<li class="listing-item"><a href="/empleos/{i}">Oferta {i}</a></li>'
+            for i in range(start, end)
+        )
+        return f"<ul>{items}</ul>".encode()
+    
+    def test_page_url_keeps_existing_query(self):
+        scraper = CubisimaScraper()
+        url = "https://www.cubisima.com/empleos/ofertas/diseno?categoriaestricta"
+        
+        assert scraper._page_url(url, 1) == url
+        assert scraper._page_url(url, 3) == url + "&page=3"
+    
+    def test_crawl_stops_at_page_of_seen_offers(self, monkeypatch):
+        from bot.config import Config
+        monkeypatch.setattr(Config, "MAX_PAGES", 5)
+        monkeypatch.setattr(Config, "MAX_CONNECTIONS_PER_HOST", 1)
+        
+        scraper = RevolicoScraper()
+        scraper.seen_links = {f"https://www.revolico.com/empleos/{i}" for i in range(10, 20)}
+        pages = {
+            "https://r.test/empleos": (self._page(0, 5), 'utf-8'),
+            "https://r.test/empleos?page=2": (self._page(5, 10), 'utf-8'),
+            "https://r.test/empleos?page=3": (self._page(10, 15), 'utf-8'),
+        }
+        fetched = []
+        
+        def fetch(url):
+            fetched.append(url)
+            return pages.get(url)
+        
+        offers = scraper._crawl("https://r.test/empleos", fetch)
+        
+        assert len(offers) == 10
+        assert fetched == list(pages)
+
+
+class TestOffer:
+    
+    def _offer(self):
+        from scrapers.offer import Offer
+        return Offer("Diseñador UX", "Acme", "Remoto", "https://cubisima.com/o/1", "Cubisima")
+    
+    def test_dict_view(self):
+        offer = self._offer()
+        
+        assert offer['title'] == "Diseñador UX"
+        assert offer.get('first_seen') is None
+        assert offer.get('missing', 'x') == 'x'
+        assert list(offer.keys()) == ['title', 'company', 'description', 'link', 'source']
+        assert offer.to_dict()['source'] == "Cubisima"
+        assert not hasattr(offer, '__dict__')
+    
+    def test_derived_fields_are_cached_and_reset(self):
+        offer = self._offer()
+        
+        assert offer['search_text'] == "disenador ux remoto acme"
+        fingerprint = offer['fingerprint']
+        assert offer.fingerprint is fingerprint
+        
+        offer['title'] = "Redactor"
+        assert offer.search_text == "redactor remoto acme"
+        assert offer.fingerprint != fingerprint
+    
+    def test_first_seen_and_round_trip(self):
+        from scrapers.offer import Offer
+        
+        offer = self._offer()
+        offer['first_seen'] = 1700000000.0
+        copy = Offer.from_dict(offer.to_dict())
+        
+        assert copy == offer
+        assert copy.source is offer.source
+
+
+class TestSourceResults:
+    
+    @pytest.mark.asyncio
+    async def test_results_arrive_in_completion_order(self):
+        import time
+        from scrapers.scraper_manager import ScraperManager
+        
+        manager = ScraperManager()
+        delays = {'Revolico': 0.3, 'Cubisima': 0.0, 'CuCoders': 0.1}
+        
+        def fake_scrape(scraper):
+            def scrape():
+                time.sleep(delays[scraper.source_name])
+                if scraper.source_name == 'Cubisima':
+                    raise RuntimeError("timeout")
+                return [scraper._create_offer(f"AI Engineer {scraper.source_name}", "X", "", f"https://{scraper.source_name}/1")]
+            return scrape
+        
+        for scraper in manager.scrapers:
+            scraper.scrape = fake_scrape(scraper)
+        
+        results = [result async for result in manager.iter_source_results()]
+        
+        assert [r.source for r in results] == ['Cubisima', 'CuCoders', 'Revolico']
+        assert results[0].error == "timeout" and results[1].new == 1
+        assert len(manager.last_new_offers) == 2
+        assert manager.version == 2
+    
+    @pytest.mark.asyncio
+    async def test_closing_early_waits_for_running_scrapers(self):
+        import time
+        from contextlib import aclosing
+        from scrapers.scraper_manager import ScraperManager
+        
+        manager = ScraperManager()
+        delays = {'Revolico': 0.3, 'Cubisima': 0.0, 'CuCoders': 0.2}
+        finished = []
+        
+        def fake_scrape(scraper):
+            def scrape():
+                time.sleep(delays[scraper.source_name])
+                finished.append(scraper.source_name)
+                return []
+            return scrape
+        
+        for scraper in manager.scrapers:
+            scraper.scrape = fake_scrape(scraper)
+        
+        async with aclosing(manager.iter_source_results()) as results:
+            async for result in results:
+                assert result.source == 'Cubisima'
+                break
+        
+        # Al cerrar ya no queda ningún hilo usando los scrapers y el lock está libre
+        assert sorted(finished) == ['CuCoders', 'Cubisima', 'Revolico']
+        assert not manager._scrape_lock.locked()
@@ -0,0 +1,170 @@
+import pytest
+from storage.offer_store import OfferStore, link_hash
+
+
+def _offer(link, title='Python dev', source='CuCoders'):
+    return {'title': title, 'company': 'Acme', 'description': 'Remoto', 'link': link, 'source': source}
+
+
+class TestOfferStore:
+    
+    def test_link_hash_uses_canonical_link(self):
+        assert link_hash("https://www.cucoders.dev/empleos/1/?utm_source=tg") == \
+            link_hash("https://cucoders.dev/empleos/1")
+    
+    def test_upsert_keeps_first_seen(self, data_dir):
+        store = OfferStore(str(data_dir))
+        first = _offer("https://cucoders.dev/empleos/1")
+        
+        assert store.upsert([first], now=100.0) == [first]
+        assert first['first_seen'] == 100.0
+        
+        again = _offer("https://www.cucoders.dev/empleos/1/", title='Python dev (editada)')
+        second = _offer("https://cucoders.dev/empleos/2")
+        
+        assert store.upsert([again, second, second], now=200.0) == [second]
+        assert again['first_seen'] == 100.0
+        assert len(store) == 2
+        
+        last_seen, title = store.conn.execute(
+            "SELECT last_seen, title FROM offers WHERE link_hash = ?", (link_hash(first['link']),)
+        ).fetchone()
+        assert (last_seen, title) == (200.0, 'Python dev (editada)')
+    
+    def test_new_since_survives_reopen(self, data_dir):
+        store = OfferStore(str(data_dir))
+        store.upsert([_offer("https://cucoders.dev/empleos/1")], now=100.0)
+        store.upsert([_offer("https://cucoders.dev/empleos/2")], now=200.0)
+        store.close()
+        
+        reopened = OfferStore(str(data_dir))
+        
+        assert [offer['link'] for offer in reopened.new_since(0)] == [
+            "https://cucoders.dev/empleos/2",
+            "https://cucoders.dev/empleos/1",
+        ]
+        assert [offer.first_seen for offer in reopened.new_since(150.0)] == [200.0]
+    
+    def test_chat_cursor_only_moves_forward(self, data_dir):
+        store = OfferStore(str(data_dir))
+        assert store.get_cursor(100) is None
+        
+        store.set_cursor(100, 200.0)
+        store.set_cursor(100, 150.0)
+        store.close()
+        
+        assert OfferStore(str(data_dir)).get_cursor(100) == 200.0
+    
+    def test_manager_restores_recent_offers(self):
+        from scrapers.scraper_manager import ScraperManager
+        
+        offer = _offer("https://cucoders.dev/empleos/7", title='AI Engineer')
+        ScraperManager()._merge_cycle([offer])
+        
+        restarted = ScraperManager()
+        
+        assert [o['link'] for o in restarted.matched_offers] == [offer['link']]
+        assert offer['link'] in restarted.seen_links
+        assert restarted._merge_cycle([_offer(offer['link'], title='AI Engineer')]) == restarted.matched_offers
+        assert len(restarted.recent_offers) == 1
+    
+    def test_restore_drops_stored_duplicates(self):
+        from filters.dedupe import canonical_url
+        from scrapers.scraper_manager import ScraperManager
+        
+        manager = ScraperManager()
+        original = _offer("https://cucoders.dev/empleos/8", title='AI Engineer', source='CuCoders')
+        copy = _offer("https://www.revolico.com/item/8", title='AI Engineer', source='Revolico')
+        manager._merge_cycle([original])
+        manager._merge_cycle([copy])
+        assert [o['link'] for o in manager.matched_offers] == [original['link']]
+        
+        restarted = ScraperManager()
+        
+        assert [o['link'] for o in restarted.matched_offers] == [original['link']]
+        assert copy['link'] in restarted.seen_links
+        # El índice LSH queda sembrado con las ofertas restauradas
+        assert canonical_url(original['link']) in restarted.near_duplicates.index.signatures
+        assert canonical_url(copy['link']) not in restarted.near_duplicates.index.signatures
+
+
+class TestOfferSearch:
+    
+    def _store(self, data_dir):
+        store = OfferStore(str(data_dir))
+        store.upsert([
+            _offer("https://revolico.com/item/1", title='Community manager', source='Revolico'),
+            {'title': 'Diseñadora gráfica', 'company': 'Estudio', 'link': 'https://cubisima.com/o/2',
+             'description': 'Piezas para el community manager', 'source': 'Cubisima'},
+            _offer("https://cucoders.dev/empleos/3", title='Python backend'),
+        ], now=100.0)
+        return store
+    
+    def test_accents_prefixes_and_title_first(self, data_dir):
+        store = self._store(data_dir)
+        
+        assert [o['title'] for o in store.search('DISENAD')] == ['Diseñadora gráfica']
+        assert [o['title'] for o in store.search('community man')] == ['Community manager', 'Diseñadora gráfica']
+        assert store.search('python')[0]['link'] == "https://cucoders.dev/empleos/3"
+    
+    def test_user_syntax_is_not_interpreted(self, data_dir):
+        store = self._store(data_dir)
+        
+        assert store.fts_query('python OR "rpa" -java') == '"python"* "or"* "rpa"* "java"*'
+        assert store.search('"') == []
+    
+    def test_index_follows_updates_and_old_databases(self, data_dir):
+        store = self._store(data_dir)
+        store.upsert([_offer("https://cucoders.dev/empleos/3", title='Redactor SEO')], now=200.0)
+        
+        assert store.search('python') == []
+        
+        store.conn.executescript("DROP TABLE offers_fts")
+        store.close()
+        
+        assert [o['title'] for o in OfferStore(str(data_dir)).search('redactor')] == ['Redactor SEO']
+
+
+class TestBloom:
+    
+    def test_no_false_negatives_and_bounded_false_positives(self, data_dir):
+        from storage.bloom import ScalableBloomFilter
+        
+        bloom = ScalableBloomFilter(str(data_dir), capacity=1000, error_rate=0.01)
+        links = [f"https://revolico.com/item/{i}" for i in range(3000)]
+        bloom.update(links)
+        
+        assert len(bloom.layers) == 2
+        assert all(link in bloom for link in links)
+        false_positives = sum(f"https://cubisima.com/o/{i}" in bloom for i in range(10000))
+        assert false_positives < 200
+    
+    def test_persists_across_reopen(self, data_dir):
+        from storage.bloom import ScalableBloomFilter
+        
+        bloom = ScalableBloomFilter(str(data_dir), capacity=10, error_rate=0.01)
+        bloom.update(f"https://x/{i}" for i in range(25))
+        count = len(bloom)
+        bloom.close()
+        
+        reopened = ScalableBloomFilter(str(data_dir), capacity=10, error_rate=0.01)
+        
+        assert len(reopened.layers) == 2 and len(reopened) == count
+        assert all(f"https://x/{i}" in reopened for i in range(25))
+        assert reopened.add("https://x/3") is False
+    
+    def test_seen_set_checks_store_only_on_bloom_hits(self, data_dir):
+        from storage.bloom import SeenSet
+        
+        store = OfferStore(str(data_dir))
+        store.upsert([_offer("https://cucoders.dev/empleos/1")])
+        # Sin filtro previo: se reconstruye con el historial del store
+        seen = SeenSet(store)
+        
+        assert "https://cucoders.dev/empleos/1" in seen
+        assert "https://cucoders.dev/empleos/2" not in seen
+        assert (seen.store_checks, seen.bloom_misses) == (1, 1)
+        
+        # Un falso positivo del filtro lo corrige la base
+        seen.add("https://cucoders.dev/empleos/3")
+        assert "https://cucoders.dev/empleos/3" not in seen
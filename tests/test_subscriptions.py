@@ -0,0 +1,77 @@
+import pytest
+from filters.subscriptions import SubscriptionIndex, SubscriptionStore
+
+
+def _offer(title, description=''):
+    return {'title': title, 'company': '', 'description': description, 'link': 'http://x', 'source': 'Test'}
+
+
+class TestSubscriptionIndex:
+    
+    def setup_method(self):
+        self.index = SubscriptionIndex()
+        self.index.add(1, ['python', 'community manager'])
+        self.index.add(2, ['diseñador*'])
+        self.index.add(3, ['Python'])
+    
+    def test_word_match(self):
+        assert self.index.match(_offer('Desarrollador Python')) == {1, 3}
+    
+    def test_phrase_and_prefix_match(self):
+        assert self.index.match(_offer('Community Manager')) == {1}
+        assert self.index.match(_offer('Disenadora grafica')) == {2}
+        assert self.index.match(_offer('Manager de comunidad')) == set()
+    
+    def test_remove_and_resubscribe(self):
+        self.index.add(1, ['rpa'])
+        
+        assert self.index.match(_offer('Python dev')) == {3}
+        assert self.index.match(_offer('Experto RPA')) == {1}
+        
+        self.index.remove(3)
+        assert self.index.match(_offer('Python dev')) == set()
+        assert 'python' not in self.index.words
+    
+    def test_multiword_prefix_agrees_with_keyword_matcher(self):
+        from bot.utils.text import offer_search_text
+        from filters.keyword_matcher import KeywordMatcher
+        
+        self.index.add(4, ['diseño graf*'])
+        matcher = KeywordMatcher(['diseño graf*'])
+        
+        for title in ['Diseño gráfico', 'Diseño graf', 'Diseño web', 'Gráfico diseño']:
+            offer = _offer(title)
+            assert (4 in self.index.match(offer)) == matcher.search(offer_search_text(offer)), title
+        assert 4 in self.index.match(_offer('Diseño gráfico'))
+        
+        self.index.remove(4)
+        assert self.index.match(_offer('Diseño gráfico')) == set()
+        assert 'diseno' not in self.index.phrases
+    
+    def test_match_offers_groups_by_chat(self):
+        python, design = _offer('Python'), _offer('Diseñador UX')
+        
+        by_chat = self.index.match_offers([python, design])
+        
+        assert by_chat == {1: [python], 3: [python], 2: [design]}
+
+
+class TestSubscriptionStore:
+    
+    def test_store_persists_topics(self, tmp_path):
+        store = SubscriptionStore(data_dir=str(tmp_path))
+        assert store.subscribe(42, [' Python ', 'python', '', 'Diseño']) == ['python', 'diseño']
+        
+        reloaded = SubscriptionStore(data_dir=str(tmp_path))
+        assert reloaded.get(42) == ['python', 'diseño']
+        assert reloaded.index.match(_offer('Diseno web')) == {42}
+        assert reloaded.matcher_for(42).search('diseno web')
+        assert reloaded.matcher_for(7) is None
+    
+    def test_unsubscribe(self, tmp_path):
+        store = SubscriptionStore(data_dir=str(tmp_path))
+        store.subscribe(42, ['python'])
+        
+        assert store.unsubscribe(42) is True
+        assert store.unsubscribe(42) is False
+        assert store.index.match(_offer('Python')) == set()
@@ -0,0 +1,61 @@
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+from telegram.ext import Application
+from bot.webhook import SECRET_HEADER, WebhookServer
+
+FAKE_UPDATE = {
+    'update_id': 1,
+    'message': {
+        'message_id': 10,
+        'date': 1700000000,
+        'chat': {'id': 100, 'type': 'private'},
+        'from': {'id': 100, 'is_bot': False, 'first_name': 'Ana'},
+        'text': 'Ofertas',
+    },
+}
+
+
+@pytest_asyncio.fixture
+async def client():
+    application = Application.builder().token("123456:TEST-TOKEN").build()
+    server = WebhookServer(application, path="/telegram", secret="s3cret", host="127.0.0.1", port=0)
+    test_client = TestClient(TestServer(server.build_app()))
+    await test_client.start_server()
+    test_client.application = application
+    yield test_client
+    await test_client.close()
+
+
+class TestWebhookServer:
+    
+    @pytest.mark.asyncio
+    async def test_rejects_missing_or_wrong_secret(self, client):
+        assert (await client.post("/telegram", json=FAKE_UPDATE)).status == 403
+        response = await client.post("/telegram", json=FAKE_UPDATE, headers={SECRET_HEADER: "nope"})
+        
+        assert response.status == 403
+        assert client.application.update_queue.empty()
+    
+    @pytest.mark.asyncio
+    async def test_fake_update_is_queued(self, client):
+        response = await client.post("/telegram", json=FAKE_UPDATE, headers={SECRET_HEADER: "s3cret"})
+        
+        assert response.status == 200
+        update = client.application.update_queue.get_nowait()
+        assert update.message.text == "Ofertas" and update.effective_chat.id == 100
+    
+    @pytest.mark.asyncio
+    async def test_bad_payload_and_health(self, client):
+        response = await client.post("/telegram", data="{not json", headers={SECRET_HEADER: "s3cret"})
+        assert response.status == 400
+        for payload in ([1, 2], {'message': {}}, {'update_id': "1"}):
+            response = await client.post("/telegram", json=payload, headers={SECRET_HEADER: "s3cret"})
+            assert response.status == 400
+        assert client.application.update_queue.empty()
+        
+        health = await client.get("/health")
+        body = await health.json()
+        # La Application no está arrancada en el test: el servidor responde pero avisa
+        assert health.status == 503
+        assert body['status'] == 'starting' and body['updates_rejected'] == 0